@@ -0,0 +1,3 @@
+# pylint: disable=C0111
+from .prefix_trie import PrefixTrie
+from .access_list import AccessList
@@ -0,0 +1,143 @@
+""" This file contains the AccessList class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import os
+import time
+from ipaddress import ip_address
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+from ipaddress import IPv4Network
+from ipaddress import IPv6Network
+from utilities import ConfigHelper
+from access.prefix_trie import PrefixTrie
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+# The directory relative list paths are resolved against
+LAMBDA_CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AccessList:
+    """ This class is responsible for the allow list and deny list of IP ranges, configured in the ACCESS_LIST config
+        section. Ranges are given inline (ALLOW, DENY) or in files with one range per line (ALLOW_PATH, DENY_PATH).
+        The longest matching range decides, an allowed range wins over an equal denied range. The list is built once
+        per container. """
+
+    config_section_access_list = 'ACCESS_LIST'
+
+    verdict_allow = 'allow'
+    verdict_deny = 'deny'
+
+    _access_list = None
+    _access_list_key = None
+
+    def __init__(self):
+        self.tries = {4: PrefixTrie(4), 6: PrefixTrie(6)}
+        self.build_time_in_ms = 0.0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return len(self.tries[4]) + len(self.tries[6])
+
+    def add(self, prefix, verdict) -> None:
+        """ Adds an IPv4 or IPv6 range with its verdict """
+
+        version = prefix.version if isinstance(prefix, (IPv4Network, IPv6Network)) else 6 if ':' in str(prefix) else 4
+        self.tries[version].insert(prefix, verdict)
+
+    def add_lines(self, lines, verdict) -> int:
+        """ Adds the ranges of an iterable of lines, skipping blank lines and # comments. Returns the number of ranges
+            added. """
+
+        return self.add_all(self.read_lines(lines, verdict))
+
+    def add_all(self, entries) -> int:
+        """ Adds an iterable of (range, verdict) pairs with one bulk insert per IP version, later pairs win over equal
+            earlier ones. Returns the number of ranges added. """
+
+        entries_by_version = {4: [], 6: []}
+
+        for prefix, verdict in entries:
+            entries_by_version[6 if ':' in str(prefix) else 4].append((prefix, verdict))
+
+        return self.tries[4].insert_all(entries_by_version[4]) + self.tries[6].insert_all(entries_by_version[6])
+
+    @staticmethod
+    def read_lines(lines, verdict):
+        """ Yields a (range, verdict) pair per line, skipping blank lines and # comments """
+
+        for line in lines:
+            prefix = line.split('#', 1)[0].strip()
+
+            if prefix:
+                yield prefix, verdict
+
+    def get_verdict(self, address):
+        """ Returns the verdict of the longest range containing the address, or None when no range contains it """
+
+        if not isinstance(address, (IPv4Address, IPv6Address)):
+            address = ip_address(address)
+
+        return self.tries[address.version].lookup(address)
+
+    @classmethod
+    def get_access_list(cls, config):
+        """ Returns the access list of this container, or None when no ranges are configured """
+
+        allow = ConfigHelper.get_list(config, cls.config_section_access_list, 'ALLOW')
+        deny = ConfigHelper.get_list(config, cls.config_section_access_list, 'DENY')
+        allow_path = ConfigHelper.get_value(config, cls.config_section_access_list, 'ALLOW_PATH', '')
+        deny_path = ConfigHelper.get_value(config, cls.config_section_access_list, 'DENY_PATH', '')
+
+        access_list_key = (tuple(allow), tuple(deny), allow_path, deny_path)
+
+        if cls._access_list_key != access_list_key:
+            cls._access_list = cls.create_access_list(allow, deny, allow_path, deny_path)
+            cls._access_list_key = access_list_key
+
+        return cls._access_list
+
+    @classmethod
+    def create_access_list(cls, allow, deny, allow_path, deny_path):
+        """ Builds the access list, denied ranges are added first so an equal allowed range replaces them """
+
+        start_time = time.perf_counter()
+        access_list = cls()
+        entries = []
+
+        for prefixes, path, verdict in [(deny, deny_path, cls.verdict_deny), (allow, allow_path, cls.verdict_allow)]:
+            entries.extend(cls.read_lines(prefixes, verdict))
+
+            if path:
+                if not os.path.isabs(path):
+                    path = os.path.join(LAMBDA_CODE_DIR, path)
+
+                if os.path.isfile(path):
+                    with open(path) as list_file:
+                        entries.extend(cls.read_lines(list_file, verdict))
+                else:
+                    # pylint: disable=W1202
+                    LOGGER.warning('Access list {0} not found, skipping.'.format(path))
+
+        # All ranges are added at once, so they are inserted from short to long
+        access_list.add_all(entries)
+
+        if len(access_list) == 0:
+            return None
+
+        access_list.build_time_in_ms = (time.perf_counter() - start_time) * 1000
+
+        return access_list
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Drops the access list so it is built again on next use """
+
+        cls._access_list = None
+        cls._access_list_key = None
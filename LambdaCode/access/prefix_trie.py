@@ -0,0 +1,160 @@
+""" This file contains the PrefixTrie class """
+
+import gc
+import socket
+from ipaddress import ip_address
+from ipaddress import IPv4Network
+from ipaddress import IPv6Network
+
+
+class PrefixTrie:
+    """ This class is responsible for longest prefix matching of IP addresses against a set of prefixes. It is a multibit
+        trie with a stride of one byte: a prefix is stored in the node of its last byte, expanded over the slots of the
+        bits it leaves open. A lookup visits at most one node per address byte (4 for IPv4, 16 for IPv6), regardless of
+        the number of prefixes. Nodes hold dictionaries, so sparse lists stay small. """
+
+    stride = 8
+
+    def __init__(self, version):
+        self.version = version
+        self.address_length = 4 if version == 4 else 16
+        self.address_family = socket.AF_INET if version == 4 else socket.AF_INET6
+
+        # A node holds byte -> child node, byte -> (prefix length, value) and the longest prefix length of its values
+        self.root = self.create_node()
+        self.default_entry = None
+        self.prefix_count = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return self.prefix_count
+
+    @staticmethod
+    def create_node() -> list:
+        """ Returns an empty node """
+
+        return [{}, {}, 0]
+
+    def insert(self, prefix, value) -> None:
+        """ Adds a prefix (string or ipaddress network) with its value. For overlapping prefixes the longest prefix
+            wins, for equal prefixes the last inserted value. """
+
+        address_bytes, prefix_length = self.parse_prefix(prefix)
+        self.insert_packed(address_bytes, prefix_length, value)
+
+    def insert_all(self, prefixes) -> int:
+        """ Adds an iterable of (prefix, value) pairs and returns the number of prefixes added. The prefixes are added
+            from short to long, so every slot is written with a single bulk update instead of being compared. """
+
+        parsed_prefixes = [self.parse_prefix(prefix) + (value,) for prefix, value in prefixes]
+
+        # Stable, so the last of equal prefixes still wins
+        parsed_prefixes.sort(key=lambda parsed_prefix: parsed_prefix[1])
+
+        # The nodes hold no reference cycles, pausing the cyclic garbage collector avoids repeated full scans of the
+        # growing trie while it is built
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            for address_bytes, prefix_length, value in parsed_prefixes:
+                self.insert_packed(address_bytes, prefix_length, value)
+
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        return len(parsed_prefixes)
+
+    def insert_packed(self, address_bytes, prefix_length, value) -> None:
+        """ Adds a prefix given as packed address and prefix length """
+
+        self.prefix_count += 1
+        entry = (prefix_length, value)
+
+        if prefix_length == 0:
+            self.default_entry = entry
+            return
+
+        # The prefix ends in the node at depth (prefix length - 1) // stride and fixes the leading bits of that byte
+        depth = (prefix_length - 1) // self.stride
+        node = self.root
+
+        for byte in address_bytes[:depth]:
+            child_node = node[0].get(byte)
+
+            if child_node is None:
+                child_node = node[0][byte] = self.create_node()
+
+            node = child_node
+
+        open_bits = (depth + 1) * self.stride - prefix_length
+        first_slot = address_bytes[depth] & (0xFF << open_bits) & 0xFF
+        slots = range(first_slot, first_slot + (1 << open_bits))
+        values = node[1]
+
+        if prefix_length >= node[2]:
+            # No longer prefix is stored in this node, all slots can be overwritten
+            values.update(dict.fromkeys(slots, entry))
+            node[2] = prefix_length
+            return
+
+        for slot in slots:
+            current_entry = values.get(slot)
+
+            if current_entry is None or current_entry[0] <= prefix_length:
+                values[slot] = entry
+
+    def parse_prefix(self, prefix) -> tuple:
+        """ Returns the packed address and the prefix length of a prefix, host bits are ignored. Strings are parsed
+            without creating ipaddress objects, which matters for large lists at cold start. """
+
+        if isinstance(prefix, (IPv4Network, IPv6Network)):
+            if prefix.version != self.version:
+                raise ValueError('{0} is not an IPv{1} prefix'.format(prefix, self.version))
+
+            return prefix.network_address.packed, prefix.prefixlen
+
+        address, _, prefix_length = str(prefix).strip().partition('/')
+
+        try:
+            address_bytes = socket.inet_pton(self.address_family, address)
+            prefix_length = int(prefix_length) if prefix_length else self.address_length * 8
+
+        except (OSError, ValueError):
+            raise ValueError('{0} is not an IPv{1} prefix'.format(prefix, self.version))
+
+        if not 0 <= prefix_length <= self.address_length * 8:
+            raise ValueError('{0} is not an IPv{1} prefix'.format(prefix, self.version))
+
+        return address_bytes, prefix_length
+
+    def lookup(self, address, default=None):
+        """ Returns the value of the longest prefix containing the address (string, ipaddress object or packed bytes),
+            or the default when no prefix contains it """
+
+        if isinstance(address, str):
+            address = ip_address(address)
+
+        address_bytes = address if isinstance(address, bytes) else address.packed
+
+        if len(address_bytes) != self.address_length:
+            return default
+
+        best_entry = self.default_entry
+        node = self.root
+
+        for byte in address_bytes:
+            entry = node[1].get(byte)
+
+            if entry is not None:
+                best_entry = entry
+
+            node = node[0].get(byte)
+
+            if node is None:
+                break
+
+        return best_entry[1] if best_entry is not None else default
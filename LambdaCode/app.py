@@ -1,29 +1,80 @@
 """ Entry point file """
 
 # pylint: disable=E0401
+# pylint: disable=C0413
+import time
+
+# Start of the Lambda init phase, the imports below are part of the cold start
+INIT_START_TIME = time.perf_counter()
+
 import os
 import configparser
 import logging
 from bad_bots import BadBots
+from batch import RecordBatchHandler
+from blocking import IPSetBlocker
 from utilities import Diagnostics
+from utilities import ConfigHelper
+from utilities import PhaseTimer
+
+IMPORT_DURATION_IN_MS = (time.perf_counter() - INIT_START_TIME) * 1000
 
 # Setup logger
 LOGGER = logging.getLogger()
 LOGGER.setLevel(logging.INFO)
 
-# Setup config parser
+# Setup config parser, the config path can be overridden for local runs
 CONFIG = configparser.ConfigParser()
-CONFIG.read(os.path.join(os.path.dirname(__file__), 'config', 'config.ini'))
+CONFIG.read(os.environ.get('BAD_BOTS_CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'config', 'config.ini')))
+
+# Run the invocation with overlapping I/O (async) or step by step (sync)
+ASYNC_EXECUTION = ConfigHelper.get_value(CONFIG, BadBots.config_section_bad_bots, 'EXECUTION_MODE', 'sync') == 'async'
+
+if ASYNC_EXECUTION:
+    import asyncio
+
+# Build the detectors, clients and pools during the Lambda init phase instead of on the first request
+WARM_UP_DURATIONS = BadBots.warm_up(CONFIG)
+
+# Timings of the init phase, reported with the first invocation
+INIT_STATISTICS = {
+    'import_duration_in_ms': IMPORT_DURATION_IN_MS,
+    'warm_up_durations_in_ms': WARM_UP_DURATIONS,
+    'init_duration_in_ms': (time.perf_counter() - INIT_START_TIME) * 1000,
+    'invocation_count': 0
+}
+
+# pylint: disable=W1202
+LOGGER.info("Init: imports {0:.2f} ms, warm up {1}, total {2:.2f} ms.".format(
+    IMPORT_DURATION_IN_MS, ", ".join("{0} {1:.2f} ms".format(step_name, duration)
+                                     for step_name, duration in WARM_UP_DURATIONS.items()) or 'none',
+    INIT_STATISTICS['init_duration_in_ms']))
+
+
+def log_cold_start() -> None:
+    """ Logs the time to first response of the container, counted from the start of the init phase """
+
+    INIT_STATISTICS['invocation_count'] += 1
+
+    if INIT_STATISTICS['invocation_count'] == 1:
+        # pylint: disable=W1202
+        LOGGER.info("Cold start: first response {0:.2f} ms after the start of the init phase.".format(
+            (time.perf_counter() - INIT_START_TIME) * 1000))
+
 
 # pylint: disable=W0613
 def lambda_handler(event, context):
     """ Entry point of the application """
 
     bad_bots_output = None
+    PhaseTimer.reset()
 
     try:
         # Activate Bad Bots module
-        bad_bots_output = BadBots(CONFIG, event).parse_bad_bots()
+        if ASYNC_EXECUTION:
+            bad_bots_output = asyncio.run(BadBots(CONFIG, event).parse_bad_bots_async())
+        else:
+            bad_bots_output = BadBots(CONFIG, event).parse_bad_bots()
 
     except Exception as error:
         LOGGER.error(error)
@@ -41,5 +92,76 @@ def lambda_handler(event, context):
         # Send results to diagnostics to print results
         Diagnostics.print_results({'bad_bots_results': bad_bots_output, 'config': CONFIG})
 
+        log_cold_start()
+
     # Return response to bad bot
     return response
+
+
+# pylint: disable=W0613
+def flush_handler(event, context):
+    """ Entry point of the flush of the block queue. Triggered by the SQS block queue it writes the delivered blocks,
+        invoked without records it writes all blocks of the file backed queue regardless of the thresholds. """
+
+    try:
+        ip_set_blocker = IPSetBlocker(CONFIG)
+
+        if 'Records' in event:
+            flush_output = ip_set_blocker.flush_block_records(event['Records'])
+        else:
+            flush_output = ip_set_blocker.get_block_queue_flusher(ip_set_blocker.get_block_queue()).flush()
+
+    except Exception as error:
+        LOGGER.error(error)
+        raise
+
+    # pylint: disable=W1202
+    LOGGER.info("Flushed {0} queued blocks in {1} IP set updates, {2} failed, {3} pending.".format(
+        flush_output['flushed'], flush_output['updates'], flush_output['failed'], flush_output['pending']))
+
+    # Partial batch response, only the blocks of failed updates are delivered again
+    if 'Records' in event:
+        return {'batchItemFailures': flush_output['batchItemFailures']}
+
+    return flush_output
+
+
+# pylint: disable=W0613
+def sweeper_handler(event, context):
+    """ Entry point of the scheduled sweep, removes expired blocks from the bad bots IP sets """
+
+    try:
+        sweep_output = IPSetBlocker(CONFIG).sweep_expired_blocks()
+
+    except Exception as error:
+        LOGGER.error(error)
+        raise
+
+    # pylint: disable=W1202
+    LOGGER.info("Removed {0} expired blocks in {1:.2f} ms.".format(sweep_output['removed_total'],
+                                                                   sweep_output['duration_in_ms']))
+
+    return sweep_output
+
+
+# pylint: disable=W0613
+def batch_handler(event, context):
+    """ Entry point of a batch of logged requests from SQS or Kinesis, bots are blocked with one update per IP set """
+
+    try:
+        if ASYNC_EXECUTION:
+            batch_output = asyncio.run(RecordBatchHandler(CONFIG, event).parse_bad_bots_batch_async())
+        else:
+            batch_output = RecordBatchHandler(CONFIG, event).parse_bad_bots_batch()
+
+    except Exception as error:
+        LOGGER.error(error)
+        raise
+
+    # pylint: disable=W1202
+    LOGGER.info("Scored {0} records, blocked {1} bots in {2} IP set updates, dropped {3}, {4} failed.".format(
+        batch_output['records'], batch_output['bots'], len(batch_output['updates']), batch_output['dropped'],
+        len(batch_output['batchItemFailures'])))
+
+    # Partial batch response, only the failed records are retried
+    return {'batchItemFailures': batch_output['batchItemFailures']}
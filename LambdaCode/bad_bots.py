@@ -2,17 +2,37 @@
 
 # pylint: disable=E0611
 # pylint: disable=E0401
+import importlib
 import logging
-import json
-import re
-from enum import Enum
+import time
 from ipaddress import ip_address
-from ipaddress import IPv4Network
-from ipaddress import IPv6Network
+from ipaddress import ip_network
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
 from models import Bot
-from connection import AWSWAFv2Connection
+from models import SourceIPType
+from access import AccessList
+from connection import AWSConnection
 from connection import HTTPGet
-from crawlerdetect import CrawlerDetect
+from scoring import DetectorRegistry
+from scoring import ScoringContext
+from scoring import ScoringPipeline
+from scoring import EmptyUserAgentRule
+from scoring import HTTPMethodRule
+from scoring import CrawlerRule
+from scoring import SQLInjectionRule
+from scoring import XSSRule
+from scoring import XSSImageRule
+from scoring import GeolocationRule
+from cache import GeolocationCache
+from cache import VerdictCache
+from cache import UserAgentCache
+from cache import BlockSetSnapshot
+from geolocation import GeolocationProviderFactory
+from utilities import ConfigHelper
+from utilities import PhaseTimer
+from blocking import IPSetBlocker
+from blocking import SQSBlockQueue
 
 
 # Setup logger
@@ -26,160 +46,569 @@ class BadBots:
 
     config_section_bad_bots = 'BAD_BOTS'
     config_section_geolocation = 'GEOLOCATION'
+    config_section_blocking = 'BLOCKING'
+    config_section_scoring = 'SCORING'
 
-    def __init__(self, config, event):
+    # Blocking modes: update the IP set right away or queue the block and write queued blocks in batches
+    blocking_mode_sync = 'sync'
+    blocking_mode_buffered = 'buffered'
+
+    # The countries we ship / sell to, by name (remote geolocation API) and by code (local range table)
+    shipping_countries = ["Netherlands", "Belgium", "Germany", "NL", "BE", "DE"]
+
+    # The threshold confidence of the bot. If the bot confidence score is equal or higher than the threshold,
+    # block the bot.
+    bot_confidence_threshold = 7
+
+    # The async mode starts the geolocation lookup when a rule of at least this cost is reached with an undecided
+    # score, so the lookup runs while the payload rules are evaluated
+    speculative_geolocation_cost = 20
+
+    # The scoring pipeline of the container, see get_scoring_pipeline
+    _scoring_pipeline = None
+
+    # The thread pool running the blocking I/O of the async mode, see get_executor
+    _executor = None
+
+    def __init__(self, config, event, geolocation_resolver=None, block_function=None):
         self.config = config
         self.event = event
 
+        # Side effects of the scoring, by default the geolocation is looked up with the configured providers and bots
+        # are blocked in WAF. Both can be replaced, for example to replay events without any outbound calls.
+        self.geolocation_resolver = geolocation_resolver if geolocation_resolver is not None else self.get_geolocation
+        self.block_function = block_function if block_function is not None else self.block_bot
+
+        # Writes the blocks to the bad bots IP sets
+        self.ip_set_blocker = IPSetBlocker(config)
+
     def parse_bad_bots(self):
         """ Entry point """
 
-        # The threshold confidence of the bot. If the bot confidence score is equal or higher than the threshold,
-        # block the bot.
-        bot_confidence_threshold = 7
-
         # Setup properties
-        bot = Bot()
-        bot.source_ip = str(self.event['requestContext']['identity']['sourceIp'])
-        bot.source_ip_type = self.get_ip_type_by_address(bot.source_ip)
-        bot.http_user_agent = str(self.event['headers']['User-Agent'])
-        bot.http_method = str(self.event['httpMethod'])
-        bot.http_body = str(self.event['body'])
-        bot.http_query_string_parameters = str(self.event['queryStringParameters'])
-
-        if bot.source_ip_type == self.SourceIPType.IPV4:
-            bot.geolocation = self.get_geolocation(bot.source_ip)
-        else:
-            bot.geolocation = None
+        with PhaseTimer.measure(PhaseTimer.phase_parse):
+            bot = self.create_bot()
+
+        # Allowed and known bad ranges, bots that were blocked before and addresses already in the IP set skip scoring
+        scoring_result = self.check_access_list(bot) or self.check_verdict_cache(bot) or self.check_block_snapshot(bot)
+
+        # Do confidence check based on bot properties. Scoring stops once the outcome is decided, the geolocation is
+        # only looked up when it can still change the outcome.
+        if scoring_result is None:
+            scoring_result = self.evaluate_bot_confidence(bot, self.bot_confidence_threshold, self.geolocation_resolver)
+
+        block_queue_result = None
+
+        if self.is_block_due(scoring_result):
+            block_queue_result = self.block_function(bot)
+
+            if self.is_block_written(block_queue_result):
+                self.remember_blocked_bot(bot, scoring_result['score'])
+
+        return self.create_output(bot, scoring_result, block_queue_result)
+
+    async def parse_bad_bots_async(self):
+        """ Async entry point, returns the same output as parse_bad_bots. The geolocation lookup, the prefetch of the IP
+            set reference and the block run in the executor and are awaited, so the other records of a batch are scored
+            meanwhile and no I/O outlives the invocation. """
+
+        # Imported on first use like the other modules of the async and batch modes, the synchronous handler does not
+        # pay for loading them at cold start
+        # pylint: disable=C0415
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor(self.config)
+
+        with PhaseTimer.measure(PhaseTimer.phase_parse):
+            bot = self.create_bot()
+
+        scoring_result = self.check_access_list(bot) or self.check_verdict_cache(bot) or self.check_block_snapshot(bot)
+
+        if scoring_result is None:
+            # The IP set reference is loaded while the bot is scored, so a block only reads and writes the IP set
+            prefetch = loop.run_in_executor(executor, self.prefetch_ip_set_references, bot.source_ip_type) \
+                if self.is_ip_set_prefetch_due() else None
+
+            scoring_result = await self.evaluate_bot_confidence_async(bot, self.bot_confidence_threshold, executor)
+
+            if prefetch is not None:
+                await prefetch
+
+        block_queue_result = None
+
+        if self.is_block_due(scoring_result):
+            block_queue_result = await loop.run_in_executor(executor, self.block_function, bot)
+
+            if self.is_block_written(block_queue_result):
+                self.remember_blocked_bot(bot, scoring_result['score'])
+
+        return self.create_output(bot, scoring_result, block_queue_result)
+
+    def check_access_list(self, bot):
+        """ Returns the scoring result of a bot in an allowed (score 0) or denied (score at the threshold) range of the
+            access list, or None when the bot has to be scored """
+
+        access_list = AccessList.get_access_list(self.config)
+
+        if access_list is None:
+            return None
+
+        verdict = access_list.get_verdict(bot.source_ip_address)
+
+        if verdict is None:
+            return None
+
+        return {
+            'score': self.bot_confidence_threshold if verdict == AccessList.verdict_deny else 0,
+            'stop_reason': '{0}_list'.format(verdict),
+            'rules': {},
+            'body_scan': None
+        }
+
+    def check_verdict_cache(self, bot):
+        """ Returns the scoring result of a bot that was blocked before according to the verdict cache, or None when
+            the bot has to be scored """
+
+        verdict_cache = VerdictCache.get_verdict_cache(self.config)
+
+        if verdict_cache is None:
+            return None
+
+        verdict = verdict_cache.lookup(bot)
+
+        if verdict is None:
+            return None
+
+        return {
+            'score': verdict['score'],
+            'stop_reason': 'verdict_cache',
+            'rules': {},
+            'body_scan': None
+        }
+
+    def check_block_snapshot(self, bot):
+        """ Returns the scoring result of a bot whose address is in the snapshot of its bad bots IP set, or None when
+            the bot has to be scored. Only used when bots are blocked by block_bot, as the snapshot mirrors WAF. """
+
+        if self.block_function != self.block_bot or not BlockSetSnapshot.is_enabled(self.config):
+            return None
+
+        ip_set_key = self.ip_set_blocker.get_ip_set_key(bot.source_ip_type, bot.source_ip_address)
+
+        if not BlockSetSnapshot.lookup(self.config, ip_set_key, bot.source_ip_address):
+            return None
+
+        return {
+            'score': self.bot_confidence_threshold,
+            'stop_reason': 'block_snapshot',
+            'rules': {},
+            'body_scan': None
+        }
+
+    def is_block_due(self, scoring_result) -> bool:
+        """ Indicates whether the bot has to be blocked, bots with a cached verdict or in the block set snapshot are
+            blocked already """
+
+        return scoring_result['score'] >= self.bot_confidence_threshold and \
+            scoring_result['stop_reason'] not in ('verdict_cache', 'block_snapshot')
+
+    @staticmethod
+    def is_block_written(block_queue_result) -> bool:
+        """ Indicates whether the block reached the IP set: written right away, or queued and flushed together with
+            every other pending block. A block that is still queued is not remembered, repeat requests block again. """
+
+        return block_queue_result is None or (block_queue_result['failed'] == 0 and block_queue_result['pending'] == 0)
+
+    def remember_blocked_bot(self, bot, score) -> None:
+        """ Stores the verdict of a blocked bot, for at most the lifetime of the block. Verdicts are only stored when
+            the bot was blocked by block_bot, a replaced block function does not necessarily block. """
+
+        verdict_cache = VerdictCache.get_verdict_cache(self.config)
+
+        if verdict_cache is None or self.block_function != self.block_bot:
+            return
+
+        block_ttl_in_seconds = ConfigHelper.get_float(self.config, self.config_section_blocking, 'BLOCK_TTL_SECONDS', 0)
 
-        # Do confidence check based on bot properties
-        bot_confidence_score = self.check_bot_confidence(bot)
+        verdict_cache.put(bot, {'score': score, 'blocked_at': time.time()},
+                          block_ttl_in_seconds if block_ttl_in_seconds > 0 else None)
 
-        # Was detected as bot? For diagnostics
-        is_bot = False
+    def create_output(self, bot, scoring_result, block_queue_result) -> dict:
+        """ Returns the output of an invocation, for diagnostics """
 
-        if bot_confidence_score >= bot_confidence_threshold:
+        bot_confidence_score = scoring_result['score']
 
-            is_bot = True
+        return {
+            "source_ip": bot.source_ip,
+            "source_ip_type": bot.source_ip_type.value,
+            "is_bot": bot_confidence_score >= self.bot_confidence_threshold,
+            "bot_confidence_score": bot_confidence_score,
+            "scoring": {
+                "stop_reason": scoring_result['stop_reason'],
+                "body_scan": scoring_result['body_scan'],
+                "crawler": scoring_result.get('crawler'),
+                "rules": scoring_result['rules'],
+                "hit_counts": self.get_scoring_pipeline().get_statistics()['hit_counts']
+            },
+            "detector_registry": DetectorRegistry.get_statistics(),
+            "geolocation_cache": GeolocationCache.get_statistics(),
+            "verdict_cache": VerdictCache.get_statistics(),
+            "user_agent_cache": UserAgentCache.get_statistics(),
+            "block_snapshot": BlockSetSnapshot.get_statistics(),
+            "http": HTTPGet.get_statistics(),
+            "block_queue": block_queue_result,
+            "phases": PhaseTimer.get_durations()
+        }
+
+    @classmethod
+    def warm_up(cls, config) -> dict:
+        """ Builds the heavy objects of the container ahead of the first request, meant for the Lambda init phase which
+            runs with burst CPU. Every step is enabled in the BAD_BOTS config section. A failing step is logged and
+            left to the first request. Returns the duration of every step in milliseconds. """
+
+        async_execution = ConfigHelper.get_value(config, cls.config_section_bad_bots, 'EXECUTION_MODE') == 'async'
+
+        def warm_up_http_pool():
+            HTTPGet.configure(config)
+            HTTPGet.get_pool_manager()
+
+        def warm_up_async_mode():
+            importlib.import_module('asyncio')
+            cls.get_executor(config)
+
+        warm_up_steps = [
+            # CrawlerDetect patterns and the payload signatures
+            ('detectors', ConfigHelper.get_bool(config, cls.config_section_bad_bots, 'PRELOAD_DETECTORS'),
+             DetectorRegistry.build),
+            ('access_list', ConfigHelper.get_bool(config, cls.config_section_bad_bots, 'WARM_UP_ACCESS_LIST'),
+             lambda: AccessList.get_access_list(config)),
+            # Maps the range table
+            ('geolocation', ConfigHelper.get_bool(config, cls.config_section_bad_bots, 'WARM_UP_GEOLOCATION'),
+             lambda: GeolocationProviderFactory.get_provider(config)),
+            ('http_pool', ConfigHelper.get_bool(config, cls.config_section_bad_bots, 'WARM_UP_HTTP_POOL'),
+             warm_up_http_pool),
+            # Imports boto3 and loads the service model of the client
+            ('aws_client', ConfigHelper.get_bool(config, cls.config_section_bad_bots, 'WARM_UP_AWS_CLIENT'),
+             lambda: AWSConnection.get_connection('wafv2')),
+            # Lists the IP sets, a network call
+            ('ip_set_references', ConfigHelper.get_bool(config, cls.config_section_bad_bots,
+                                                        'WARM_UP_IP_SET_REFERENCES'),
+             lambda: cls(config, {}).prefetch_ip_set_references(cls.SourceIPType.IPV4)),
+            ('async_mode', async_execution, warm_up_async_mode)
+        ]
+
+        durations = {}
+
+        for step_name, is_enabled, warm_up_function in warm_up_steps:
+            if not is_enabled:
+                continue
+
+            start_time = time.perf_counter()
+
+            try:
+                warm_up_function()
+
+            # pylint: disable=W0703
+            except Exception as error:
+                # pylint: disable=W1202
+                LOGGER.error("Warm up of {0} failed: {1}".format(step_name, error))
+
+            durations[step_name] = (time.perf_counter() - start_time) * 1000
+
+        return durations
+
+    @classmethod
+    def get_executor(cls, config) -> 'ThreadPoolExecutor':
+        """ Returns the thread pool of the container that runs the blocking I/O (boto3, HTTP) of the async mode """
+
+        if cls._executor is None:
+            # pylint: disable=C0415
+            from concurrent.futures import ThreadPoolExecutor
+
+            cls._executor = ThreadPoolExecutor(
+                max_workers=ConfigHelper.get_int(config, cls.config_section_bad_bots, 'ASYNC_MAX_WORKERS', 8),
+                thread_name_prefix='bad-bots')
+
+        return cls._executor
+
+    def is_ip_set_prefetch_due(self) -> bool:
+        """ Indicates whether the IP set reference should be prefetched, only when bots are blocked right away """
+
+        return self.block_function == self.block_bot and \
+            ConfigHelper.get_value(self.config, self.config_section_blocking, 'MODE',
+                                   self.blocking_mode_sync) == self.blocking_mode_sync
+
+    def prefetch_ip_set_references(self, source_ip_type) -> None:
+        """ Loads the Id and ARN of the IP sets into the cache of the connection, so the block only reads and writes
+            the IP set """
+
+        try:
+            self.ip_set_blocker.get_ip_set_connection(source_ip_type).get_ip_set_reference()
+
+        # pylint: disable=W0703
+        except Exception as error:
+            LOGGER.error(error)
+
+    def score_event(self) -> dict:
+        """ Scores the event with every rule, without short-circuiting, and blocks the bot with the block function
+            when the score reaches the threshold. Returns the full score with the names of the rules that hit. """
 
-            # Check the source IP type and then update the respective IP set
-            if bot.source_ip_type == self.SourceIPType.IPV4:
-                self.update_bad_bots_ip_set(self.SourceIPType.IPV4, [IPv4Network(bot.source_ip).with_prefixlen])
-            if bot.source_ip_type == self.SourceIPType.IPV6:
-                self.update_bad_bots_ip_set(self.SourceIPType.IPV6, [IPv6Network(bot.source_ip).with_prefixlen])
+        bot = self.create_bot()
+        scoring_result = self.evaluate_bot_confidence(bot, geolocation_resolver=self.geolocation_resolver)
+        is_bot = scoring_result['score'] >= self.bot_confidence_threshold
 
-        bad_bots_output = {
+        if is_bot:
+            self.block_function(bot)
+
+        return {
             "source_ip": bot.source_ip,
             "source_ip_type": bot.source_ip_type.value,
             "is_bot": is_bot,
-            "bot_confidence_score": bot_confidence_score
+            "bot_confidence_score": scoring_result['score'],
+            "rules": [name for name, rule_result in scoring_result['rules'].items() if rule_result['hit']]
         }
 
-        return bad_bots_output
+    def create_bot(self) -> Bot:
+        """ Creates the bot model out of the API Gateway event. Events of an Application Load Balancer target have no
+            request context, the source IP address is then taken from the X-Forwarded-For header. Only the last entry
+            of the header is used: it is appended by the load balancer, earlier entries are set by the client. """
+
+        http_headers = self.event.get('headers') or {}
+
+        # Header names are case insensitive, HTTP APIs deliver them in lower case and clients may use any case
+        http_headers_by_name = {str(name).lower(): value for name, value in http_headers.items()}
+
+        # Without a method the event is no request, a batch drops the record instead of scoring it
+        http_method = self.event.get('httpMethod')
+
+        if not http_method:
+            raise ValueError('The event has no HTTP method')
+
+        if 'requestContext' in self.event and 'identity' in self.event['requestContext']:
+            source_ip = str(self.event['requestContext']['identity']['sourceIp'])
+        else:
+            forwarded_for = http_headers_by_name.get('x-forwarded-for') or ''
+            source_ip = forwarded_for.split(',')[-1].strip()
+
+        source_ip_address = ip_address(source_ip)
+        http_user_agent = http_headers_by_name.get('user-agent', '')
+
+        # Keep every value of a parameter that was given more than once
+        http_query_string_parameters = self.event.get('multiValueQueryStringParameters') or \
+            self.event.get('queryStringParameters') or {}
+
+        http_body = self.event.get('body')
+
+        return Bot(
+            source_ip=source_ip,
+            source_ip_address=source_ip_address,
+            source_ip_type=self.get_ip_type_by_address(source_ip_address),
+            geolocation=None,
+            http_user_agent=str(http_user_agent or ''),
+            http_method=str(http_method),
+            http_body=http_body if isinstance(http_body, str) else '',
+            http_body_is_base64=bool(self.event.get('isBase64Encoded', False)),
+            http_query_string_parameters=http_query_string_parameters,
+            http_headers=http_headers
+        )
 
     def get_geolocation(self, source_ip):
-        """ Gets the country of origin based on the IP address """
+        """ Gets the country of origin based on the IP address from the configured geolocation providers. Results are
+            cached per container, including lookups that did not result in a country, so bursts from the same address
+            only pay for one lookup. """
+
+        with PhaseTimer.measure(PhaseTimer.phase_geolocation):
+            return self.resolve_geolocation(source_ip)
+
+    def resolve_geolocation(self, source_ip):
+        """ Looks up the country of origin in the geolocation cache and the providers """
+
+        geolocation_cache = GeolocationCache.get_cache(self.config)
+        cache_key = str(source_ip)
+
+        if geolocation_cache is not None:
+            is_cached, country = geolocation_cache.lookup(cache_key)
+
+            if is_cached:
+                return country
 
         country = None
 
         try:
-            response = HTTPGet.http_get_contents(self.config[self.config_section_geolocation]["API_URL"] + source_ip)
-            json_data = json.loads(response)
-            country = json_data["country"]
+            country = GeolocationProviderFactory.get_provider(self.config).get_country(source_ip)
 
+        # pylint: disable=W0703
         except Exception as error:
             LOGGER.error(error)
-            raise
+
+        if geolocation_cache is not None:
+            if country is None:
+                geolocation_cache.put(cache_key, None, GeolocationCache.get_negative_ttl(self.config))
+            else:
+                geolocation_cache.put(cache_key, country)
 
         return country
 
-    # pylint: disable=R0201
     def check_bot_confidence(self, bot):
         """ Indicates whether the client making the request is a bot or not by analysing the request and
             returning a confidence score
         """
 
-        bot_confidence_score = 0
+        return self.evaluate_bot_confidence(bot)['score']
 
-        # Confidence: Check user agent
+    def evaluate_bot_confidence(self, bot, threshold=None, geolocation_resolver=None) -> dict:
+        """ Runs the scoring pipeline over the bot and returns the score with the result of every evaluated rule. With a
+            threshold, evaluation stops once the threshold is reached or can no longer be reached. With a geolocation
+            resolver, the geolocation of the bot is only resolved when the geolocation rule is evaluated. """
 
-        # Check if user agent is null
-        if bot.http_user_agent == '':
-            bot_confidence_score += 3
+        start_time = time.perf_counter()
+        scoring_context = self.create_scoring_context(bot, geolocation_resolver)
+        scoring_result = self.get_scoring_pipeline().evaluate(scoring_context, threshold)
 
-        # Use crawler detection
-        crawler_detect = CrawlerDetect()
-        is_crawler = crawler_detect.isCrawler(bot.http_user_agent)
+        # The geolocation rule waits for the lookup, which is timed as a phase of its own
+        geolocation_rule_result = scoring_result['rules'].get(GeolocationRule.name)
+        lookup_duration_in_ms = geolocation_rule_result['duration_in_ms'] if geolocation_rule_result is not None else 0.0
 
-        if is_crawler:
-            bot_confidence_score += 7
+        return self.complete_scoring_result(scoring_context, scoring_result, start_time, lookup_duration_in_ms)
 
-        # Confidence: Check user agent, based on
-        # https://www.sans.org/reading-room/whitepapers/detection/identify-malicious-http-requests-34067
-        if bot.http_method in ["CONNECT", "PUT", "DELETE"]:
-            bot_confidence_score += 5
+    async def evaluate_bot_confidence_async(self, bot, threshold, executor) -> dict:
+        """ Async variant of evaluate_bot_confidence. The rules run on the event loop thread as the detectors are not
+            thread safe. Once the cheap rules have left the score undecided, the geolocation is looked up in the
+            executor while the expensive rules run, and awaited by the rule that needs it. A lookup that is not needed
+            because the score was decided meanwhile is cancelled, its result is ignored. """
 
-        # Confidence: Check geolocation
-        if bot.geolocation is None:
-            pass # IPv6 geolocation has not been implemented yet
-        else:
-            # If the geolocation is not a country we ship / sell to increase bot confidence
-            if bot.geolocation not in ["Netherlands", "Belgium", "Germany"]:
-                bot_confidence_score += 5
+        # pylint: disable=C0415
+        import asyncio
 
-        #Confidence check: body / query string parameters
+        loop = asyncio.get_running_loop()
 
-        # Check for SQL injections
+        start_time = time.perf_counter()
+        scoring_context = self.create_scoring_context(bot, self.geolocation_resolver)
+        scoring_result = {}
+        lookup = None
+        lookup_duration_in_ms = 0.0
 
-        sqli_regex = re.compile\
-            (r'\b(ALTER|CREATE|DELETE|DROP|EXEC(UTE){0,1}|INSERT( +INTO){0,1}|MERGE|SELECT|UPDATE|UNION( +ALL){0,1})\b')
+        for rule in self.get_scoring_pipeline().iter_evaluation(scoring_context, threshold, scoring_result):
+            if scoring_context.is_geolocation_resolved:
+                continue
 
-        if sqli_regex.search(bot.http_body) or sqli_regex.search(bot.http_query_string_parameters):
-            bot_confidence_score += 8
+            if lookup is None and (rule.needs_geolocation or rule.cost >= self.speculative_geolocation_cost):
+                lookup = loop.run_in_executor(executor, self.geolocation_resolver, scoring_context.get_source_ip())
 
-        # Check for XSS
-        xss_regex_1 = re.compile(r'((\%3C)|<)((\%2F)|\/)*[a-z0-9\%]+((\%3E)|>)')
-        if xss_regex_1.search(bot.http_body) or sqli_regex.search(bot.http_query_string_parameters):
-            bot_confidence_score += 8
+            if rule.needs_geolocation:
+                # Only the time spent waiting for the lookup is taken out of the scoring phase
+                lookup_start_time = time.perf_counter()
+                scoring_context.set_geolocation(await lookup)
+                lookup_duration_in_ms += (time.perf_counter() - lookup_start_time) * 1000
 
-        xss_regex_2 = re.compile(r'/((\%3C)|<)((\%69)|i|(\%49))((\%6D)|m|(\%4D))((\%67)|g|(\%47))[^\n]+((\%3E)|>)/I')
-        if xss_regex_2.search(bot.http_body) or sqli_regex.search(bot.http_query_string_parameters):
-            bot_confidence_score += 8
+        if lookup is not None and not scoring_context.is_geolocation_resolved:
+            lookup.cancel()
 
-        return bot_confidence_score
+        return self.complete_scoring_result(scoring_context, scoring_result, start_time, lookup_duration_in_ms)
+
+    def create_scoring_context(self, bot, geolocation_resolver) -> ScoringContext:
+        """ Returns the scoring context of the bot with the scan settings and user agent cache of the config """
+
+        return ScoringContext(bot, geolocation_resolver, self.get_scan_settings(),
+                              UserAgentCache.get_user_agent_cache(self.config))
+
+    @staticmethod
+    def complete_scoring_result(scoring_context, scoring_result, start_time, lookup_duration_in_ms) -> dict:
+        """ Records the scoring phase without the geolocation lookup and adds the body scan and crawler to the scoring
+            result """
+
+        scoring_duration_in_ms = (time.perf_counter() - start_time) * 1000 - lookup_duration_in_ms
+        PhaseTimer.record(PhaseTimer.phase_scoring, max(scoring_duration_in_ms, 0.0))
+
+        # How much of the body was scanned, None when no payload rule was evaluated
+        scoring_result['body_scan'] = scoring_context.body_reader.get_statistics() \
+            if scoring_context.body_reader is not None else None
+
+        # The name of the matched crawler, None when the user agent was not classified or is no known crawler
+        scoring_result['crawler'] = scoring_context.crawler_name
+
+        return scoring_result
+
+    def get_scan_settings(self) -> dict:
+        """ Returns the limits of the payload scan from the SCORING config section """
+
+        default_scan_settings = ScoringContext.default_scan_settings
+
+        return {
+            'max_scan_length': ConfigHelper.get_int(self.config, self.config_section_scoring, 'MAX_SCAN_LENGTH',
+                                                    default_scan_settings['max_scan_length']),
+            'max_query_string_scan_length': ConfigHelper.get_int(
+                self.config, self.config_section_scoring, 'MAX_QUERY_STRING_SCAN_LENGTH',
+                default_scan_settings['max_query_string_scan_length']),
+            'max_body_bytes': ConfigHelper.get_int(self.config, self.config_section_scoring, 'MAX_BODY_BYTES',
+                                                   default_scan_settings['max_body_bytes']),
+            'max_body_scan_length': ConfigHelper.get_int(self.config, self.config_section_scoring,
+                                                         'MAX_BODY_SCAN_LENGTH',
+                                                         default_scan_settings['max_body_scan_length']),
+            'body_chunk_size': ConfigHelper.get_int(self.config, self.config_section_scoring, 'BODY_CHUNK_SIZE',
+                                                    default_scan_settings['body_chunk_size']),
+            'body_chunk_overlap': ConfigHelper.get_int(self.config, self.config_section_scoring, 'BODY_CHUNK_OVERLAP',
+                                                       default_scan_settings['body_chunk_overlap'])
+        }
+
+    @classmethod
+    def get_scoring_pipeline(cls) -> ScoringPipeline:
+        """ Returns the scoring pipeline of the container, rules are ordered from cheap to expensive """
+
+        if cls._scoring_pipeline is None:
+            cls._scoring_pipeline = ScoringPipeline([
+                # Confidence: Check user agent
+                EmptyUserAgentRule(),
+                CrawlerRule(),
+                # Confidence: Check HTTP method
+                HTTPMethodRule(),
+                # Confidence: Check geolocation
+                GeolocationRule(cls.shipping_countries),
+                # Confidence check: body / query string parameters
+                SQLInjectionRule(),
+                XSSRule(),
+                XSSImageRule()
+            ])
+
+        return cls._scoring_pipeline
 
     def get_ip_type_by_address(self, source_ip):
-        """ Get the IP address type based on the IP address provided  """
+        """ Get the IP address type based on the IP address provided, either as a string or as an ipaddress object """
 
         # Identify IP version
-        source_ip_type = "IPV%s" % ip_address(source_ip).version
+        if not isinstance(source_ip, (IPv4Address, IPv6Address)):
+            source_ip = ip_address(source_ip)
 
-        if source_ip_type == "IPV4":
+        if source_ip.version == 4:
             return self.SourceIPType.IPV4
 
         return self.SourceIPType.IPV6
 
-    def update_bad_bots_ip_set(self, source_ip_type, source_ip_address_list):
-        """ Updates a bad bots IP set, depending on the IP address type """
+    def block_bot(self, bot):
+        """ Blocks the source IP address of the bot. In buffered mode the address is queued. A queue in SQS is flushed
+            by the flush function it triggers, the file backed queue of the container is flushed here once its size or
+            age threshold is reached. Otherwise the IP set is updated right away. """
+
+        # The address of the bot as a single address network, the IP set type follows from the source IP type
+        address = ip_network(bot.source_ip_address if bot.source_ip_address is not None else bot.source_ip) \
+            .with_prefixlen
+
+        blocking_mode = ConfigHelper.get_value(self.config, self.config_section_blocking, 'MODE',
+                                               self.blocking_mode_sync)
 
-        aws_wafv2_connection = None
+        if blocking_mode == self.blocking_mode_buffered:
+            block_queue = self.ip_set_blocker.get_block_queue()
+            block_queue.enqueue(bot.source_ip_type.value, address)
 
-        if source_ip_type == self.SourceIPType.IPV4:
-            aws_wafv2_connection = AWSWAFv2Connection(self.config, self.SourceIPType.IPV4)
-        elif source_ip_type == self.SourceIPType.IPV6:
-            aws_wafv2_connection = AWSWAFv2Connection(self.config, self.SourceIPType.IPV6)
+            if isinstance(block_queue, SQSBlockQueue):
+                return {'flushed': 0, 'failed': 0, 'updates': 0, 'pending': None}
 
-        # Get current IP set
-        wafv2_response = aws_wafv2_connection.retrieve_ip_set()
-        current_block_list_entries = wafv2_response["IPSet"]["Addresses"]
+            return self.ip_set_blocker.get_block_queue_flusher(block_queue).flush_if_due()
 
-        # Merge block lists
-        merged_block_list_entries = source_ip_address_list + current_block_list_entries
+        self.ip_set_blocker.update_bad_bots_ip_set(bot.source_ip_type, [address])
 
-        # Update IP set with with newly merged block list
-        aws_wafv2_connection.update_ip_set(merged_block_list_entries)
+        return None
 
-    class SourceIPType(Enum):
-        """ Subclass enum for BadBots class """
-        IPV4 = 'IPV4'
-        IPV6 = 'IPV6'
+    # The IP address types, kept on the class for the callers of BadBots.SourceIPType
+    SourceIPType = SourceIPType
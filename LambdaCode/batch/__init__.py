@@ -0,0 +1,3 @@
+# pylint: disable=C0111
+from .batch_scorer import BatchScorer
+from .record_batch_handler import RecordBatchHandler
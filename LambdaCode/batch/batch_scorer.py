@@ -0,0 +1,82 @@
+""" This file contains the BatchScorer class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import json
+import os
+from collections import deque
+from itertools import islice
+from bad_bots import BadBots
+from scoring import DetectorRegistry
+
+
+class BatchScorer:
+    """ This class is responsible for scoring large numbers of events, for example to replay access logs through the
+        scorer. Events are scored with BadBots.score_event in a pool of worker processes. """
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def score_batch(cls, config, events, processes=None, chunk_size=64, geolocation_enabled=False,
+                    blocking_enabled=False):
+        """ Scores an iterable of events, either event dicts or JSON lines, in a pool of worker processes and yields
+            one result per event in the order of the events. Events are sent to the workers in chunks and only a few
+            chunks per worker are in flight, so large logs are streamed instead of loaded. Geolocation lookups and
+            blocking are disabled by default. Events that cannot be scored result in an entry with an error. """
+
+        processes = processes or os.cpu_count() or 1
+
+        # Worker processes receive a plain copy of the config, a ConfigParser holds a lock on some platforms
+        config_sections = {section: dict(config[section]) for section in config}
+        settings = (config_sections, geolocation_enabled, blocking_enabled)
+
+        events = iter(events)
+        pending = deque()
+
+        # pylint: disable=C0415
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=cls.initialize_batch_worker) as executor:
+            while True:
+                chunk = list(islice(events, chunk_size))
+
+                if chunk:
+                    pending.append(executor.submit(cls.score_batch_chunk, settings, chunk))
+
+                # Keep the workers busy while bounding the number of events held in memory
+                while pending and (not chunk or len(pending) >= processes * 2):
+                    for result in pending.popleft().result():
+                        yield result
+
+                if not chunk:
+                    break
+
+    @staticmethod
+    def initialize_batch_worker():
+        """ Builds the detectors once per worker process """
+
+        DetectorRegistry.build()
+
+    @staticmethod
+    def score_batch_chunk(settings, events) -> list:
+        """ Scores a chunk of events inside a worker process """
+
+        config, geolocation_enabled, blocking_enabled = settings
+        results = []
+
+        for event in events:
+            try:
+                if isinstance(event, (str, bytes)):
+                    event = json.loads(event)
+
+                bad_bots = BadBots(config, event,
+                                   geolocation_resolver=None if geolocation_enabled else lambda source_ip: None,
+                                   block_function=None if blocking_enabled else lambda bot: None)
+                results.append(bad_bots.score_event())
+
+            # pylint: disable=W0703
+            except Exception as error:
+                results.append({"error": "{0}: {1}".format(error.__class__.__name__, error)})
+
+        return results
@@ -0,0 +1,201 @@
+""" This file contains the RecordBatchHandler class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import base64
+import json
+import logging
+from ipaddress import ip_network
+from bad_bots import BadBots
+from blocking import IPSetBlocker
+from models import SourceIPType
+from utilities import ConfigHelper
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class RecordBatchHandler:
+    """ This class is responsible for batches of SQS or Kinesis records, every record holds a logged API Gateway event.
+        All records are scored first, the addresses of the bots are then written with one merged update per IP set. The
+        records of an IP set whose update failed are returned as batch item failures, so only those are retried.
+        Records that cannot be decoded or scored are logged and dropped, a retry would fail the same way. """
+
+    def __init__(self, config, event, geolocation_resolver=None):
+        self.config = config
+        self.event = event
+
+        # Replaces the geolocation lookup of every record, see BadBots
+        self.geolocation_resolver = geolocation_resolver
+
+        self.ip_set_blocker = IPSetBlocker(config)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def parse_bad_bots_batch(self) -> dict:
+        """ Entry point of a batch of records """
+
+        scored_records = [self.score_record(record) for record in self.event.get('Records') or []]
+        addresses_by_type = self.group_batch_addresses(scored_records)
+
+        updates = {ip_set_type: self.update_batch_ip_set(ip_set_type, addresses)
+                   for ip_set_type, addresses in addresses_by_type.items()}
+
+        self.remember_batch_bots(scored_records, updates)
+
+        return self.create_batch_output(scored_records, updates)
+
+    async def parse_bad_bots_batch_async(self) -> dict:
+        """ Async entry point of a batch of records, returns the same output as parse_bad_bots_batch. Records are
+            scored concurrently, bounded by ASYNC_MAX_CONCURRENCY, and the IP sets are updated concurrently. The IP set
+            references of the address types of the batch are prefetched while the records are scored. """
+
+        # pylint: disable=C0415
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        executor = BadBots.get_executor(self.config)
+        semaphore = asyncio.Semaphore(ConfigHelper.get_int(self.config, BadBots.config_section_bad_bots,
+                                                           'ASYNC_MAX_CONCURRENCY', 16))
+
+        # The IP set references of the address types found so far are loaded while the other records are scored
+        bad_bots = BadBots(self.config, {})
+        prefetches = {}
+
+        async def score_record(record):
+            async with semaphore:
+                scored_record = await self.score_record_async(record)
+
+            for bot, _ in scored_record[1] or []:
+                if bot.source_ip_type not in prefetches:
+                    prefetches[bot.source_ip_type] = loop.run_in_executor(
+                        executor, bad_bots.prefetch_ip_set_references, bot.source_ip_type)
+
+            return scored_record
+
+        scored_records = await asyncio.gather(*(score_record(record) for record in self.event.get('Records') or []))
+        addresses_by_type = self.group_batch_addresses(scored_records)
+
+        # No prefetch outlives the invocation, the updates then find the references in the cache
+        await asyncio.gather(*prefetches.values())
+
+        ip_set_types = list(addresses_by_type)
+        update_results = await asyncio.gather(*(
+            loop.run_in_executor(executor, self.update_batch_ip_set, ip_set_type, addresses_by_type[ip_set_type])
+            for ip_set_type in ip_set_types))
+
+        updates = dict(zip(ip_set_types, update_results))
+
+        self.remember_batch_bots(scored_records, updates)
+
+        return self.create_batch_output(scored_records, updates)
+
+    def score_record(self, record) -> tuple:
+        """ Scores a record of a batch, returns the identifier of the record with the detected bots and their scores,
+            or with None when the record was dropped """
+
+        item_identifier = self.get_record_identifier(record)
+        bots = []
+
+        try:
+            bad_bots_output = BadBots(self.config, self.decode_record(record), self.geolocation_resolver,
+                                      bots.append).parse_bad_bots()
+
+        # pylint: disable=W0703
+        except Exception as error:
+            # pylint: disable=W1202
+            LOGGER.error("Dropped record {0}: {1}".format(item_identifier, error))
+            return item_identifier, None
+
+        return item_identifier, [(bot, bad_bots_output['bot_confidence_score']) for bot in bots]
+
+    async def score_record_async(self, record) -> tuple:
+        """ Scores a record of a batch with the async entry point, see score_record """
+
+        item_identifier = self.get_record_identifier(record)
+        bots = []
+
+        try:
+            bad_bots_output = await BadBots(self.config, self.decode_record(record), self.geolocation_resolver,
+                                            bots.append).parse_bad_bots_async()
+
+        # pylint: disable=W0703
+        except Exception as error:
+            # pylint: disable=W1202
+            LOGGER.error("Dropped record {0}: {1}".format(item_identifier, error))
+            return item_identifier, None
+
+        return item_identifier, [(bot, bad_bots_output['bot_confidence_score']) for bot in bots]
+
+    @staticmethod
+    def group_batch_addresses(scored_records) -> dict:
+        """ Returns the unique addresses of the bots per IP set type, in order of detection """
+
+        addresses_by_type = {}
+
+        for _, bots in scored_records:
+            for bot, _ in bots or []:
+                addresses_by_type.setdefault(bot.source_ip_type.value, {})[
+                    ip_network(bot.source_ip_address).with_prefixlen] = None
+
+        return {ip_set_type: list(addresses) for ip_set_type, addresses in addresses_by_type.items()}
+
+    def update_batch_ip_set(self, ip_set_type, addresses):
+        """ Writes the addresses of a batch to an IP set, returns the merge result or None when the update failed """
+
+        try:
+            return self.ip_set_blocker.update_bad_bots_ip_set(SourceIPType(ip_set_type), addresses)
+
+        # pylint: disable=W0703
+        except Exception as error:
+            LOGGER.error(error)
+            return None
+
+    def remember_batch_bots(self, scored_records, updates) -> None:
+        """ Stores the verdicts of the bots of a batch whose IP set was updated """
+
+        bad_bots = BadBots(self.config, {})
+
+        for _, bots in scored_records:
+            for bot, score in bots or []:
+                if updates[bot.source_ip_type.value] is not None:
+                    bad_bots.remember_blocked_bot(bot, score)
+
+    @staticmethod
+    def create_batch_output(scored_records, updates) -> dict:
+        """ Returns the output of a batch with the records of the failed IP set updates as batch item failures """
+
+        batch_item_failures = []
+
+        for item_identifier, bots in scored_records:
+            if any(updates[bot.source_ip_type.value] is None for bot, _ in bots or []):
+                batch_item_failures.append({'itemIdentifier': item_identifier})
+
+        return {
+            "records": len(scored_records),
+            "bots": sum(len(bots) for _, bots in scored_records if bots is not None),
+            "dropped": sum(1 for _, bots in scored_records if bots is None),
+            "updates": updates,
+            "batchItemFailures": batch_item_failures
+        }
+
+    @staticmethod
+    def get_record_identifier(record) -> str:
+        """ Returns the identifier of an SQS record (message ID) or Kinesis record (sequence number) as used in batch
+            item failures """
+
+        if 'kinesis' in record:
+            return record['kinesis']['sequenceNumber']
+
+        return record['messageId']
+
+    @staticmethod
+    def decode_record(record) -> dict:
+        """ Returns the API Gateway event of an SQS record (JSON body) or Kinesis record (base64 encoded JSON data) """
+
+        if 'kinesis' in record:
+            return json.loads(base64.b64decode(record['kinesis']['data']))
+
+        return json.loads(record['body'])
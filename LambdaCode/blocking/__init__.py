@@ -0,0 +1,12 @@
+# pylint: disable=C0111
+from .block_queue import BlockQueue
+from .block_queue_flusher import BlockQueueFlusher
+from .sqs_block_queue import SQSBlockQueue
+from .sqs_block_queue import SQSBlockBatch
+from .block_expiry_index import BlockExpiryIndex
+from .dynamodb_block_expiry_index import DynamoDBBlockExpiryIndex
+from .block_sweeper import BlockSweeper
+from .ip_set_shard_manager import IPSetShardManager
+from .block_publisher import BlockPublisher
+from .block_publisher import FanOutTarget
+from .ip_set_blocker import IPSetBlocker
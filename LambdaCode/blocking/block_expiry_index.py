@@ -0,0 +1,103 @@
+""" This file contains the BlockExpiryIndex class """
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class BlockExpiryIndex:
+    """ This class is a side-car index holding the expiry time of every address added to a bad bots IP set. It is a
+        compact SQLite table keyed by IP set type and address, blocking an address again extends its expiry. The file is
+        local to the container, the deployed functions share the DynamoDBBlockExpiryIndex instead. """
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+
+        index_directory = os.path.dirname(index_path)
+
+        if index_directory:
+            os.makedirs(index_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(index_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS block_expiries (ip_set_type TEXT NOT NULL, '
+                                 'address TEXT NOT NULL, expires_at REAL NOT NULL, '
+                                 'PRIMARY KEY (ip_set_type, address)) WITHOUT ROWID')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS block_expiries_expires_at '
+                                 'ON block_expiries (ip_set_type, expires_at)')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_index(cls, index_path) -> 'BlockExpiryIndex':
+        """ Returns the index of the given path, opened once per container """
+
+        with cls._indexes_lock:
+            expiry_index = cls._indexes.get(index_path)
+
+            if expiry_index is None:
+                expiry_index = BlockExpiryIndex(index_path)
+                cls._indexes[index_path] = expiry_index
+
+            return expiry_index
+
+    @classmethod
+    def close_all(cls) -> None:
+        """ Closes all indexes opened by this container """
+
+        with cls._indexes_lock:
+            for expiry_index in cls._indexes.values():
+                expiry_index.close()
+
+            cls._indexes.clear()
+
+    def close(self) -> None:
+        """ Closes the database connection """
+
+        with self._lock:
+            self._connection.close()
+
+    def record(self, ip_set_type, addresses, ttl_in_seconds) -> None:
+        """ Stores the expiry time of blocked addresses, replacing the expiry of addresses that were blocked before """
+
+        expires_at = time.time() + ttl_in_seconds
+
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO block_expiries (ip_set_type, address, expires_at) '
+                                         'VALUES (?, ?, ?)', [(ip_set_type, address, expires_at)
+                                                              for address in addresses])
+
+    def get_ip_set_types(self) -> list:
+        """ Returns the IP set types that have addresses in the index """
+
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT DISTINCT ip_set_type FROM block_expiries')]
+
+    def get_expired(self, ip_set_type, now=None) -> list:
+        """ Returns the expired blocks of an IP set type as (address, expires_at) entries """
+
+        now = time.time() if now is None else now
+
+        with self._lock:
+            return self._connection.execute(
+                'SELECT address, expires_at FROM block_expiries WHERE ip_set_type = ? AND expires_at <= ?',
+                (ip_set_type, now)).fetchall()
+
+    def remove(self, ip_set_type, entries) -> None:
+        """ Removes (address, expires_at) entries from the index. An address that was blocked again after it was read
+            has a new expiry and is kept. """
+
+        with self._lock:
+            self._connection.executemany('DELETE FROM block_expiries WHERE ip_set_type = ? AND address = ? AND '
+                                         'expires_at = ?', [(ip_set_type, address, expires_at)
+                                                            for address, expires_at in entries])
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM block_expiries').fetchone()[0]
@@ -0,0 +1,169 @@
+""" This file contains the BlockPublisher class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import threading
+import time
+from collections import namedtuple
+from utilities import ConfigHelper
+from utilities import IPSetMerger
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+# An IP set in another region and / or scope that receives every block as well
+FanOutTarget = namedtuple('FanOutTarget', ['region_name', 'scope', 'ip_set_name'])
+
+
+class BlockPublisher:
+    """ This class is responsible for fanning out block updates to the IP sets of other regions and scopes, for example
+        the REGIONAL web ACLs of several regions and a CLOUDFRONT web ACL. The targets are listed per IP version in the
+        FAN_OUT config section as region/scope/name. All targets are updated concurrently in a thread pool shared by
+        the container, with a client per region. A target that does not finish within TIMEOUT_SECONDS is reported as
+        timed out: Lambda freezes the environment once the handler returns, so its update is not guaranteed to finish
+        and has to be retried like a failed one. A failing target never fails the block. """
+
+    config_section_fan_out = 'FAN_OUT'
+
+    # CloudFront IP sets can only be managed in us-east-1
+    cloudfront_region_name = 'us-east-1'
+
+    _executor = None
+    _lock = threading.Lock()
+
+    def __init__(self, config, ip_set_type, get_connection_function):
+        self.config = config
+        self.ip_set_type = ip_set_type
+
+        # Called as get_connection_function(target), returns the AWSWAFv2Connection of the target
+        self.get_connection_function = get_connection_function
+
+        self.targets = self.parse_targets(ConfigHelper.get_list(config, self.config_section_fan_out,
+                                                                'TARGETS_{0}'.format(ip_set_type)))
+        self.timeout_in_seconds = ConfigHelper.get_float(config, self.config_section_fan_out, 'TIMEOUT_SECONDS', 5)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def parse_targets(cls, target_descriptions) -> list:
+        """ Parses region/scope/name descriptions. An empty region is the default region of the function, or us-east-1
+            for CLOUDFRONT. """
+
+        targets = []
+
+        for target_description in target_descriptions:
+            parts = target_description.split('/')
+
+            if len(parts) != 3 or not parts[2]:
+                raise ValueError('Fan out target must be region/scope/name: {0}'.format(target_description))
+
+            region_name, scope, ip_set_name = parts
+            scope = scope.upper()
+
+            if scope == 'CLOUDFRONT':
+                region_name = cls.cloudfront_region_name
+
+            targets.append(FanOutTarget(region_name or None, scope, ip_set_name))
+
+        return targets
+
+    @staticmethod
+    def get_target_name(target) -> str:
+        """ Returns the name of a target as used in the results """
+
+        return '{0}/{1}/{2}'.format(target.region_name or 'default', target.scope, target.ip_set_name)
+
+    @classmethod
+    def get_executor(cls, config) -> 'ThreadPoolExecutor':
+        """ Returns the thread pool of the container that runs the fan out """
+
+        with cls._lock:
+            if cls._executor is None:
+                # pylint: disable=C0415
+                from concurrent.futures import ThreadPoolExecutor
+
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=ConfigHelper.get_int(config, cls.config_section_fan_out, 'MAX_WORKERS', 8),
+                    thread_name_prefix='bad-bots-fan-out')
+
+        return cls._executor
+
+    def start(self, addresses, remove=False, targets=None) -> list:
+        """ Starts adding (or removing) the addresses on every target, or on the given targets, returns the pending
+            updates for wait """
+
+        targets = self.targets if targets is None else targets
+
+        if not targets:
+            return []
+
+        executor = self.get_executor(self.config)
+
+        return [(target, time.perf_counter(), executor.submit(self.update_target, target, addresses, remove))
+                for target in targets]
+
+    def update_target(self, target, addresses, remove) -> dict:
+        """ Merges the addresses into (or removes them from) the IP set of a target and returns the merge result """
+
+        if remove:
+            merge_function = lambda current_addresses: IPSetMerger.remove(current_addresses, addresses)[0]
+        else:
+            merge_function = lambda current_addresses: IPSetMerger.merge(current_addresses, addresses)
+
+        merge_result = self.get_connection_function(target).merge_ip_set(merge_function)
+        merge_result['completed_at'] = time.perf_counter()
+
+        return merge_result
+
+    def wait(self, pending_updates) -> list:
+        """ Waits for the pending updates, for at most the timeout in total, and returns the result per target """
+
+        if not pending_updates:
+            return []
+
+        # pylint: disable=C0415
+        from concurrent.futures import wait
+
+        wait([future for _, _, future in pending_updates], timeout=self.timeout_in_seconds)
+
+        results = []
+
+        for target, start_time, future in pending_updates:
+            result = {'target': self.get_target_name(target), 'success': False, 'updated': False, 'error': None,
+                      'fan_out_target': target}
+
+            if not future.done():
+                result['error'] = 'timed out'
+                result['latency_in_ms'] = (time.perf_counter() - start_time) * 1000
+
+            elif future.exception() is not None:
+                result['error'] = str(future.exception())
+                result['latency_in_ms'] = (time.perf_counter() - start_time) * 1000
+
+            else:
+                merge_result = future.result()
+                result.update(success=True, updated=merge_result['updated'],
+                              latency_in_ms=(merge_result['completed_at'] - start_time) * 1000)
+
+            if not result['success']:
+                # pylint: disable=W1202
+                LOGGER.error('Fan out to {0} failed: {1}'.format(result['target'], result['error']))
+
+            results.append(result)
+
+        return results
+
+    def publish(self, addresses, remove=False, targets=None) -> list:
+        """ Adds (or removes) the addresses on every target, or on the given targets, and returns the result per
+            target """
+
+        return self.wait(self.start(addresses, remove, targets))
+
+    @staticmethod
+    def get_failed_targets(results) -> list:
+        """ Returns the targets of the results that failed or timed out """
+
+        return [result['fan_out_target'] for result in results if not result['success']]
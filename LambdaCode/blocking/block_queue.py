@@ -0,0 +1,94 @@
+""" This file contains the BlockQueue class """
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class BlockQueue:
+    """ This class is a durable, file backed queue of addresses waiting to be added to a bad bots IP set. It is backed by
+        SQLite in write-ahead log mode, so pending blocks survive between invocations of the same container. The file is
+        local to the container, the deployed functions share blocks through the SQSBlockQueue instead. """
+
+    _queues = {}
+    _queues_lock = threading.Lock()
+
+    def __init__(self, queue_path):
+        self.queue_path = queue_path
+
+        queue_directory = os.path.dirname(queue_path)
+
+        if queue_directory:
+            os.makedirs(queue_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(queue_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS pending_blocks (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                                 'ip_set_type TEXT NOT NULL, address TEXT NOT NULL, enqueued_at REAL NOT NULL)')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_queue(cls, queue_path) -> 'BlockQueue':
+        """ Returns the queue of the given path, opened once per container """
+
+        with cls._queues_lock:
+            block_queue = cls._queues.get(queue_path)
+
+            if block_queue is None:
+                block_queue = BlockQueue(queue_path)
+                cls._queues[queue_path] = block_queue
+
+            return block_queue
+
+    @classmethod
+    def close_all(cls) -> None:
+        """ Closes all queues opened by this container """
+
+        with cls._queues_lock:
+            for block_queue in cls._queues.values():
+                block_queue.close()
+
+            cls._queues.clear()
+
+    def close(self) -> None:
+        """ Closes the database connection """
+
+        with self._lock:
+            self._connection.close()
+
+    def enqueue(self, ip_set_type, address) -> None:
+        """ Adds an address to the queue of the IP set type (IPV4 or IPV6) """
+
+        with self._lock:
+            self._connection.execute('INSERT INTO pending_blocks (ip_set_type, address, enqueued_at) VALUES (?, ?, ?)',
+                                     (ip_set_type, address, time.time()))
+
+    def get_statistics(self) -> dict:
+        """ Returns the number of pending blocks and the age in seconds of the oldest one """
+
+        with self._lock:
+            count, oldest_enqueued_at = self._connection.execute(
+                'SELECT COUNT(*), MIN(enqueued_at) FROM pending_blocks').fetchone()
+
+        return {
+            'pending': count,
+            'oldest_age_in_seconds': (time.time() - oldest_enqueued_at) if oldest_enqueued_at is not None else 0.0
+        }
+
+    def peek(self, limit) -> list:
+        """ Returns up to limit pending blocks as (id, ip_set_type, address) tuples, oldest first """
+
+        with self._lock:
+            return self._connection.execute('SELECT id, ip_set_type, address FROM pending_blocks ORDER BY id LIMIT ?',
+                                            (limit,)).fetchall()
+
+    def remove(self, block_ids) -> None:
+        """ Removes flushed blocks from the queue """
+
+        with self._lock:
+            self._connection.executemany('DELETE FROM pending_blocks WHERE id = ?',
+                                         [(block_id,) for block_id in block_ids])
@@ -0,0 +1,92 @@
+""" This file contains the BlockQueueFlusher class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import time
+from utilities import ConfigHelper
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class BlockQueueFlusher:
+    """ This class is responsible for moving pending blocks from the BlockQueue into the IP sets. All pending addresses
+        of an IP set are merged into one update, which is done once the queue holds enough blocks or the oldest block
+        has waited long enough. """
+
+    config_section_blocking = 'BLOCKING'
+
+    def __init__(self, config, block_queue, update_ip_set_function):
+        self.block_queue = block_queue
+
+        # Called as update_ip_set_function(ip_set_type, addresses) once per IP set
+        self.update_ip_set_function = update_ip_set_function
+
+        self.flush_max_batch_size = ConfigHelper.get_int(config, self.config_section_blocking, 'FLUSH_MAX_BATCH_SIZE',
+                                                         25)
+        self.flush_max_age_in_seconds = ConfigHelper.get_float(config, self.config_section_blocking,
+                                                               'FLUSH_MAX_AGE_SECONDS', 30)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def is_flush_due(self, statistics) -> bool:
+        """ Indicates whether the size or age threshold has been reached """
+
+        if statistics['pending'] == 0:
+            return False
+
+        return statistics['pending'] >= self.flush_max_batch_size or \
+            statistics['oldest_age_in_seconds'] >= self.flush_max_age_in_seconds
+
+    def flush_if_due(self) -> dict:
+        """ Flushes the queue when a threshold has been reached """
+
+        statistics = self.block_queue.get_statistics()
+
+        if not self.is_flush_due(statistics):
+            return {'flushed': 0, 'failed': 0, 'updates': 0, 'pending': statistics['pending']}
+
+        return self.flush()
+
+    def flush(self, limit=10000) -> dict:
+        """ Writes all pending blocks with one update per IP set. Blocks of an IP set whose update failed stay queued
+            for the next flush. """
+
+        start_time = time.perf_counter()
+
+        pending_blocks = self.block_queue.peek(limit)
+
+        # Group the pending addresses by IP set
+        pending_blocks_per_ip_set = {}
+
+        for block_id, ip_set_type, address in pending_blocks:
+            pending_blocks_per_ip_set.setdefault(ip_set_type, []).append((block_id, address))
+
+        flushed = 0
+        failed = 0
+
+        for ip_set_type, blocks in pending_blocks_per_ip_set.items():
+            try:
+                self.update_ip_set_function(ip_set_type, list(dict.fromkeys(address for _, address in blocks)))
+
+            # pylint: disable=W0703
+            except Exception as error:
+                # pylint: disable=W1202
+                LOGGER.error('Could not flush {0} blocks to the {1} IP set: {2}'.format(len(blocks), ip_set_type,
+                                                                                       error))
+                failed += len(blocks)
+                continue
+
+            self.block_queue.remove([block_id for block_id, _ in blocks])
+            flushed += len(blocks)
+
+        return {
+            'flushed': flushed,
+            'failed': failed,
+            'updates': len(pending_blocks_per_ip_set),
+            'pending': self.block_queue.get_statistics()['pending'],
+            'duration_in_ms': (time.perf_counter() - start_time) * 1000
+        }
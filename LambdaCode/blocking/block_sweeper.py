@@ -0,0 +1,84 @@
+""" This file contains the BlockSweeper class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import time
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class BlockSweeper:
+    """ This class is responsible for removing expired blocks from the bad bots IP sets. All expired addresses of an IP
+        set (shard) are removed with a single read-modify-write. An expired block is only dropped from the index once
+        its address is no longer blocked, addresses that are still covered by another entry or that a fan out target
+        failed to remove are retried by the next sweep. """
+
+    def __init__(self, expiry_index, remove_function):
+        self.expiry_index = expiry_index
+
+        # Called as remove_function(ip_set_type, addresses), returns the entries that were removed from the IP sets, the
+        # addresses that are still blocked and the result per fan out target
+        self.remove_function = remove_function
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def sweep(self, now=None) -> dict:
+        """ Removes all expired addresses and returns the number of removed entries per IP set type """
+
+        start_time = time.perf_counter()
+
+        removed = {}
+        retained = {}
+        failed = {}
+        fan_out_failed = {}
+
+        for ip_set_type in self.expiry_index.get_ip_set_types():
+            expired_entries = self.expiry_index.get_expired(ip_set_type, now)
+
+            if not expired_entries:
+                continue
+
+            expired_addresses = list(dict.fromkeys(address for address, _ in expired_entries))
+
+            try:
+                remove_result = self.remove_function(ip_set_type, expired_addresses)
+
+            # pylint: disable=W0703
+            except Exception as error:
+                # pylint: disable=W1202
+                LOGGER.error('Could not sweep {0} expired blocks from the {1} IP set: {2}'.format(
+                    len(expired_addresses), ip_set_type, error))
+                failed[ip_set_type] = len(expired_addresses)
+                continue
+
+            # Entries whose address is no longer listed are dropped, also when it was removed by hand. Entries are
+            # deleted by address and expiry, so blocks recorded again since they were read are kept.
+            retained_addresses = set(remove_result['retained'])
+            self.expiry_index.remove(ip_set_type, [entry for entry in expired_entries
+                                                   if entry[0] not in retained_addresses])
+
+            removed[ip_set_type] = len(remove_result['removed'])
+
+            failed_targets = [result['target'] for result in remove_result.get('fan_out', []) if not result['success']]
+
+            if failed_targets:
+                fan_out_failed[ip_set_type] = failed_targets
+
+            if retained_addresses:
+                # pylint: disable=W1202
+                LOGGER.warning('{0} expired blocks are still blocked in the {1} IP sets.'.format(
+                    len(retained_addresses), ip_set_type))
+                retained[ip_set_type] = len(retained_addresses)
+
+        return {
+            'removed': removed,
+            'removed_total': sum(removed.values()),
+            'retained': retained,
+            'failed': failed,
+            'fan_out_failed': fan_out_failed,
+            'duration_in_ms': (time.perf_counter() - start_time) * 1000
+        }
@@ -0,0 +1,121 @@
+""" This file contains the DynamoDBBlockExpiryIndex class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import threading
+import time
+from connection import AWSConnection
+
+
+class DynamoDBBlockExpiryIndex:
+    """ This class is the side-car index of block expiries in a DynamoDB table, shared by the functions that block and
+        the sweeper. Items are keyed by IP set type and address, blocking an address again overwrites its expiry. The
+        expired blocks of an IP set type are queried from the expires_at global secondary index. An entry is only
+        deleted while it still has the expiry that was read, so a block recorded again during a sweep is kept. """
+
+    # The IP set types are the partition keys, so they are known without scanning the table
+    ip_set_types = ['IPV4', 'IPV6']
+
+    # Name of the global secondary index keyed by IP set type and expiry
+    expires_at_index_name = 'expires_at'
+
+    # Maximum number of items of a BatchWriteItem request
+    max_batch_size = 25
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, table_name, dynamodb_client=None):
+        self.table_name = table_name
+        self.dynamodb_client = dynamodb_client or AWSConnection().get_connection('dynamodb')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_index(cls, table_name) -> 'DynamoDBBlockExpiryIndex':
+        """ Returns the index of the given table, created once per container """
+
+        with cls._indexes_lock:
+            expiry_index = cls._indexes.get(table_name)
+
+            if expiry_index is None:
+                expiry_index = DynamoDBBlockExpiryIndex(table_name)
+                cls._indexes[table_name] = expiry_index
+
+            return expiry_index
+
+    @classmethod
+    def close_all(cls) -> None:
+        """ Forgets the indexes of this container """
+
+        with cls._indexes_lock:
+            cls._indexes.clear()
+
+    def record(self, ip_set_type, addresses, ttl_in_seconds) -> None:
+        """ Stores the expiry time of blocked addresses, replacing the expiry of addresses that were blocked before """
+
+        expires_at = repr(time.time() + ttl_in_seconds)
+        put_requests = [{'PutRequest': {'Item': {'ip_set_type': {'S': ip_set_type}, 'address': {'S': address},
+                                                 'expires_at': {'N': expires_at}}}}
+                        for address in dict.fromkeys(addresses)]
+
+        for start in range(0, len(put_requests), self.max_batch_size):
+            request_items = {self.table_name: put_requests[start:start + self.max_batch_size]}
+
+            # Items DynamoDB could not write right away are handed back and written again after a short pause
+            attempt = 0
+
+            while request_items:
+                if attempt > 0:
+                    time.sleep(min(0.05 * 2 ** attempt, 1))
+
+                request_items = self.dynamodb_client.batch_write_item(RequestItems=request_items).get(
+                    'UnprocessedItems')
+                attempt += 1
+
+    def get_ip_set_types(self) -> list:
+        """ Returns the IP set types that can have addresses in the index """
+
+        return list(self.ip_set_types)
+
+    def get_expired(self, ip_set_type, now=None) -> list:
+        """ Returns the expired blocks of an IP set type as (address, expires_at) entries """
+
+        now = time.time() if now is None else now
+
+        query_arguments = {
+            'TableName': self.table_name,
+            'IndexName': self.expires_at_index_name,
+            'KeyConditionExpression': 'ip_set_type = :ip_set_type AND expires_at <= :now',
+            'ExpressionAttributeValues': {':ip_set_type': {'S': ip_set_type}, ':now': {'N': repr(now)}},
+            'ProjectionExpression': 'address, expires_at'
+        }
+
+        expired_entries = []
+
+        while True:
+            query_result = self.dynamodb_client.query(**query_arguments)
+
+            expired_entries.extend((item['address']['S'], item['expires_at']['N']) for item in query_result['Items'])
+
+            if 'LastEvaluatedKey' not in query_result:
+                return expired_entries
+
+            query_arguments['ExclusiveStartKey'] = query_result['LastEvaluatedKey']
+
+    def remove(self, ip_set_type, entries) -> None:
+        """ Removes (address, expires_at) entries from the index. An address that was blocked again after it was read
+            has a new expiry and is kept. """
+
+        for address, expires_at in entries:
+            try:
+                self.dynamodb_client.delete_item(TableName=self.table_name,
+                                                 Key={'ip_set_type': {'S': ip_set_type}, 'address': {'S': address}},
+                                                 ConditionExpression='expires_at = :expires_at',
+                                                 ExpressionAttributeValues={':expires_at': {'N': expires_at}})
+
+            # pylint: disable=W0703
+            except Exception as error:
+                if AWSConnection.get_error_code(error) != 'ConditionalCheckFailedException':
+                    raise
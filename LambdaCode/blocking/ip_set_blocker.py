@@ -0,0 +1,276 @@
+""" This file contains the IPSetBlocker class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import os
+from models import SourceIPType
+from cache import BlockSetSnapshot
+from connection import AWSWAFv2Connection
+from utilities import ConfigHelper
+from blocking.block_queue import BlockQueue
+from blocking.block_queue_flusher import BlockQueueFlusher
+from blocking.block_expiry_index import BlockExpiryIndex
+from blocking.dynamodb_block_expiry_index import DynamoDBBlockExpiryIndex
+from blocking.block_sweeper import BlockSweeper
+from blocking.ip_set_shard_manager import IPSetShardManager
+from blocking.block_publisher import BlockPublisher
+from blocking.block_publisher import FanOutTarget
+from blocking.sqs_block_queue import SQSBlockQueue
+from blocking.sqs_block_queue import SQSBlockBatch
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class IPSetBlocker:
+    """ This class is responsible for writing blocks to the bad bots IP sets and removing them again. A block is merged
+        into the shard of its address, fanned out to the IP sets of other regions and scopes, kept in the block set
+        snapshot and recorded in the expiry index. Queued blocks, fan out retries, the sweep of expired blocks and the
+        rebalance of the shards all go through it as well. """
+
+    config_section_blocking = 'BLOCKING'
+
+    def __init__(self, config):
+        self.config = config
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def update_bad_bots_ip_set(self, source_ip_type, source_ip_address_list) -> dict:
+        """ Updates the bad bots IP sets (shards) of the IP address type and the fan out targets. Returns whether any
+            shard was written, the merge result per shard and the result per fan out target. """
+
+        collapse = ConfigHelper.get_bool(self.config, AWSWAFv2Connection.config_section_waf,
+                                         'COLLAPSE_ADJACENT_PREFIXES')
+
+        # The IP sets of other regions and scopes are updated in the background while the own IP sets are written
+        block_publisher = self.get_block_publisher(source_ip_type)
+        pending_fan_out = block_publisher.start(source_ip_address_list)
+
+        try:
+            # Merge the new entries into the current block list of their shard and update each shard with a single
+            # read. Nothing is written when the entries are already covered. Conflicting writes of concurrent
+            # invocations are retried by the connection.
+            merge_results = self.get_ip_set_shard_manager(source_ip_type).add_addresses(source_ip_address_list,
+                                                                                        collapse)
+
+            # Keep the addresses of this version of the IP sets, so repeat requests of blocked addresses skip WAF
+            self.update_block_snapshots(merge_results)
+
+            # Remember when the blocks expire so the sweeper can remove them again
+            block_ttl_in_seconds = ConfigHelper.get_float(self.config, self.config_section_blocking,
+                                                          'BLOCK_TTL_SECONDS', 0)
+
+            if block_ttl_in_seconds > 0:
+                self.get_block_expiry_index().record(source_ip_type.value, source_ip_address_list,
+                                                     block_ttl_in_seconds)
+
+        finally:
+            # The fan out is collected even when a shard write failed. Targets that failed or did not finish in time
+            # are written again by the flush function.
+            fan_out_results = block_publisher.wait(pending_fan_out)
+            self.queue_fan_out_retries(source_ip_type, source_ip_address_list, fan_out_results)
+
+        return {
+            'updated': any(merge_result['updated'] for merge_result in merge_results.values()),
+            'shards': merge_results,
+            'fan_out': fan_out_results
+        }
+
+    def remove_from_bad_bots_ip_sets(self, source_ip_type, source_ip_address_list) -> dict:
+        """ Removes addresses from the bad bots IP sets (shards) of the IP address type and the fan out targets. Returns
+            the entries that were removed from the own IP sets, the addresses that are still blocked and the result per
+            fan out target. When a target failed or timed out all addresses count as still blocked, so the sweeper keeps
+            their expiry and removes them again with the next sweep. """
+
+        block_publisher = self.get_block_publisher(source_ip_type)
+        pending_fan_out = block_publisher.start(source_ip_address_list, remove=True)
+
+        try:
+            removed_addresses, retained_addresses, merge_results = self.get_ip_set_shard_manager(
+                source_ip_type).remove_addresses(source_ip_address_list)
+
+            # Removed addresses are no longer reported as blocked by the snapshots of this container
+            self.update_block_snapshots(merge_results)
+
+        finally:
+            # When a shard failed the sweeper keeps the expiry, the targets are collected before the error is raised
+            fan_out_results = block_publisher.wait(pending_fan_out)
+
+        if BlockPublisher.get_failed_targets(fan_out_results):
+            retained_addresses = list(dict.fromkeys(retained_addresses + list(source_ip_address_list)))
+
+        return {
+            'removed': removed_addresses,
+            'retained': retained_addresses,
+            'fan_out': fan_out_results
+        }
+
+    def update_block_snapshots(self, merge_results) -> None:
+        """ Replaces the block set snapshots of the shards with the addresses they were merged to """
+
+        if not BlockSetSnapshot.is_enabled(self.config):
+            return
+
+        scope = self.config[AWSWAFv2Connection.config_section_waf]['IP_SET_BAD_BOTS_SCOPE']
+
+        for shard_name, merge_result in merge_results.items():
+            BlockSetSnapshot.update((scope, shard_name), merge_result['addresses'], merge_result['lock_token'])
+
+    def get_block_queue(self):
+        """ Returns the block queue of the buffered blocking mode: the SQS queue of QUEUE_URL (or the
+            BAD_BOTS_BLOCK_QUEUE_URL environment variable set by the template), otherwise the file backed queue of the
+            container """
+
+        queue_url = self.get_block_queue_url()
+
+        if queue_url:
+            return SQSBlockQueue(queue_url)
+
+        return BlockQueue.get_queue(ConfigHelper.get_value(self.config, self.config_section_blocking, 'QUEUE_PATH',
+                                                           '/tmp/bad_bots_block_queue.sqlite3'))
+
+    def get_block_queue_url(self) -> str:
+        """ Returns the URL of the SQS block queue, empty when blocks are not queued in SQS """
+
+        return ConfigHelper.get_value(self.config, self.config_section_blocking, 'QUEUE_URL', '') or \
+            os.environ.get('BAD_BOTS_BLOCK_QUEUE_URL', '')
+
+    def get_block_queue_flusher(self, block_queue) -> BlockQueueFlusher:
+        """ Returns a flusher that writes the queued blocks with one update per IP set """
+
+        return BlockQueueFlusher(self.config, block_queue,
+                                 lambda ip_set_type, addresses: self.update_bad_bots_ip_set(
+                                     SourceIPType(ip_set_type), addresses))
+
+    def flush_block_records(self, records) -> dict:
+        """ Writes the blocks delivered by the SQS block queue with one update per IP set. Returns the flush output
+            with the blocks of failed updates as batch item failures. """
+
+        block_batch = SQSBlockBatch(records)
+        flush_output = self.get_block_queue_flusher(block_batch).flush()
+        flush_output['fan_out_retries'] = self.retry_fan_out(block_batch)
+        flush_output['dropped'] = len(block_batch.dropped_message_ids)
+        flush_output['batchItemFailures'] = block_batch.get_batch_item_failures()
+
+        return flush_output
+
+    def retry_fan_out(self, block_batch) -> dict:
+        """ Writes the queued fan out retries of a batch, with one update per target. Retries of a target that fails
+            again stay in the batch and are delivered again by SQS. Returns the number of retried and failed
+            addresses. """
+
+        retried = 0
+        failed = 0
+
+        for (ip_set_type, target), entries in block_batch.get_fan_out_retries().items():
+            fan_out_results = self.get_block_publisher(SourceIPType(ip_set_type)).publish(
+                [address for _, address in entries], targets=[FanOutTarget(*target)])
+
+            if BlockPublisher.get_failed_targets(fan_out_results):
+                failed += len(entries)
+                continue
+
+            block_batch.remove([message_id for message_id, _ in entries])
+            retried += len(entries)
+
+        return {'retried': retried, 'failed': failed}
+
+    def queue_fan_out_retries(self, source_ip_type, source_ip_address_list, fan_out_results) -> None:
+        """ Queues the addresses of fan out targets that failed or timed out in the SQS block queue, so the flush
+            function writes them to the target again. Without an SQS queue the target only catches up with the next
+            block of the same addresses. """
+
+        failed_targets = BlockPublisher.get_failed_targets(fan_out_results)
+
+        if not failed_targets:
+            return
+
+        queue_url = self.get_block_queue_url()
+
+        if not queue_url:
+            # pylint: disable=W1202
+            LOGGER.warning('No block queue to retry the fan out of {0} addresses to {1} targets.'.format(
+                len(source_ip_address_list), len(failed_targets)))
+            return
+
+        block_queue = SQSBlockQueue(queue_url)
+
+        for fan_out_result in fan_out_results:
+            if fan_out_result['success']:
+                continue
+
+            for address in source_ip_address_list:
+                block_queue.enqueue(source_ip_type.value, address, fan_out_result['fan_out_target'])
+
+            fan_out_result['retry'] = 'queued'
+
+    def get_ip_set_key(self, source_ip_type, address) -> tuple:
+        """ Returns the (scope, name) of the bad bots IP set (shard) holding the address, without calling WAF """
+
+        return self.config[AWSWAFv2Connection.config_section_waf]['IP_SET_BAD_BOTS_SCOPE'], \
+            self.get_ip_set_shard_manager(source_ip_type).get_shard(address)
+
+    def get_ip_set_shard_manager(self, source_ip_type) -> IPSetShardManager:
+        """ Returns the manager of the bad bots IP sets (shards) of the IP address type """
+
+        return IPSetShardManager(self.config, source_ip_type.value,
+                                 lambda ip_set_name: AWSWAFv2Connection(self.config, source_ip_type,
+                                                                        ip_set_name=ip_set_name))
+
+    def get_block_publisher(self, source_ip_type) -> BlockPublisher:
+        """ Returns the publisher of the blocks of the IP address type to the IP sets of other regions and scopes """
+
+        return BlockPublisher(self.config, source_ip_type.value,
+                              lambda target: AWSWAFv2Connection(self.config, source_ip_type,
+                                                                ip_set_name=target.ip_set_name,
+                                                                ip_set_scope=target.scope,
+                                                                region_name=target.region_name))
+
+    def get_ip_set_connection(self, source_ip_type) -> AWSWAFv2Connection:
+        """ Returns the connection to the bad bots IP set of the IP address type """
+
+        return AWSWAFv2Connection(self.config, source_ip_type)
+
+    def get_block_expiry_index(self):
+        """ Returns the index holding the expiry time of the blocks: the DynamoDB table of EXPIRY_INDEX_TABLE (or the
+            BAD_BOTS_EXPIRY_INDEX_TABLE environment variable set by the template), otherwise the file backed index of
+            the container """
+
+        table_name = ConfigHelper.get_value(self.config, self.config_section_blocking, 'EXPIRY_INDEX_TABLE', '') or \
+            os.environ.get('BAD_BOTS_EXPIRY_INDEX_TABLE', '')
+
+        if table_name:
+            return DynamoDBBlockExpiryIndex.get_index(table_name)
+
+        return BlockExpiryIndex.get_index(ConfigHelper.get_value(self.config, self.config_section_blocking,
+                                                                 'EXPIRY_INDEX_PATH',
+                                                                 '/tmp/bad_bots_block_expiry.sqlite3'))
+
+    def sweep_expired_blocks(self, now=None) -> dict:
+        """ Removes all expired blocks from the bad bots IP sets, with one read-modify-write per IP set """
+
+        block_sweeper = BlockSweeper(self.get_block_expiry_index(),
+                                     lambda ip_set_type, addresses: self.remove_from_bad_bots_ip_sets(
+                                         SourceIPType(ip_set_type), addresses))
+
+        return block_sweeper.sweep(now)
+
+    def rebalance_ip_sets(self, dry_run=False) -> dict:
+        """ Moves the entries of the bad bots IP sets to the shard they are placed in, per IP address type """
+
+        rebalance_output = {}
+        scope = self.config[AWSWAFv2Connection.config_section_waf]['IP_SET_BAD_BOTS_SCOPE']
+
+        for source_ip_type in SourceIPType:
+            ip_set_shard_manager = self.get_ip_set_shard_manager(source_ip_type)
+            rebalance_output[source_ip_type.value] = ip_set_shard_manager.rebalance(dry_run)
+
+            # Entries moved to another shard are dropped from the snapshots with the IP sets, the next write takes new ones
+            if not dry_run:
+                for shard_name in ip_set_shard_manager.shard_names:
+                    BlockSetSnapshot.invalidate((scope, shard_name))
+
+        return rebalance_output
@@ -0,0 +1,209 @@
+""" This file contains the IPSetShardManager class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import hashlib
+import logging
+from ipaddress import ip_network
+from utilities import ConfigHelper
+from utilities import IPSetMerger
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class IPSetShardManager:
+    """ This class is responsible for spreading the blocked addresses of an IP version over several WAF IP sets (shards),
+        so blocking does not stop at the address limit of a single IP set. Addresses are placed by rendezvous hashing of
+        their prefix (SHARD_PREFIX_LENGTH_IPV4 / _IPV6), so neighbouring addresses share a shard and adding a shard only
+        moves the addresses that the new shard wins. Every write touches only the shards of its addresses, writes to
+        different shards run in parallel. Without IP_SET_BAD_BOTS_IPV4_SHARDS / _IPV6_SHARDS in the AWS_WAF config
+        section, the single IP set of IP_SET_BAD_BOTS_IPV4_NAME / _IPV6_NAME is the only shard. """
+
+    config_section_waf = 'AWS_WAF'
+
+    default_prefix_lengths = {'IPV4': 24, 'IPV6': 64}
+
+    def __init__(self, config, ip_set_type, get_connection_function):
+        self.config = config
+        self.ip_set_type = ip_set_type
+
+        # Called as get_connection_function(ip_set_name), returns the AWSWAFv2Connection of a shard
+        self.get_connection_function = get_connection_function
+        self._connections = {}
+
+        self.shard_names = ConfigHelper.get_list(config, self.config_section_waf,
+                                                 'IP_SET_BAD_BOTS_{0}_SHARDS'.format(ip_set_type)) or \
+            [config[self.config_section_waf]['IP_SET_BAD_BOTS_{0}_NAME'.format(ip_set_type)]]
+
+        self.prefix_length = ConfigHelper.get_int(config, self.config_section_waf,
+                                                  'SHARD_PREFIX_LENGTH_{0}'.format(ip_set_type),
+                                                  self.default_prefix_lengths[ip_set_type])
+        self.max_workers = ConfigHelper.get_int(config, self.config_section_waf, 'SHARD_MAX_WORKERS', 4)
+        self.max_addresses = ConfigHelper.get_int(config, self.config_section_waf, 'SHARD_MAX_ADDRESSES', 10000)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def get_connection(self, shard_name):
+        """ Returns the connection to a shard, created once per manager """
+
+        connection = self._connections.get(shard_name)
+
+        if connection is None:
+            connection = self._connections[shard_name] = self.get_connection_function(shard_name)
+
+        return connection
+
+    def get_shard(self, address) -> str:
+        """ Returns the name of the shard of an address or network, given as a string or an ipaddress object. The shard
+            with the highest hash of (shard, prefix) wins, so the placement does not depend on the order of the shards.
+            A network shorter than the shard prefix is placed by itself, add_addresses never aggregates addresses into
+            such a network. """
+
+        if len(self.shard_names) == 1:
+            return self.shard_names[0]
+
+        network = ip_network(address, strict=False)
+
+        if network.prefixlen > self.prefix_length:
+            network = network.supernet(new_prefix=self.prefix_length)
+
+        placement_key = network.with_prefixlen.encode('ascii')
+
+        return max(self.shard_names, key=lambda shard_name: hashlib.blake2b(
+            shard_name.encode('utf-8') + b'|' + placement_key, digest_size=8).digest())
+
+    def group_by_shard(self, addresses) -> dict:
+        """ Returns the addresses per shard, in their original order """
+
+        addresses_by_shard = {}
+
+        for address in addresses:
+            addresses_by_shard.setdefault(self.get_shard(address), []).append(address)
+
+        return addresses_by_shard
+
+    def run_per_shard(self, shard_function, items_by_shard) -> dict:
+        """ Calls shard_function(shard_name, items) for every shard, in parallel when more than one shard is involved.
+            Returns the result per shard. When a shard fails, the other shards are still completed before the first
+            error is raised. """
+
+        if len(items_by_shard) <= 1:
+            return {shard_name: shard_function(shard_name, items) for shard_name, items in items_by_shard.items()}
+
+        # Imported on first use, most containers only ever write a single shard
+        # pylint: disable=C0415
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items_by_shard))) as executor:
+            futures = {shard_name: executor.submit(shard_function, shard_name, items)
+                       for shard_name, items in items_by_shard.items()}
+
+        errors = [future.exception() for future in futures.values() if future.exception() is not None]
+
+        if errors:
+            raise errors[0]
+
+        return {shard_name: future.result() for shard_name, future in futures.items()}
+
+    def add_addresses(self, addresses, collapse=False) -> dict:
+        """ Merges new addresses into their shards with one read-modify-write per affected shard. Returns the merge
+            result per shard (see AWSWAFv2Connection.merge_ip_set). With several shards, collapse does not aggregate
+            beyond the shard prefix, so an aggregated network stays in the shard of the addresses it covers. """
+
+        min_prefix_length = self.prefix_length if len(self.shard_names) > 1 else None
+
+        def add_to_shard(shard_name, shard_addresses):
+            return self.get_connection(shard_name).merge_ip_set(lambda current_addresses: IPSetMerger.merge(
+                current_addresses, shard_addresses, collapse, min_prefix_length))
+
+        return self.run_per_shard(add_to_shard, self.group_by_shard(addresses))
+
+    def remove_addresses(self, addresses) -> tuple:
+        """ Removes addresses from their shards with one read-modify-write per affected shard. Returns the entries that
+            were actually removed, the addresses that are still blocked, because they are covered by another entry
+            such as a network aggregated with COLLAPSE_ADJACENT_PREFIXES, and the merge result per shard. """
+
+        def remove_from_shard(shard_name, shard_addresses):
+            removed_from_shard = []
+            retained_in_shard = []
+
+            def remove(current_addresses):
+                remaining_addresses, removed_addresses = IPSetMerger.remove(current_addresses, shard_addresses)
+                remaining_networks = set(IPSetMerger.to_networks(
+                    current_addresses if remaining_addresses is None else remaining_addresses))
+                prefix_lengths = sorted({network.prefixlen for network in remaining_networks})
+
+                removed_from_shard[:] = removed_addresses
+                retained_in_shard[:] = [address for address in shard_addresses if IPSetMerger.is_covered(
+                    ip_network(address, strict=False), remaining_networks, prefix_lengths)]
+
+                return remaining_addresses
+
+            merge_result = self.get_connection(shard_name).merge_ip_set(remove)
+
+            return removed_from_shard, retained_in_shard, merge_result
+
+        results_by_shard = self.run_per_shard(remove_from_shard, self.group_by_shard(addresses))
+
+        return [removed_address for removed_addresses, _, _ in results_by_shard.values()
+                for removed_address in removed_addresses], \
+            [retained_address for _, retained_addresses, _ in results_by_shard.values()
+             for retained_address in retained_addresses], \
+            {shard_name: merge_result for shard_name, (_, _, merge_result) in results_by_shard.items()}
+
+    def rebalance(self, dry_run=False) -> dict:
+        """ Moves every entry to the shard it is placed in, for example after shards were added or removed. Entries are
+            added to their new shard before they are removed from their old shard, so no address is unblocked during
+            the move. Shards that are no longer configured are not read, drain them before removing them from the
+            config. """
+
+        current_addresses_by_shard = self.run_per_shard(
+            lambda shard_name, _: self.get_connection(shard_name).retrieve_ip_set()["IPSet"]["Addresses"],
+            {shard_name: None for shard_name in self.shard_names})
+
+        additions = {}
+        removals = {}
+        target_sizes = {shard_name: 0 for shard_name in self.shard_names}
+
+        for shard_name, current_addresses in current_addresses_by_shard.items():
+            for address in current_addresses:
+                target_shard_name = self.get_shard(address)
+                target_sizes[target_shard_name] += 1
+
+                if target_shard_name != shard_name:
+                    additions.setdefault(target_shard_name, []).append(address)
+                    removals.setdefault(shard_name, []).append(address)
+
+        full_shards = [shard_name for shard_name, size in target_sizes.items() if size > self.max_addresses]
+
+        if full_shards:
+            raise ValueError('Shards {0} would exceed {1} addresses, add shards before rebalancing'.format(
+                ', '.join(full_shards), self.max_addresses))
+
+        rebalance_output = {
+            'moved': sum(len(addresses) for addresses in additions.values()),
+            'dry_run': dry_run,
+            'shards': {shard_name: {'entries_before': len(current_addresses_by_shard[shard_name]),
+                                    'entries_after': target_sizes[shard_name],
+                                    'added': len(additions.get(shard_name, [])),
+                                    'removed': len(removals.get(shard_name, []))}
+                       for shard_name in self.shard_names}
+        }
+
+        if dry_run or not additions:
+            return rebalance_output
+
+        self.run_per_shard(lambda shard_name, addresses: self.get_connection(shard_name).merge_ip_set(
+            lambda current_addresses: IPSetMerger.merge(current_addresses, addresses)), additions)
+
+        self.run_per_shard(lambda shard_name, addresses: self.get_connection(shard_name).merge_ip_set(
+            lambda current_addresses: IPSetMerger.remove(current_addresses, addresses)[0]), removals)
+
+        # pylint: disable=W1202
+        LOGGER.info('Rebalanced {0} shards of the {1} IP sets, moved {2} entries.'.format(
+            len(self.shard_names), self.ip_set_type, rebalance_output['moved']))
+
+        return rebalance_output
@@ -0,0 +1,132 @@
+""" This file contains the SQSBlockQueue and SQSBlockBatch classes """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import json
+import logging
+import time
+from ipaddress import ip_network
+from connection import AWSConnection
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class SQSBlockQueue:
+    """ This class is a queue of addresses waiting to be added to a bad bots IP set, backed by an SQS queue. Unlike the
+        file backed BlockQueue it is shared by all containers, so queued blocks survive the container that queued them.
+        The queue triggers the flush function, the batch size and batching window of that trigger take the place of the
+        size and age thresholds. """
+
+    def __init__(self, queue_url, sqs_client=None):
+        self.queue_url = queue_url
+        self.sqs_client = sqs_client or AWSConnection().get_connection('sqs')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def enqueue(self, ip_set_type, address, target=None) -> None:
+        """ Sends an address to the queue of the IP set type (IPV4 or IPV6). With a fan out target (region, scope,
+            name) the address is only written to that target, to retry a fan out that failed or timed out. """
+
+        message = {
+            'ip_set_type': ip_set_type,
+            'address': address,
+            'enqueued_at': time.time()
+        }
+
+        if target is not None:
+            message['target'] = list(target)
+
+        self.sqs_client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(message))
+
+
+class SQSBlockBatch:
+    """ This class holds the queued blocks delivered to one invocation of the flush function. It offers the peek and
+        remove methods of BlockQueue, so the BlockQueueFlusher writes them with one update per IP set. Retries of a fan
+        out target are kept apart, see get_fan_out_retries. Blocks that were not removed are reported as batch item
+        failures and delivered again by SQS. Malformed messages are logged and dropped, so SQS deletes them instead of
+        delivering them again and again. """
+
+    ip_set_types = ('IPV4', 'IPV6')
+
+    def __init__(self, records):
+        self.pending_blocks = {}
+        self.pending_fan_out_retries = {}
+        self.dropped_message_ids = []
+
+        for record in records:
+            try:
+                message = self.decode_message(record['body'])
+
+            except (ValueError, KeyError, TypeError) as error:
+                # pylint: disable=W1202
+                LOGGER.error('Dropped malformed block message {0}: {1}'.format(record.get('messageId'), error))
+                self.dropped_message_ids.append(record.get('messageId'))
+                continue
+
+            if message.get('target') is not None:
+                self.pending_fan_out_retries[record['messageId']] = (message['ip_set_type'], message['address'],
+                                                                     tuple(message['target']))
+            else:
+                self.pending_blocks[record['messageId']] = (message['ip_set_type'], message['address'],
+                                                            message.get('enqueued_at'))
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def decode_message(cls, body) -> dict:
+        """ Returns the block of a message body, raises ValueError, KeyError or TypeError when it is malformed """
+
+        message = json.loads(body)
+
+        if message['ip_set_type'] not in cls.ip_set_types:
+            raise ValueError('Unknown IP set type: {0}'.format(message['ip_set_type']))
+
+        ip_network(message['address'])
+
+        if message.get('target') is not None and len(message['target']) != 3:
+            raise ValueError('Fan out target must be [region, scope, name]: {0}'.format(message['target']))
+
+        return message
+
+    def get_statistics(self) -> dict:
+        """ Returns the number of pending blocks and the age in seconds of the oldest one """
+
+        enqueued_at = [block[2] for block in self.pending_blocks.values() if block[2] is not None]
+
+        return {
+            'pending': len(self.pending_blocks),
+            'oldest_age_in_seconds': (time.time() - min(enqueued_at)) if enqueued_at else 0.0
+        }
+
+    def peek(self, limit) -> list:
+        """ Returns up to limit pending blocks as (message ID, ip_set_type, address) tuples """
+
+        return [(message_id, ip_set_type, address)
+                for message_id, (ip_set_type, address, _) in list(self.pending_blocks.items())[:limit]]
+
+    def remove(self, block_ids) -> None:
+        """ Marks blocks and fan out retries as flushed """
+
+        for block_id in block_ids:
+            self.pending_blocks.pop(block_id, None)
+            self.pending_fan_out_retries.pop(block_id, None)
+
+    def get_fan_out_retries(self) -> dict:
+        """ Returns the pending fan out retries as (ip_set_type, target) -> [(message ID, address)] """
+
+        fan_out_retries = {}
+
+        for message_id, (ip_set_type, address, target) in self.pending_fan_out_retries.items():
+            fan_out_retries.setdefault((ip_set_type, target), []).append((message_id, address))
+
+        return fan_out_retries
+
+    def get_batch_item_failures(self) -> list:
+        """ Returns the blocks and fan out retries that were not flushed, in the format of a partial batch response """
+
+        return [{'itemIdentifier': message_id} for message_id in list(self.pending_blocks) +
+                list(self.pending_fan_out_retries)]
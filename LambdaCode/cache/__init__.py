@@ -0,0 +1,7 @@
+# pylint: disable=C0111
+from .ttl_lru_cache import TTLLRUCache
+from .geolocation_cache import GeolocationCache
+from .sqlite_verdict_store import SQLiteVerdictStore
+from .verdict_cache import VerdictCache
+from .user_agent_cache import UserAgentCache
+from .block_set_snapshot import BlockSetSnapshot
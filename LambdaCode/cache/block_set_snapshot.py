@@ -0,0 +1,228 @@
+""" This file contains the BlockSetSnapshot class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import socket
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from utilities import ConfigHelper
+
+
+class PackedIPv6Array:
+    """ This class is an array of 128 bit integers, packed as two arrays of unsigned 64 bit halves. It supports the
+        sequence protocol, so it can be searched with bisect like the IPv4 arrays. """
+
+    def __init__(self):
+        self.high = array('Q')
+        self.low = array('Q')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return len(self.high)
+
+    def __getitem__(self, index):
+        return self.high[index] << 64 | self.low[index]
+
+    def __sizeof__(self):
+        return sys.getsizeof(self.high) + sys.getsizeof(self.low)
+
+    def append(self, value) -> None:
+        """ Appends a 128 bit integer """
+
+        self.high.append(value >> 64)
+        self.low.append(value & 0xFFFFFFFFFFFFFFFF)
+
+
+class BlockSetSnapshot:
+    """ This class is a read-only copy of the addresses of a bad bots IP set, taken from the last read or write of the
+        IP set by this container. The networks are packed into sorted, non overlapping integer ranges, so whether an
+        address is contained in a listed network is a binary search. A snapshot is replaced when the IP set has a new
+        version (LockToken) and is no longer used once its time to live has passed. The snapshots are created from the
+        BLOCK_SNAPSHOT config section and shared by all invocations. """
+
+    config_section_block_snapshot = 'BLOCK_SNAPSHOT'
+
+    # (scope, name) -> snapshot of the IP set
+    _snapshots = {}
+    _lock = threading.Lock()
+
+    # Counters for diagnostics
+    hits = 0
+    misses = 0
+
+    def __init__(self, addresses, lock_token=None, created_at=None):
+        self.lock_token = lock_token
+        self.created_at = time.monotonic() if created_at is None else created_at
+
+        # The first and last address of every range, in unsigned 32 bit arrays for IPv4 and 2 x 64 bit for IPv6
+        self.ranges = {4: (array('I'), array('I')), 6: (PackedIPv6Array(), PackedIPv6Array())}
+
+        for version, ranges in self.pack(addresses).items():
+            starts, ends = self.ranges[version]
+
+            for start, end in ranges:
+                starts.append(start)
+                ends.append(end)
+
+        self.entry_count = len(addresses)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return len(self.ranges[4][0]) + len(self.ranges[6][0])
+
+    @staticmethod
+    def parse_network(network) -> tuple:
+        """ Returns the IP version and the first and last address of a CIDR string as integers """
+
+        address, _, prefix_length = network.partition('/')
+        version = 6 if ':' in address else 4
+        address_bits = 128 if version == 6 else 32
+
+        packed_address = socket.inet_pton(socket.AF_INET6 if version == 6 else socket.AF_INET, address)
+        host_bits = address_bits - (int(prefix_length) if prefix_length else address_bits)
+
+        if not 0 <= host_bits <= address_bits:
+            raise ValueError('Invalid prefix length: {0}'.format(network))
+
+        start = int.from_bytes(packed_address, 'big') >> host_bits << host_bits
+
+        return version, start, start + (1 << host_bits) - 1
+
+    @classmethod
+    def pack(cls, addresses) -> dict:
+        """ Returns the sorted ranges of the networks per IP version, overlapping and adjacent ranges are merged """
+
+        ranges_by_version = {4: [], 6: []}
+
+        for network in addresses:
+            version, start, end = cls.parse_network(network)
+            ranges_by_version[version].append((start, end))
+
+        merged_ranges_by_version = {}
+
+        for version, ranges in ranges_by_version.items():
+            merged_ranges = []
+
+            for start, end in sorted(ranges):
+                if merged_ranges and start <= merged_ranges[-1][1] + 1:
+                    if end > merged_ranges[-1][1]:
+                        merged_ranges[-1] = (merged_ranges[-1][0], end)
+                else:
+                    merged_ranges.append((start, end))
+
+            merged_ranges_by_version[version] = merged_ranges
+
+        return merged_ranges_by_version
+
+    def contains(self, address) -> bool:
+        """ Indicates whether an address, given as a string or an ipaddress object, is contained in a listed network """
+
+        if isinstance(address, str):
+            version = 6 if ':' in address else 4
+            address = int.from_bytes(socket.inet_pton(socket.AF_INET6 if version == 6 else socket.AF_INET, address),
+                                     'big')
+        else:
+            version = address.version
+            address = int(address)
+
+        starts, ends = self.ranges[version]
+        index = bisect_right(starts, address) - 1
+
+        return index >= 0 and address <= ends[index]
+
+    def get_memory_usage(self) -> int:
+        """ Returns the number of bytes held by the packed ranges """
+
+        return sum(sys.getsizeof(starts) + sys.getsizeof(ends) for starts, ends in self.ranges.values())
+
+    @classmethod
+    def is_enabled(cls, config) -> bool:
+        """ Indicates whether block set snapshots are used """
+
+        return ConfigHelper.get_bool(config, cls.config_section_block_snapshot, 'ENABLED')
+
+    @classmethod
+    def get_snapshot(cls, config, key):
+        """ Returns the snapshot of an IP set, or None when there is none or it has expired """
+
+        ttl_in_seconds = ConfigHelper.get_float(config, cls.config_section_block_snapshot, 'TTL_SECONDS', 60)
+        snapshot = cls._snapshots.get(key)
+
+        if snapshot is None or snapshot.created_at + ttl_in_seconds <= time.monotonic():
+            return None
+
+        return snapshot
+
+    @classmethod
+    def lookup(cls, config, key, address) -> bool:
+        """ Indicates whether the address is blocked according to the snapshot of the IP set, False without a valid
+            snapshot """
+
+        snapshot = cls.get_snapshot(config, key)
+
+        if snapshot is not None and snapshot.contains(address):
+            cls.hits += 1
+            return True
+
+        cls.misses += 1
+
+        return False
+
+    @classmethod
+    def update(cls, key, addresses, lock_token) -> None:
+        """ Takes a snapshot of the addresses of an IP set. The packed ranges are only rebuilt when the version of the
+            IP set changed, otherwise the time to live of the current snapshot starts again. """
+
+        with cls._lock:
+            snapshot = cls._snapshots.get(key)
+
+            if snapshot is not None and lock_token is not None and snapshot.lock_token == lock_token:
+                snapshot.created_at = time.monotonic()
+                return
+
+        snapshot = BlockSetSnapshot(addresses, lock_token)
+
+        with cls._lock:
+            cls._snapshots[key] = snapshot
+
+    @classmethod
+    def invalidate(cls, key) -> None:
+        """ Drops the snapshot of an IP set, for example after entries were moved out of it """
+
+        with cls._lock:
+            cls._snapshots.pop(key, None)
+
+    @classmethod
+    def get_statistics(cls):
+        """ Returns the counters and the size of the snapshots, or None if no snapshot has been taken """
+
+        if not cls._snapshots:
+            return None
+
+        snapshots = list(cls._snapshots.values())
+        lookups = cls.hits + cls.misses
+
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_rate': (cls.hits / lookups) if lookups else 0.0,
+            'snapshots': len(snapshots),
+            'entries': sum(snapshot.entry_count for snapshot in snapshots),
+            'memory_in_bytes': sum(snapshot.get_memory_usage() for snapshot in snapshots)
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Drops all snapshots and resets the counters """
+
+        with cls._lock:
+            cls._snapshots = {}
+            cls.hits = 0
+            cls.misses = 0
@@ -0,0 +1,54 @@
+""" This file contains the GeolocationCache class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+from utilities import ConfigHelper
+from cache.ttl_lru_cache import TTLLRUCache
+
+
+class GeolocationCache:
+    """ This class is responsible for holding the geolocation cache of the Lambda container. The cache is created from
+        the GEOLOCATION config section on first use and shared by all invocations. Any object implementing lookup, put
+        and get_statistics (see TTLLRUCache) can be plugged in with set_cache. """
+
+    config_section_geolocation = 'GEOLOCATION'
+
+    _cache = None
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_cache(cls, config):
+        """ Returns the geolocation cache of this container or None if caching is disabled """
+
+        if not ConfigHelper.get_bool(config, cls.config_section_geolocation, 'CACHE_ENABLED', True):
+            return None
+
+        if cls._cache is None:
+            cls._cache = TTLLRUCache(
+                ConfigHelper.get_int(config, cls.config_section_geolocation, 'CACHE_MAX_SIZE', 1024),
+                ConfigHelper.get_float(config, cls.config_section_geolocation, 'CACHE_TTL_SECONDS', 3600))
+
+        return cls._cache
+
+    @classmethod
+    def get_negative_ttl(cls, config) -> float:
+        """ Returns the time to live of lookups that did not result in a country """
+
+        return ConfigHelper.get_float(config, cls.config_section_geolocation, 'CACHE_NEGATIVE_TTL_SECONDS', 300)
+
+    @classmethod
+    def set_cache(cls, cache) -> None:
+        """ Plugs in another cache implementation, or resets the cache when None is given """
+
+        cls._cache = cache
+
+    @classmethod
+    def get_statistics(cls):
+        """ Returns the counters of the cache or None if no cache has been created """
+
+        if cls._cache is None:
+            return None
+
+        return cls._cache.get_statistics()
@@ -0,0 +1,98 @@
+""" This file contains the SQLiteVerdictStore class """
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteVerdictStore:
+    """ This class is a verdict store shared by the containers that can reach the same file, such as an EFS mount. It
+        implements the shared backend interface of VerdictCache: lookup(key) returning (is_cached, value, expires_at)
+        and put(key, value, ttl_in_seconds). Expired verdicts are ignored on lookup and purged on put. """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, store_path, clock=time.time):
+        self.store_path = store_path
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        store_directory = os.path.dirname(store_path)
+
+        if store_directory:
+            os.makedirs(store_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(store_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS verdicts (verdict_key TEXT PRIMARY KEY, '
+                                 'verdict TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID')
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_store(cls, store_path) -> 'SQLiteVerdictStore':
+        """ Returns the store of the given path, opened once per container """
+
+        with cls._stores_lock:
+            verdict_store = cls._stores.get(store_path)
+
+            if verdict_store is None:
+                verdict_store = SQLiteVerdictStore(store_path)
+                cls._stores[store_path] = verdict_store
+
+            return verdict_store
+
+    @classmethod
+    def close_all(cls) -> None:
+        """ Closes all stores opened by this container """
+
+        with cls._stores_lock:
+            for verdict_store in cls._stores.values():
+                verdict_store.close()
+
+            cls._stores.clear()
+
+    def close(self) -> None:
+        """ Closes the database connection """
+
+        with self._lock:
+            self._connection.close()
+
+    def lookup(self, key) -> tuple:
+        """ Returns a tuple of (is_cached, value, expires_at) for the given key """
+
+        with self._lock:
+            row = self._connection.execute('SELECT verdict, expires_at FROM verdicts WHERE verdict_key = ? AND '
+                                           'expires_at > ?', (key, self.clock())).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return False, None, None
+
+            self.hits += 1
+
+        return True, json.loads(row[0]), row[1]
+
+    def put(self, key, value, ttl_in_seconds) -> None:
+        """ Stores a verdict and purges the expired ones """
+
+        now = self.clock()
+
+        with self._lock:
+            self._connection.execute('DELETE FROM verdicts WHERE expires_at <= ?', (now,))
+            self._connection.execute('INSERT OR REPLACE INTO verdicts (verdict_key, verdict, expires_at) '
+                                     'VALUES (?, ?, ?)', (key, json.dumps(value), now + ttl_in_seconds))
+
+    def get_statistics(self) -> dict:
+        """ Returns the counters of the store """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,106 @@
+""" This file contains the TTLLRUCache class """
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLLRUCache:
+    """ This class is a size bounded cache with least recently used eviction where every entry expires after a time to
+        live. A cached value of None is a valid (negative) entry, use lookup to tell it apart from a miss. """
+
+    def __init__(self, max_size, ttl_in_seconds, clock=time.monotonic):
+        self.max_size = max(int(max_size), 1)
+        self.ttl_in_seconds = float(ttl_in_seconds)
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for diagnostics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key) -> tuple:
+        """ Returns a tuple of (is_cached, value) for the given key """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, value = entry
+
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return True, value
+
+    def get(self, key, default=None):
+        """ Returns the cached value of the given key or the default on a miss """
+
+        is_cached, value = self.lookup(key)
+
+        return value if is_cached else default
+
+    def put(self, key, value, ttl_in_seconds=None) -> None:
+        """ Stores a value, evicting the least recently used entries when the cache is full """
+
+        ttl_in_seconds = self.ttl_in_seconds if ttl_in_seconds is None else float(ttl_in_seconds)
+
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+
+            self._entries[key] = (self.clock() + ttl_in_seconds, value)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        """ Removes a single entry from the cache """
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """ Removes all entries and resets the counters """
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def get_statistics(self) -> dict:
+        """ Returns the counters of the cache """
+
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
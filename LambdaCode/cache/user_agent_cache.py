@@ -0,0 +1,85 @@
+""" This file contains the UserAgentCache class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+from utilities import ConfigHelper
+from cache.ttl_lru_cache import TTLLRUCache
+
+
+class UserAgentCache:
+    """ This class is responsible for remembering the CrawlerDetect classification of user agents, keyed by the exact
+        user agent string. Traffic repeats a small number of user agents, so most requests skip the crawler patterns.
+        User agents longer than the configured length bypass the cache, so one client cannot fill it with large unique
+        strings. The cache is created from the USER_AGENT_CACHE config section on first use and shared by all
+        invocations. """
+
+    config_section_user_agent_cache = 'USER_AGENT_CACHE'
+
+    _user_agent_cache = None
+
+    def __init__(self, local_cache, max_user_agent_length=512):
+        self.local_cache = local_cache
+        self.max_user_agent_length = max_user_agent_length
+
+        # Counter for diagnostics, user agents that were classified without the cache
+        self.bypasses = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_user_agent_cache(cls, config):
+        """ Returns the user agent cache of this container or None if caching is disabled """
+
+        if not ConfigHelper.get_bool(config, cls.config_section_user_agent_cache, 'ENABLED', True):
+            return None
+
+        if cls._user_agent_cache is None:
+            # Classifications only change with the crawler patterns, which are fixed for the life of the container
+            cls._user_agent_cache = UserAgentCache(
+                TTLLRUCache(ConfigHelper.get_int(config, cls.config_section_user_agent_cache, 'MAX_SIZE', 2048),
+                            float('inf')),
+                ConfigHelper.get_int(config, cls.config_section_user_agent_cache, 'MAX_USER_AGENT_LENGTH', 512))
+
+        return cls._user_agent_cache
+
+    @classmethod
+    def set_user_agent_cache(cls, user_agent_cache) -> None:
+        """ Plugs in another user agent cache, or resets the cache when None is given """
+
+        cls._user_agent_cache = user_agent_cache
+
+    @classmethod
+    def get_statistics(cls):
+        """ Returns the counters of the cache or None if no cache has been created """
+
+        if cls._user_agent_cache is None:
+            return None
+
+        statistics = cls._user_agent_cache.local_cache.get_statistics()
+        statistics['bypasses'] = cls._user_agent_cache.bypasses
+
+        return statistics
+
+    @staticmethod
+    def classify(crawler_detect, user_agent) -> tuple:
+        """ Returns a tuple of (is_crawler, crawler_name) from CrawlerDetect, the name is None for other user agents """
+
+        is_crawler = bool(crawler_detect.isCrawler(user_agent))
+
+        return is_crawler, crawler_detect.getMatches() if is_crawler else None
+
+    def lookup(self, crawler_detect, user_agent) -> tuple:
+        """ Returns the classification of the user agent, classifying and caching it on a miss """
+
+        if len(user_agent) > self.max_user_agent_length:
+            self.bypasses += 1
+            return self.classify(crawler_detect, user_agent)
+
+        is_cached, classification = self.local_cache.lookup(user_agent)
+
+        if not is_cached:
+            classification = self.classify(crawler_detect, user_agent)
+            self.local_cache.put(user_agent, classification)
+
+        return classification
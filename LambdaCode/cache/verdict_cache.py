@@ -0,0 +1,113 @@
+""" This file contains the VerdictCache class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import hashlib
+import time
+from utilities import ConfigHelper
+from cache.ttl_lru_cache import TTLLRUCache
+from cache.sqlite_verdict_store import SQLiteVerdictStore
+
+
+class VerdictCache:
+    """ This class is responsible for remembering the verdicts of blocked bots, keyed by source IP address and
+        optionally a hash of the user agent. A cached verdict lets repeat requests of a blocked bot skip scoring,
+        geolocation and the IP set update. The container cache is backed by an optional shared store (see
+        SQLiteVerdictStore), so containers share verdicts. The cache is created from the VERDICT_CACHE config section
+        on first use. """
+
+    config_section_verdict_cache = 'VERDICT_CACHE'
+
+    _verdict_cache = None
+
+    def __init__(self, local_cache, shared_store=None, key_user_agent=False, clock=time.time):
+        self.local_cache = local_cache
+        self.shared_store = shared_store
+        self.key_user_agent = key_user_agent
+        self.clock = clock
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_verdict_cache(cls, config):
+        """ Returns the verdict cache of this container or None if caching is disabled """
+
+        if not ConfigHelper.get_bool(config, cls.config_section_verdict_cache, 'ENABLED'):
+            return None
+
+        if cls._verdict_cache is None:
+            shared_store_path = ConfigHelper.get_value(config, cls.config_section_verdict_cache, 'SHARED_STORE_PATH')
+
+            cls._verdict_cache = VerdictCache(
+                TTLLRUCache(ConfigHelper.get_int(config, cls.config_section_verdict_cache, 'MAX_SIZE', 4096),
+                            ConfigHelper.get_float(config, cls.config_section_verdict_cache, 'TTL_SECONDS', 300)),
+                SQLiteVerdictStore.get_store(shared_store_path) if shared_store_path else None,
+                ConfigHelper.get_bool(config, cls.config_section_verdict_cache, 'KEY_USER_AGENT'))
+
+        return cls._verdict_cache
+
+    @classmethod
+    def set_verdict_cache(cls, verdict_cache) -> None:
+        """ Plugs in another verdict cache, or resets the cache when None is given """
+
+        cls._verdict_cache = verdict_cache
+
+    @classmethod
+    def get_statistics(cls):
+        """ Returns the counters of the cache or None if no cache has been created """
+
+        if cls._verdict_cache is None:
+            return None
+
+        statistics = cls._verdict_cache.local_cache.get_statistics()
+
+        if cls._verdict_cache.shared_store is not None:
+            statistics['shared'] = cls._verdict_cache.shared_store.get_statistics()
+
+        return statistics
+
+    def get_key(self, bot) -> str:
+        """ Returns the cache key of the bot """
+
+        if not self.key_user_agent:
+            return str(bot.source_ip)
+
+        user_agent_hash = hashlib.sha1(bot.http_user_agent.encode('utf-8', 'replace')).hexdigest()[:16]
+
+        return '{0}|{1}'.format(bot.source_ip, user_agent_hash)
+
+    def lookup(self, bot):
+        """ Returns the cached verdict of the bot or None. A verdict found in the shared store is kept in the container
+            cache for the rest of its lifetime. """
+
+        key = self.get_key(bot)
+        is_cached, verdict = self.local_cache.lookup(key)
+
+        if is_cached:
+            return verdict
+
+        if self.shared_store is None:
+            return None
+
+        is_cached, verdict, expires_at = self.shared_store.lookup(key)
+
+        if not is_cached:
+            return None
+
+        self.local_cache.put(key, verdict, min(expires_at - self.clock(), self.local_cache.ttl_in_seconds))
+
+        return verdict
+
+    def put(self, bot, verdict, ttl_in_seconds=None) -> None:
+        """ Stores the verdict of the bot in the container cache and the shared store. A time to live shorter than the
+            one of the cache, such as the lifetime of the block, bounds the lifetime of the verdict. """
+
+        ttl_in_seconds = self.local_cache.ttl_in_seconds if ttl_in_seconds is None else \
+            min(ttl_in_seconds, self.local_cache.ttl_in_seconds)
+        key = self.get_key(bot)
+
+        self.local_cache.put(key, verdict, ttl_in_seconds)
+
+        if self.shared_store is not None:
+            self.shared_store.put(key, verdict, ttl_in_seconds)
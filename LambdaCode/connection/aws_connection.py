@@ -1,16 +1,62 @@
 """ Creates an AWS connection """
 
 # pylint: disable=E0401
-import boto3
+import threading
 
 
 class AWSConnection:
-    """ This class is responsible for creating AWS connections """
+    """ This class is responsible for creating AWS connections. Clients are created once per container and region and
+        reused by warm invocations. """
+
+    _clients = {}
+    _session = None
+    _lock = threading.Lock()
 
     def __str__(self):
         return self.__class__.__name__
 
     @staticmethod
-    def get_connection(aws_component) -> boto3.session:
-        """ Returns a boto3 client given a specified AWS component """
-        return boto3.client(aws_component)
+    def get_connection(aws_component, region_name=None) -> 'botocore.client.BaseClient':
+        """ Returns a client given a specified AWS component, in the default region of the function unless a region is
+            given. Clients are created from a botocore session, which is imported on first use: boto3 would add the
+            import of s3transfer, which none of the components need. """
+
+        client_key = aws_component if region_name is None else (aws_component, region_name)
+        client = AWSConnection._clients.get(client_key)
+
+        if client is None:
+            with AWSConnection._lock:
+                client = AWSConnection._clients.get(client_key)
+
+                if client is None:
+                    if AWSConnection._session is None:
+                        # pylint: disable=C0415
+                        import botocore.session
+
+                        AWSConnection._session = botocore.session.get_session()
+
+                    client = AWSConnection._session.create_client(aws_component, region_name=region_name)
+                    AWSConnection._clients[client_key] = client
+
+        return client
+
+    @staticmethod
+    def get_error_code(error):
+        """ Returns the code of an AWS error, None for other exceptions. Matching on the code instead of catching
+            botocore's ClientError keeps botocore out of the import of the modules that handle AWS errors. """
+
+        return ((getattr(error, 'response', None) or {}).get('Error') or {}).get('Code')
+
+    @staticmethod
+    def set_connection(aws_component, client, region_name=None) -> None:
+        """ Replaces the client of an AWS component, for example by a local stub """
+
+        with AWSConnection._lock:
+            AWSConnection._clients[aws_component if region_name is None else (aws_component, region_name)] = client
+
+    @staticmethod
+    def reset() -> None:
+        """ Drops all cached clients """
+
+        with AWSConnection._lock:
+            AWSConnection._clients.clear()
@@ -2,7 +2,17 @@
 
 # pylint: disable=E0611
 # pylint: disable=E0401
+import logging
+import random
+import threading
+import time
 from connection.aws_connection import AWSConnection
+from utilities import ConfigHelper
+from utilities import PhaseTimer
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
 
 
 class AWSWAFv2Connection:
@@ -10,56 +20,201 @@ class AWSWAFv2Connection:
 
     config_section_waf = 'AWS_WAF'
 
-    def __init__(self, config, ip_set_bad_bots_list_type):
-        self.boto_wafv2_client = AWSConnection().get_connection('wafv2')
+    # (region, scope, name) -> (Id, ARN) of the IP sets seen by this container, the region is None for the default
+    _ip_set_references = {}
+    _ip_set_references_lock = threading.Lock()
+
+    def __init__(self, config, ip_set_bad_bots_list_type, boto_wafv2_client=None, ip_set_name=None, ip_set_scope=None,
+                 region_name=None):
+        self.region_name = region_name
+        self.boto_wafv2_client = boto_wafv2_client or AWSConnection().get_connection('wafv2', region_name)
 
         # Retrieve config parser
         self.config = config
 
-        # Setup instance attributes
-        if ip_set_bad_bots_list_type.value == 'IPV4':
+        # Setup instance attributes, the name of the IP set can be overridden for example by a shard name
+        if ip_set_name is not None:
+            self.ip_set_blocked_name = ip_set_name
+
+        elif ip_set_bad_bots_list_type.value == 'IPV4':
             self.ip_set_blocked_name = self.config[self.config_section_waf]['IP_SET_BAD_BOTS_IPV4_NAME']
 
         elif ip_set_bad_bots_list_type.value == 'IPV6':
             self.ip_set_blocked_name = self.config[self.config_section_waf]['IP_SET_BAD_BOTS_IPV6_NAME']
 
-        self.ip_set_blocked_scope = self.config[self.config_section_waf]['IP_SET_BAD_BOTS_SCOPE']
+        self.ip_set_blocked_scope = ip_set_scope or self.config[self.config_section_waf]['IP_SET_BAD_BOTS_SCOPE']
         self.ip_set_blocked_identifier = self.retrieve_ip_set_identifier()
 
+        # Retry settings of optimistic lock conflicts
+        self.update_max_retries = ConfigHelper.get_int(self.config, self.config_section_waf, 'UPDATE_MAX_RETRIES', 5)
+        self.update_backoff_base_in_ms = ConfigHelper.get_float(self.config, self.config_section_waf,
+                                                                'UPDATE_BACKOFF_BASE_MS', 50)
+        self.update_backoff_max_in_ms = ConfigHelper.get_float(self.config, self.config_section_waf,
+                                                               'UPDATE_BACKOFF_MAX_MS', 1000)
+
     def retrieve_ip_set_identifier(self) -> str:
         """ Get ip set identifier by calling wafv2.list_ip_sets because the resource ID has to be fetched manually after
-            creating the stack resource of the ip set.
+            creating the stack resource of the ip set. The identifier is cached for the lifetime of the container.
          """
 
-        ip_set_list = self.boto_wafv2_client.list_ip_sets(Scope=self.ip_set_blocked_scope)
+        ip_set_reference = self.get_ip_set_reference()
+
+        if ip_set_reference is None:
+            return ''
+
+        return ip_set_reference[0]
+
+    def retrieve_ip_set_arn(self) -> str:
+        """ Returns the ARN of the IP set """
+
+        ip_set_reference = self.get_ip_set_reference()
+
+        if ip_set_reference is None:
+            return ''
+
+        return ip_set_reference[1]
+
+    def get_ip_set_reference(self):
+        """ Returns the cached (Id, ARN) of the IP set, listing the IP sets of the scope on a cache miss """
+
+        cache_key = (self.region_name, self.ip_set_blocked_scope, self.ip_set_blocked_name)
+        ip_set_reference = self._ip_set_references.get(cache_key)
+
+        if ip_set_reference is None:
+            self.load_ip_set_references()
+            ip_set_reference = self._ip_set_references.get(cache_key)
+
+        return ip_set_reference
+
+    def load_ip_set_references(self) -> None:
+        """ Caches the (Id, ARN) of every IP set in the scope, following the NextMarker of every page """
+
+        ip_set_references = {}
+        list_ip_sets_arguments = {'Scope': self.ip_set_blocked_scope}
+
+        while True:
+            with PhaseTimer.measure(PhaseTimer.phase_waf_read):
+                ip_set_list = self.boto_wafv2_client.list_ip_sets(**list_ip_sets_arguments)
+
+            for ip_set in ip_set_list["IPSets"]:
+                ip_set_references[(self.region_name, self.ip_set_blocked_scope, ip_set["Name"])] = \
+                    (ip_set["Id"], ip_set["ARN"])
+
+            next_marker = ip_set_list.get("NextMarker")
+
+            # The last page either has no marker or an empty list
+            if not next_marker or not ip_set_list["IPSets"]:
+                break
+
+            list_ip_sets_arguments['NextMarker'] = next_marker
+
+        with self._ip_set_references_lock:
+            self._ip_set_references.update(ip_set_references)
 
-        ip_set_identifier = ''
+    @classmethod
+    def invalidate_ip_set_references(cls, scope=None, name=None, region_name=None) -> None:
+        """ Drops cached IP set references, either of a single IP set or all of them """
 
-        for ip_set in ip_set_list["IPSets"]:
-            if ip_set["Name"] == self.ip_set_blocked_name:
-                ip_set_identifier = ip_set["Id"]
+        with cls._ip_set_references_lock:
+            if scope is None or name is None:
+                cls._ip_set_references.clear()
+            else:
+                cls._ip_set_references.pop((region_name, scope, name), None)
 
-        return ip_set_identifier
+    def call_with_ip_set_identifier(self, operation, **kwargs):
+        """ Calls a wafv2 operation on the IP set. If WAF no longer knows the cached identifier (for example because the
+            stack recreated the IP set) the identifier is resolved again and the call is retried once. """
+
+        # Updates are timed as WAF writes, every other call as a WAF read
+        phase = PhaseTimer.phase_waf_write if getattr(operation, '__name__', '') == 'update_ip_set' \
+            else PhaseTimer.phase_waf_read
+
+        with PhaseTimer.measure(phase):
+            try:
+                return operation(Name=self.ip_set_blocked_name, Scope=self.ip_set_blocked_scope,
+                                 Id=self.ip_set_blocked_identifier, **kwargs)
+
+            # pylint: disable=W0703
+            except Exception as error:
+                if AWSConnection.get_error_code(error) != 'WAFNonexistentItemException':
+                    raise
+
+                # pylint: disable=W1202
+                LOGGER.warning('IP set {0} not found by cached identifier, resolving again.'.format(
+                    self.ip_set_blocked_name))
+
+                self.invalidate_ip_set_references(self.ip_set_blocked_scope, self.ip_set_blocked_name, self.region_name)
+                self.ip_set_blocked_identifier = self.retrieve_ip_set_identifier()
+
+                return operation(Name=self.ip_set_blocked_name, Scope=self.ip_set_blocked_scope,
+                                 Id=self.ip_set_blocked_identifier, **kwargs)
 
     def retrieve_ip_set(self) -> str:
         """ Retrieves the IP set from AWS WAFv2 """
 
         # Get IP set
-        response = self.boto_wafv2_client.get_ip_set(Name=self.ip_set_blocked_name, Scope=self.ip_set_blocked_scope,
-                                                     Id=self.ip_set_blocked_identifier)
+        response = self.call_with_ip_set_identifier(self.boto_wafv2_client.get_ip_set)
 
         return response
 
-    def update_ip_set(self, new_block_list) -> None:
-        """ Updates the IP set with a new IP set (block list) """
+    def update_ip_set(self, new_block_list, lock_token=None) -> str:
+        """ Updates the IP set with a new IP set (block list). The IP set is only read for a LockToken when none is
+            given. Returns the LockToken of the updated IP set. """
 
-        # Get reponse for locktoken
-        wafv2_response = self.boto_wafv2_client.get_ip_set(Name=self.ip_set_blocked_name, Scope=self.ip_set_blocked_scope,
-                                                           Id=self.ip_set_blocked_identifier)
-        # Get locktoken
-        locktoken = wafv2_response['LockToken']
+        if lock_token is None:
+            # Get reponse for locktoken
+            wafv2_response = self.call_with_ip_set_identifier(self.boto_wafv2_client.get_ip_set)
+
+            # Get locktoken
+            lock_token = wafv2_response['LockToken']
 
         # Update current IP Set
-        self.boto_wafv2_client.update_ip_set(Name=self.ip_set_blocked_name, Scope=self.ip_set_blocked_scope,
-                                             Id=self.ip_set_blocked_identifier,
-                                             Addresses=new_block_list, LockToken=locktoken)
+        response = self.call_with_ip_set_identifier(self.boto_wafv2_client.update_ip_set, Addresses=new_block_list,
+                                                    LockToken=lock_token)
+
+        return response.get('NextLockToken')
+
+    def merge_ip_set(self, merge_function) -> dict:
+        """ Reads the IP set once and writes the result of merge_function(current_addresses) with the LockToken of that
+            read. If another writer changed the IP set in between (WAFOptimisticLockException) the IP set is read and
+            merged again after a jittered backoff, up to UPDATE_MAX_RETRIES times. merge_function returns None when no
+            update is needed, in which case nothing is written. """
+
+        attempt = 0
+
+        while True:
+            wafv2_response = self.retrieve_ip_set()
+            current_addresses = wafv2_response["IPSet"]["Addresses"]
+
+            merged_addresses = merge_function(current_addresses)
+
+            if merged_addresses is None:
+                return {'updated': False, 'attempts': attempt + 1, 'addresses': current_addresses,
+                        'lock_token': wafv2_response['LockToken']}
+
+            try:
+                next_lock_token = self.update_ip_set(merged_addresses, wafv2_response['LockToken'])
+
+                return {'updated': True, 'attempts': attempt + 1, 'addresses': merged_addresses,
+                        'lock_token': next_lock_token}
+
+            # pylint: disable=W0703
+            except Exception as error:
+                if AWSConnection.get_error_code(error) != 'WAFOptimisticLockException' or \
+                        attempt >= self.update_max_retries:
+                    raise
+
+            attempt += 1
+
+            # pylint: disable=W1202
+            LOGGER.info('IP set {0} was changed by another writer, retrying ({1}/{2}).'.format(
+                self.ip_set_blocked_name, attempt, self.update_max_retries))
+
+            time.sleep(self.get_backoff_in_seconds(attempt))
+
+    def get_backoff_in_seconds(self, attempt) -> float:
+        """ Returns an exponential backoff with full jitter, so concurrent writers do not retry in lockstep """
+
+        backoff_in_ms = min(self.update_backoff_max_in_ms, self.update_backoff_base_in_ms * (2 ** (attempt - 1)))
+
+        return random.uniform(0, backoff_in_ms) / 1000
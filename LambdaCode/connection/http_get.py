@@ -1,8 +1,12 @@
 """ This file contains the HTTPGet class """
 
+# pylint: disable=E0611
 # pylint: disable=E0401
 import logging
-import urllib3
+import socket
+import threading
+import time
+from utilities import ConfigHelper
 
 # Setup logger
 LOGGER = logging.getLogger()
@@ -10,11 +14,101 @@ LOGGER.setLevel(logging.INFO)
 
 
 class HTTPGet:
-    """ This class is responsible for making requests to the IP list parser provider URL's and returning the result """
+    """ This class is responsible for making requests to the IP list parser provider URL's and returning the result. All
+        requests share one connection pool per container, so warm invocations reuse open TCP/TLS connections. A request
+        is only retried when the connection could not be made. urllib3 applies TOTAL_TIMEOUT to the socket operations
+        of an attempt, a body that trickles in is cut off by a deadline of CONNECT_RETRIES * CONNECT_TIMEOUT +
+        TOTAL_TIMEOUT after the request was sent, which is also the worst case apart from the backoff. """
+
+    config_section_http = 'HTTP'
+
+    # Default settings, overridden by the HTTP config section
+    # Number of bytes of the body read at a time, the deadline is checked between reads
+    read_chunk_size = 8192
+
+    default_settings = {
+        'NUM_POOLS': 4,
+        'POOL_MAXSIZE': 4,
+        'KEEP_ALIVE': True,
+        'CONNECT_TIMEOUT': 1.0,
+        'TOTAL_TIMEOUT': 2.0,
+        'CONNECT_RETRIES': 1,
+        'BACKOFF_FACTOR': 0.2
+    }
+
+    _settings = dict(default_settings)
+    _pool_manager = None
+    _lock = threading.Lock()
+
+    # Timing of the last request and counters of all requests in this container
+    last_timing = None
+    _statistics = {'requests': 0, 'new_connections': 0, 'reused_connections': 0, 'total_duration_in_ms': 0.0}
 
     def __str__(self):
         return self.__class__.__name__
 
+    @classmethod
+    def configure(cls, config) -> None:
+        """ Applies the HTTP config section. The pool is only recreated when the settings actually change. """
+
+        settings = {
+            'NUM_POOLS': ConfigHelper.get_int(config, cls.config_section_http, 'NUM_POOLS',
+                                              cls.default_settings['NUM_POOLS']),
+            'POOL_MAXSIZE': ConfigHelper.get_int(config, cls.config_section_http, 'POOL_MAXSIZE',
+                                                 cls.default_settings['POOL_MAXSIZE']),
+            'KEEP_ALIVE': ConfigHelper.get_bool(config, cls.config_section_http, 'KEEP_ALIVE',
+                                                cls.default_settings['KEEP_ALIVE']),
+            'CONNECT_TIMEOUT': ConfigHelper.get_float(config, cls.config_section_http, 'CONNECT_TIMEOUT',
+                                                      cls.default_settings['CONNECT_TIMEOUT']),
+            'TOTAL_TIMEOUT': ConfigHelper.get_float(config, cls.config_section_http, 'TOTAL_TIMEOUT',
+                                                    cls.default_settings['TOTAL_TIMEOUT']),
+            'CONNECT_RETRIES': ConfigHelper.get_int(config, cls.config_section_http, 'CONNECT_RETRIES',
+                                                    cls.default_settings['CONNECT_RETRIES']),
+            'BACKOFF_FACTOR': ConfigHelper.get_float(config, cls.config_section_http, 'BACKOFF_FACTOR',
+                                                     cls.default_settings['BACKOFF_FACTOR'])
+        }
+
+        with cls._lock:
+            if settings != cls._settings:
+                if cls._pool_manager is not None:
+                    cls._pool_manager.clear()
+
+                cls._settings = settings
+                cls._pool_manager = None
+
+    @classmethod
+    def get_pool_manager(cls) -> 'urllib3.PoolManager':
+        """ Returns the pool manager of this container, creating it on first use """
+
+        with cls._lock:
+            if cls._pool_manager is None:
+                # Imported on first use, invocations that never make a request do not pay for loading urllib3
+                # pylint: disable=C0415
+                import urllib3
+                from urllib3.connection import HTTPConnection
+
+                settings = cls._settings
+
+                socket_options = list(HTTPConnection.default_socket_options)
+
+                if settings['KEEP_ALIVE']:
+                    socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+                # Fixed SSL bug on MacOS: /Applications/Python\ 3.8/Install\ Certificates.command
+                cls._pool_manager = urllib3.PoolManager(
+                    num_pools=settings['NUM_POOLS'],
+                    maxsize=settings['POOL_MAXSIZE'],
+                    block=False,
+                    socket_options=socket_options,
+                    timeout=urllib3.Timeout(total=settings['TOTAL_TIMEOUT'], connect=settings['CONNECT_TIMEOUT']),
+                    # A request that reached the server is not sent again, a retry would exceed the deadline
+                    retries=urllib3.Retry(total=settings['CONNECT_RETRIES'], connect=settings['CONNECT_RETRIES'],
+                                          read=0, status=0, other=0, redirect=False,
+                                          backoff_factor=settings['BACKOFF_FACTOR'], raise_on_status=False)
+                )
+
+            return cls._pool_manager
+
     @staticmethod
     def http_get_contents(url) -> str:
         """ Gets the content of an URL and returns it """
@@ -24,10 +118,52 @@ class HTTPGet:
         url = str(url).strip('\n')
 
         try:
-            # Fixed SSL bug on MacOS: /Applications/Python\ 3.8/Install\ Certificates.command
-            http = urllib3.PoolManager()
-            http_response = http.request('GET', url, timeout=5)
-            http_response_content = http_response.data
+            http = HTTPGet.get_pool_manager()
+
+            # Count the connections of the host pool to tell a new connection from a reused one. urllib3 does not
+            # expose the DNS and connect time separately, they are part of the time to first byte.
+            connection_pool = http.connection_from_url(url)
+            num_connections = connection_pool.num_connections
+
+            settings = HTTPGet._settings
+            start_time = time.perf_counter()
+            deadline = start_time + settings['CONNECT_RETRIES'] * settings['CONNECT_TIMEOUT'] + \
+                settings['TOTAL_TIMEOUT']
+
+            http_response = http.request('GET', url, preload_content=False)
+            first_byte_time = time.perf_counter()
+
+            # read1 (urllib3 2) returns the bytes that have arrived, so the deadline is also checked while a body
+            # trickles in. read waits for a full chunk.
+            read_chunk = getattr(http_response, 'read1', http_response.read)
+            http_response_chunks = []
+
+            while True:
+                chunk = read_chunk(HTTPGet.read_chunk_size)
+
+                if not chunk:
+                    break
+
+                http_response_chunks.append(chunk)
+
+                if time.perf_counter() > deadline:
+                    # The rest of the body is not read, so the connection can not be reused
+                    http_response.close()
+                    raise TimeoutError('Response not read within the deadline')
+
+            http_response_content = b''.join(http_response_chunks)
+            http_response.release_conn()
+            end_time = time.perf_counter()
+
+            HTTPGet.record_timing({
+                'url': url,
+                'status': http_response.status,
+                'new_connection': connection_pool.num_connections > num_connections,
+                'retries': len(http_response.retries.history) if http_response.retries else 0,
+                'ttfb_in_ms': (first_byte_time - start_time) * 1000,
+                'read_in_ms': (end_time - first_byte_time) * 1000,
+                'total_duration_in_ms': (end_time - start_time) * 1000
+            })
 
             if http_response.status == 200:
                 return http_response_content.decode('utf-8')
@@ -40,3 +176,40 @@ class HTTPGet:
             LOGGER.error('Error. Could not connect to: {0}. Error message: {1}'.format(url, error))
 
         return ''
+
+    @classmethod
+    def record_timing(cls, timing) -> None:
+        """ Stores the timing of a request for diagnostics """
+
+        cls.last_timing = timing
+
+        cls._statistics['requests'] += 1
+        cls._statistics['total_duration_in_ms'] += timing['total_duration_in_ms']
+
+        if timing['new_connection']:
+            cls._statistics['new_connections'] += 1
+        else:
+            cls._statistics['reused_connections'] += 1
+
+    @classmethod
+    def get_statistics(cls) -> dict:
+        """ Returns the timing of the last request and the counters of all requests in this container """
+
+        statistics = dict(cls._statistics)
+        statistics['last_request'] = cls.last_timing
+
+        return statistics
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Closes the pool and resets the settings and counters """
+
+        with cls._lock:
+            if cls._pool_manager is not None:
+                cls._pool_manager.clear()
+
+            cls._settings = dict(cls.default_settings)
+            cls._pool_manager = None
+            cls.last_timing = None
+            cls._statistics = {'requests': 0, 'new_connections': 0, 'reused_connections': 0,
+                               'total_duration_in_ms': 0.0}
@@ -0,0 +1,7 @@
+# pylint: disable=C0111
+from .geolocation_provider import GeolocationProvider
+from .http_geolocation_provider import HTTPGeolocationProvider
+from .range_table_geolocation_provider import RangeTableGeolocationProvider
+from .chained_geolocation_provider import ChainedGeolocationProvider
+from .geolocation_provider_factory import GeolocationProviderFactory
+from .range_table_builder import RangeTableBuilder
@@ -0,0 +1,50 @@
+""" This file contains the ChainedGeolocationProvider class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+from ipaddress import ip_address
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+from geolocation.geolocation_provider import GeolocationProvider
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+
+class ChainedGeolocationProvider(GeolocationProvider):
+    """ This class asks a list of providers in order and returns the first answer. A provider that fails or has no
+        answer falls back to the next one. """
+
+    def __init__(self, providers):
+        self.providers = providers
+
+    def supports(self, ip_version) -> bool:
+        """ Indicates whether any of the providers can resolve addresses of the given IP version """
+        return any(provider.supports(ip_version) for provider in self.providers)
+
+    def get_country(self, source_ip):
+        """ Returns the country of the first provider that knows the IP address """
+
+        # Addresses parsed by the caller are used as is
+        source_ip_address = source_ip if isinstance(source_ip, (IPv4Address, IPv6Address)) else ip_address(source_ip)
+        ip_version = source_ip_address.version
+
+        for provider in self.providers:
+            if not provider.supports(ip_version):
+                continue
+
+            try:
+                country = provider.get_country(source_ip_address)
+
+            # pylint: disable=W0703
+            except Exception as error:
+                # pylint: disable=W1202
+                LOGGER.error('Geolocation provider {0} failed: {1}'.format(provider, error))
+                continue
+
+            if country is not None:
+                return country
+
+        return None
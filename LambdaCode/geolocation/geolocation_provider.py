@@ -0,0 +1,20 @@
+""" This file contains the GeolocationProvider class """
+
+
+class GeolocationProvider:
+    """ This class is the interface of the geolocation providers. A provider resolves an IP address to a country or
+        returns None when it has no answer, so the next provider can be asked. """
+
+    # The IP versions this provider can answer for
+    supported_ip_versions = (4, 6)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def supports(self, ip_version) -> bool:
+        """ Indicates whether the provider can resolve addresses of the given IP version """
+        return ip_version in self.supported_ip_versions
+
+    def get_country(self, source_ip):
+        """ Returns the country of the given IP address or None if it is unknown """
+        raise NotImplementedError
@@ -0,0 +1,86 @@
+""" This file contains the GeolocationProviderFactory class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import os
+from utilities import ConfigHelper
+from connection import HTTPGet
+from geolocation.chained_geolocation_provider import ChainedGeolocationProvider
+from geolocation.http_geolocation_provider import HTTPGeolocationProvider
+from geolocation.range_table_geolocation_provider import RangeTableGeolocationProvider
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+# The directory relative range table paths are resolved against
+LAMBDA_CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class GeolocationProviderFactory:
+    """ This class is responsible for creating the geolocation provider configured in the GEOLOCATION config section.
+        The provider is created once per container, so the range table is only mapped on the first lookup. """
+
+    config_section_geolocation = 'GEOLOCATION'
+
+    provider_range_table = 'range_table'
+    provider_http = 'http'
+
+    _provider = None
+    _provider_key = None
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def get_provider(cls, config) -> ChainedGeolocationProvider:
+        """ Returns the provider chain of this container """
+
+        provider_names = ConfigHelper.get_list(config, cls.config_section_geolocation, 'PROVIDERS', [cls.provider_http])
+        range_table_path = ConfigHelper.get_value(config, cls.config_section_geolocation, 'RANGE_TABLE_PATH', '')
+        api_url = ConfigHelper.get_value(config, cls.config_section_geolocation, 'API_URL', '')
+
+        provider_key = (tuple(provider_names), range_table_path, api_url)
+
+        if cls._provider is None or cls._provider_key != provider_key:
+            HTTPGet.configure(config)
+
+            cls._provider = ChainedGeolocationProvider(
+                cls.create_providers(provider_names, range_table_path, api_url))
+            cls._provider_key = provider_key
+
+        return cls._provider
+
+    @classmethod
+    def create_providers(cls, provider_names, range_table_path, api_url) -> list:
+        """ Creates the providers in the configured order. A missing range table is skipped so the remaining providers
+            still answer. """
+
+        providers = []
+
+        for provider_name in provider_names:
+            if provider_name == cls.provider_range_table:
+                if not os.path.isabs(range_table_path):
+                    range_table_path = os.path.join(LAMBDA_CODE_DIR, range_table_path)
+
+                if os.path.isfile(range_table_path):
+                    providers.append(RangeTableGeolocationProvider(range_table_path))
+                else:
+                    # pylint: disable=W1202
+                    LOGGER.warning('Geolocation range table {0} not found, skipping.'.format(range_table_path))
+
+            elif provider_name == cls.provider_http:
+                providers.append(HTTPGeolocationProvider(api_url))
+
+            else:
+                raise ValueError('Unknown geolocation provider: {0}'.format(provider_name))
+
+        return providers
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Drops the provider so it is created again on next use """
+
+        cls._provider = None
+        cls._provider_key = None
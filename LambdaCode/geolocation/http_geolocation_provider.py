@@ -0,0 +1,29 @@
+""" This file contains the HTTPGeolocationProvider class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import json
+from connection import HTTPGet
+from geolocation.geolocation_provider import GeolocationProvider
+
+
+class HTTPGeolocationProvider(GeolocationProvider):
+    """ This class is responsible for resolving the country of an IP address with the remote geolocation API """
+
+    # IPv6 geolocation has not been implemented for the remote API
+    supported_ip_versions = (4,)
+
+    def __init__(self, api_url):
+        self.api_url = api_url
+
+    def get_country(self, source_ip):
+        """ Gets the country of origin from the remote geolocation API """
+
+        response = HTTPGet.http_get_contents(self.api_url + str(source_ip))
+
+        if not response:
+            return None
+
+        json_data = json.loads(response)
+
+        return json_data.get("country") or None
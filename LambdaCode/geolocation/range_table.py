@@ -0,0 +1,49 @@
+""" This file contains the RangeTable class """
+
+import struct
+
+# File layout: header, IPv4 records, IPv6 records. Every record holds the big endian start address, the big endian end
+# address and a two letter country code. Records are sorted by start address and do not overlap.
+RANGE_TABLE_MAGIC = b'BBGEO1'
+RANGE_TABLE_HEADER = struct.Struct('>6sxxII')
+RANGE_TABLE_COUNTRY_CODE_SIZE = 2
+RANGE_TABLE_ADDRESS_SIZE = {4: 4, 6: 16}
+
+
+class RangeTable:
+    """ This class describes the binary IP range table format shared by the builder and the provider """
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @staticmethod
+    def get_record_size(ip_version) -> int:
+        """ Returns the size in bytes of a single record of the given IP version """
+        return 2 * RANGE_TABLE_ADDRESS_SIZE[ip_version] + RANGE_TABLE_COUNTRY_CODE_SIZE
+
+    @staticmethod
+    def pack_header(ipv4_count, ipv6_count) -> bytes:
+        """ Returns the table header """
+        return RANGE_TABLE_HEADER.pack(RANGE_TABLE_MAGIC, ipv4_count, ipv6_count)
+
+    @staticmethod
+    def unpack_header(buffer) -> tuple:
+        """ Returns the number of IPv4 and IPv6 records in the table """
+
+        magic, ipv4_count, ipv6_count = RANGE_TABLE_HEADER.unpack_from(buffer, 0)
+
+        if magic != RANGE_TABLE_MAGIC:
+            raise ValueError('Not a geolocation range table')
+
+        return ipv4_count, ipv6_count
+
+    @staticmethod
+    def pack_record(start_address, end_address, country_code) -> bytes:
+        """ Returns a single record for the given ipaddress start and end address """
+
+        country_code = country_code.strip().upper().encode('ascii')
+
+        if len(country_code) != RANGE_TABLE_COUNTRY_CODE_SIZE:
+            raise ValueError('Country code must consist of two letters: {0}'.format(country_code))
+
+        return start_address.packed + end_address.packed + country_code
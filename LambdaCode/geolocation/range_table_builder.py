@@ -0,0 +1,106 @@
+""" Converts a CSV file of IP ranges into the binary range table used by RangeTableGeolocationProvider.
+
+    Every CSV row holds a start address, an end address and a two letter country code, for example:
+
+        1.0.0.0,1.0.0.255,AU
+        2001:200::,2001:200:ffff:ffff:ffff:ffff:ffff:ffff,JP
+
+    Usage (from the LambdaCode directory): python -m geolocation.range_table_builder <input.csv> <output.bin>
+"""
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import csv
+import sys
+from ipaddress import ip_address
+from geolocation.range_table import RangeTable
+
+
+class RangeTableBuilder:
+    """ This class is responsible for building a binary range table out of IP ranges """
+
+    def __init__(self):
+        self.ranges = {4: [], 6: []}
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def add_range(self, start_ip, end_ip, country_code) -> None:
+        """ Adds a single range to the table """
+
+        start_address = ip_address(start_ip.strip())
+        end_address = ip_address(end_ip.strip())
+
+        if start_address.version != end_address.version:
+            raise ValueError('Range {0} - {1} mixes IP versions'.format(start_ip, end_ip))
+
+        if start_address > end_address:
+            raise ValueError('Range {0} - {1} ends before it starts'.format(start_ip, end_ip))
+
+        self.ranges[start_address.version].append((start_address, end_address, country_code))
+
+    def add_csv(self, csv_file) -> int:
+        """ Adds all ranges of a CSV file object and returns the number of ranges added. Empty rows, comments and rows
+            without a valid start address (such as a header) are skipped. """
+
+        range_count = 0
+
+        for row in csv.reader(csv_file):
+            if len(row) < 3 or row[0].strip().startswith('#'):
+                continue
+
+            try:
+                ip_address(row[0].strip())
+            except ValueError:
+                continue
+
+            self.add_range(row[0], row[1], row[2])
+            range_count += 1
+
+        return range_count
+
+    def build(self) -> bytes:
+        """ Returns the binary range table """
+
+        records = {}
+
+        for ip_version, ranges in self.ranges.items():
+            ranges = sorted(ranges, key=lambda ip_range: ip_range[0])
+
+            for previous_range, next_range in zip(ranges, ranges[1:]):
+                if next_range[0] <= previous_range[1]:
+                    raise ValueError('Range starting at {0} overlaps range starting at {1}'.format(next_range[0],
+                                                                                                  previous_range[0]))
+
+            records[ip_version] = [RangeTable.pack_record(*ip_range) for ip_range in ranges]
+
+        return RangeTable.pack_header(len(records[4]), len(records[6])) + b''.join(records[4]) + b''.join(records[6])
+
+    def write(self, range_table_path) -> None:
+        """ Writes the binary range table to a file """
+
+        with open(range_table_path, 'wb') as range_table_file:
+            range_table_file.write(self.build())
+
+
+def main(arguments) -> int:
+    """ Entry point of the converter """
+
+    if len(arguments) != 2:
+        print(__doc__)
+        return 1
+
+    builder = RangeTableBuilder()
+
+    with open(arguments[0], newline='') as csv_file:
+        range_count = builder.add_csv(csv_file)
+
+    builder.write(arguments[1])
+
+    print('Wrote {0} ranges to {1}.'.format(range_count, arguments[1]))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+""" This file contains the RangeTableGeolocationProvider class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import mmap
+from ipaddress import ip_address
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+from geolocation.geolocation_provider import GeolocationProvider
+from geolocation.range_table import RangeTable
+from geolocation.range_table import RANGE_TABLE_HEADER
+from geolocation.range_table import RANGE_TABLE_ADDRESS_SIZE
+
+
+class RangeTableGeolocationProvider(GeolocationProvider):
+    """ This class is responsible for resolving the country of an IP address with a local, memory mapped IP range table.
+        Lookups are a binary search over the mapped records, nothing is loaded into the Python heap. """
+
+    def __init__(self, range_table_path):
+        self.range_table_path = range_table_path
+
+        with open(range_table_path, 'rb') as range_table_file:
+            self.range_table = mmap.mmap(range_table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        ipv4_count, ipv6_count = RangeTable.unpack_header(self.range_table)
+
+        # Offset and number of records per IP version
+        ipv4_offset = RANGE_TABLE_HEADER.size
+        ipv6_offset = ipv4_offset + ipv4_count * RangeTable.get_record_size(4)
+
+        self.sections = {
+            4: (ipv4_offset, ipv4_count),
+            6: (ipv6_offset, ipv6_count)
+        }
+
+    def close(self) -> None:
+        """ Unmaps the range table """
+        self.range_table.close()
+
+    def get_country(self, source_ip):
+        """ Returns the country code of the range containing the IP address or None if no range contains it """
+
+        # Addresses parsed by the caller are used as is
+        source_ip_address = source_ip if isinstance(source_ip, (IPv4Address, IPv6Address)) else ip_address(source_ip)
+        key = source_ip_address.packed
+
+        address_size = RANGE_TABLE_ADDRESS_SIZE[source_ip_address.version]
+        record_size = RangeTable.get_record_size(source_ip_address.version)
+        offset, count = self.sections[source_ip_address.version]
+
+        range_table = self.range_table
+
+        # Find the last record with a start address lower than or equal to the key. Big endian addresses of equal length
+        # compare the same way as bytes as they do as integers.
+        low = 0
+        high = count
+
+        while low < high:
+            middle = (low + high) // 2
+            record_offset = offset + middle * record_size
+
+            if range_table[record_offset:record_offset + address_size] <= key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == 0:
+            return None
+
+        record_offset = offset + (low - 1) * record_size
+        end_address = range_table[record_offset + address_size:record_offset + 2 * address_size]
+
+        if key > end_address:
+            return None
+
+        country_code_offset = record_offset + 2 * address_size
+
+        return range_table[country_code_offset:country_code_offset + 2].decode('ascii')
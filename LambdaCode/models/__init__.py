@@ -1,2 +1,3 @@
 # pylint: disable=C0111
 from .bot import Bot
+from .source_ip_type import SourceIPType
@@ -1,12 +1,31 @@
 """ This file contains the Bot class """
+# pylint: disable=R0902
 # pylint: disable=R0903
+# pylint: disable=R0913
+
 
 class Bot:
-    """ This class is the model of the bot """
-    source_ip = ''
-    source_ip_type = ''
-    geolocation = ''
-    http_user_agent = ''
-    http_method = ''
-    http_body = ''
-    http_query_string_parameters = ''
+    """ This class is the model of the bot. It uses slots to keep the per request footprint small. The source IP is
+        parsed once into an ipaddress object, the query string parameters and headers are kept as mappings. """
+
+    __slots__ = ('source_ip', 'source_ip_address', 'source_ip_type', 'geolocation', 'http_user_agent', 'http_method',
+                 'http_body', 'http_body_is_base64', 'http_query_string_parameters', 'http_headers')
+
+    def __init__(self, source_ip='', source_ip_address=None, source_ip_type='', geolocation='', http_user_agent='',
+                 http_method='', http_body='', http_body_is_base64=False, http_query_string_parameters=None,
+                 http_headers=None):
+        self.source_ip = source_ip
+        self.source_ip_address = source_ip_address
+        self.source_ip_type = source_ip_type
+        self.geolocation = geolocation
+        self.http_user_agent = http_user_agent
+        self.http_method = http_method
+        self.http_body = http_body
+        self.http_body_is_base64 = http_body_is_base64
+        self.http_query_string_parameters = http_query_string_parameters if http_query_string_parameters is not None \
+            else {}
+        self.http_headers = http_headers if http_headers is not None else {}
+
+    def __repr__(self):
+        return '{0}(source_ip={1!r}, http_method={2!r})'.format(self.__class__.__name__, self.source_ip,
+                                                                self.http_method)
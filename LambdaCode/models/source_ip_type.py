@@ -0,0 +1,9 @@
+""" This file contains the SourceIPType enum """
+
+from enum import Enum
+
+
+class SourceIPType(Enum):
+    """ The IP address type of a bot, the value is the type of the bad bots IP set that blocks it """
+    IPV4 = 'IPV4'
+    IPV6 = 'IPV6'
@@ -0,0 +1,44 @@
+""" Moves the entries of the bad bots IP sets to the shard they are placed in, for example after shards were added to
+    IP_SET_BAD_BOTS_IPV4_SHARDS / IP_SET_BAD_BOTS_IPV6_SHARDS. Entries are added to their new shard before they are
+    removed from the old one, so no address is unblocked during the move.
+
+    Usage (from the LambdaCode directory):
+        python rebalance_ip_sets.py [--config config/config.ini] [--dry-run]
+"""
+
+# pylint: disable=E0401
+import argparse
+import configparser
+import os
+import sys
+from blocking import IPSetBlocker
+
+
+def main(arguments) -> int:
+    """ Entry point of the rebalance """
+
+    parser = argparse.ArgumentParser(description='Moves the entries of the bad bots IP sets to their shard.')
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config',
+                                                         'config.ini'))
+    parser.add_argument('--dry-run', action='store_true', help='only report the entries that would be moved')
+    arguments = parser.parse_args(arguments)
+
+    config = configparser.ConfigParser()
+    config.read(arguments.config)
+
+    rebalance_output = IPSetBlocker(config).rebalance_ip_sets(arguments.dry_run)
+
+    for ip_set_type, type_output in rebalance_output.items():
+        print('{0}: {1} {2} entries.'.format(ip_set_type, 'would move' if arguments.dry_run else 'moved',
+                                            type_output['moved']))
+
+        for shard_name, shard_output in type_output['shards'].items():
+            print('  {0}: {1} -> {2} entries (+{3} / -{4}).'.format(
+                shard_name, shard_output['entries_before'], shard_output['entries_after'], shard_output['added'],
+                shard_output['removed']))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,66 @@
+""" Replays newline-delimited events through the bad bots scorer, for example API Gateway or Application Load Balancer
+    events exported from access logs, and writes one JSON result per event. Useful to tune the rules and the threshold
+    against historical traffic. Geolocation lookups and blocking are disabled unless enabled explicitly.
+
+    Usage (from the LambdaCode directory):
+        python replay_events.py <events.jsonl> <results.jsonl> [--processes N] [--chunk-size N]
+                                [--enable-geolocation] [--enable-blocking]
+"""
+
+# pylint: disable=E0401
+import argparse
+import configparser
+import json
+import os
+import sys
+import time
+from batch import BatchScorer
+
+
+def main(arguments) -> int:
+    """ Entry point of the replay """
+
+    parser = argparse.ArgumentParser(description='Replays newline-delimited events through the bad bots scorer.')
+    parser.add_argument('events', help='input file with one JSON event per line')
+    parser.add_argument('results', help='output file, one JSON result per line')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config',
+                                                         'config.ini'))
+    parser.add_argument('--enable-geolocation', action='store_true', help='look up the geolocation of every event')
+    parser.add_argument('--enable-blocking', action='store_true', help='block detected bots in WAF')
+    arguments = parser.parse_args(arguments)
+
+    config = configparser.ConfigParser()
+    config.read(arguments.config)
+
+    event_count = 0
+    bot_count = 0
+    error_count = 0
+    start_time = time.perf_counter()
+
+    with open(arguments.events) as events_file, open(arguments.results, 'w') as results_file:
+        # Blank lines are skipped, every other line results in exactly one output line
+        events = (line for line in events_file if line.strip())
+
+        for result in BatchScorer.score_batch(config, events, arguments.processes, arguments.chunk_size,
+                                              arguments.enable_geolocation, arguments.enable_blocking):
+            event_count += 1
+            bot_count += 1 if result.get('is_bot') else 0
+            error_count += 1 if 'error' in result else 0
+
+            results_file.write(json.dumps(result))
+            results_file.write('\n')
+
+    duration = time.perf_counter() - start_time
+    events_per_second = event_count / duration if duration > 0 else 0.0
+
+    print('Scored {0} events ({1} bots, {2} errors) in {3:.2f} s: {4:.0f} events/s, {5:.0f} events/s per core with '
+          '{6} processes.'.format(event_count, bot_count, error_count, duration, events_per_second,
+                                  events_per_second / arguments.processes, arguments.processes))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
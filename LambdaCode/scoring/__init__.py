@@ -0,0 +1,14 @@
+# pylint: disable=C0111
+from .signature_matcher import SignatureMatcher
+from .detector_registry import DetectorRegistry
+from .scoring_rule import ScoringRule
+from .scoring_context import ScoringContext
+from .scoring_pipeline import ScoringPipeline
+from .scoring_rules import EmptyUserAgentRule
+from .scoring_rules import HTTPMethodRule
+from .scoring_rules import CrawlerRule
+from .scoring_rules import PayloadSignatureRule
+from .scoring_rules import SQLInjectionRule
+from .scoring_rules import XSSRule
+from .scoring_rules import XSSImageRule
+from .scoring_rules import GeolocationRule
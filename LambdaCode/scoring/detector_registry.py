@@ -0,0 +1,88 @@
+""" This file contains the DetectorRegistry class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+import logging
+import threading
+import time
+from collections import namedtuple
+from crawlerdetect import CrawlerDetect
+from scoring.signature_matcher import SignatureMatcher
+
+# Setup logger
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+# The detection objects used by the confidence check
+Detectors = namedtuple('Detectors', ['crawler_detect', 'signature_matcher'])
+
+
+class DetectorRegistry:
+    """ This class is responsible for building the detection objects (CrawlerDetect and the payload signature matcher)
+        once per Lambda container. Warm invocations reuse the same objects instead of rebuilding them. """
+
+    _detectors = None
+    _build_duration_in_ms = 0.0
+    _reuse_count = 0
+    _lock = threading.Lock()
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def build(cls) -> Detectors:
+        """ Builds the detectors if they have not been built yet in this container. Can be called during the Lambda init
+            phase to build the detectors eagerly. """
+
+        with cls._lock:
+            if cls._detectors is None:
+                start_time = time.perf_counter()
+
+                cls._detectors = Detectors(
+                    crawler_detect=CrawlerDetect(),
+                    signature_matcher=SignatureMatcher()
+                )
+
+                # Warm up the crawler patterns and the combined signatures so the first request does not pay for
+                # compiling them
+                cls._detectors.crawler_detect.isCrawler('Mozilla/5.0')
+                cls._detectors.signature_matcher.scan('warm up')
+
+                cls._build_duration_in_ms = (time.perf_counter() - start_time) * 1000
+
+                # pylint: disable=W1202
+                LOGGER.debug('Built detectors in {0:.2f} ms.'.format(cls._build_duration_in_ms))
+
+        return cls._detectors
+
+    @classmethod
+    def get_detectors(cls) -> Detectors:
+        """ Returns the detectors of this container, building them on first use """
+
+        detectors = cls._detectors
+
+        if detectors is None:
+            return cls.build()
+
+        cls._reuse_count += 1
+
+        return detectors
+
+    @classmethod
+    def get_statistics(cls) -> dict:
+        """ Returns how long building the detectors took and how many times they were reused """
+
+        return {
+            'is_built': cls._detectors is not None,
+            'build_duration_in_ms': cls._build_duration_in_ms,
+            'reuse_count': cls._reuse_count
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Drops the detectors so they are rebuilt on next use """
+
+        with cls._lock:
+            cls._detectors = None
+            cls._build_duration_in_ms = 0.0
+            cls._reuse_count = 0
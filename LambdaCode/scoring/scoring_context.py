@@ -0,0 +1,137 @@
+""" This file contains the ScoringContext class """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+from scoring.detector_registry import DetectorRegistry
+from utilities import BodyReader
+
+
+class ScoringContext:
+    """ This class holds the bot that is being scored and resolves expensive properties on demand, so they are only
+        looked up when a rule actually needs them. """
+
+    # Default limits of the payload scan. The cost of a scan grows with the number of characters scanned, so the
+    # characters sent to the signature matcher are capped per request, not just the bytes decoded from the body.
+    default_scan_settings = {
+        'max_scan_length': 65536,
+        'max_query_string_scan_length': 65536,
+        'max_body_bytes': 262144,
+        'max_body_scan_length': 131072,
+        'body_chunk_size': 65536,
+        'body_chunk_overlap': 1024
+    }
+
+    def __init__(self, bot, geolocation_resolver=None, scan_settings=None, user_agent_cache=None):
+        self.bot = bot
+
+        # Limits of the payload scan: the maximum number of characters scanned per query string parameter and of all
+        # parameters, the byte budget of the body, the maximum number of body characters scanned (overlaps included)
+        # and the size and overlap of the body chunks
+        self.scan_settings = dict(self.default_scan_settings)
+        self.scan_settings.update(scan_settings or {})
+
+        self.body_reader = None
+        self._payload_signatures = None
+
+        # Called as geolocation_resolver(source_ip) the first time a rule needs the geolocation
+        self.geolocation_resolver = geolocation_resolver
+        self.is_geolocation_resolved = geolocation_resolver is None
+
+        self._detectors = None
+
+        # Classifications of user agents shared by the container (see UserAgentCache), None to always run CrawlerDetect
+        self.user_agent_cache = user_agent_cache
+        self.crawler_name = None
+        self._is_crawler = None
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def get_geolocation(self):
+        """ Returns the geolocation of the bot, resolving it on first use """
+
+        if not self.is_geolocation_resolved:
+            self.set_geolocation(self.geolocation_resolver(self.get_source_ip()))
+
+        return self.bot.geolocation
+
+    def set_geolocation(self, geolocation) -> None:
+        """ Sets the geolocation of the bot when it was looked up outside of the scoring context """
+
+        self.bot.geolocation = geolocation
+        self.is_geolocation_resolved = True
+
+    def get_source_ip(self):
+        """ Returns the source IP address the geolocation is looked up for """
+
+        return self.bot.source_ip_address if self.bot.source_ip_address is not None else self.bot.source_ip
+
+    def get_detectors(self):
+        """ Returns the detectors of the container, fetched from the registry once per evaluation """
+
+        if self._detectors is None:
+            self._detectors = DetectorRegistry.get_detectors()
+
+        return self._detectors
+
+    def is_crawler(self) -> bool:
+        """ Returns whether the user agent is a known crawler, the name of the crawler is kept in crawler_name """
+
+        if self._is_crawler is None:
+            crawler_detect = self.get_detectors().crawler_detect
+            user_agent = self.bot.http_user_agent
+
+            if self.user_agent_cache is not None:
+                self._is_crawler, self.crawler_name = self.user_agent_cache.lookup(crawler_detect, user_agent)
+            else:
+                self._is_crawler = bool(crawler_detect.isCrawler(user_agent))
+                self.crawler_name = crawler_detect.getMatches() if self._is_crawler else None
+
+        return self._is_crawler
+
+    def get_payload_signatures(self) -> set:
+        """ Returns the names of the signatures found in the body and query string parameters. The body is decoded and
+            scanned in chunks within its byte and scan budgets, both inputs are scanned once for all signatures. The
+            result is shared by the payload rules. """
+
+        if self._payload_signatures is None:
+            signature_matcher = self.get_detectors().signature_matcher
+
+            self.body_reader = BodyReader(self.bot.http_body, self.bot.http_body_is_base64,
+                                          self.scan_settings['max_body_bytes'], self.scan_settings['body_chunk_size'])
+
+            payload_signatures = signature_matcher.scan_chunks(self.body_reader.iter_chunks(),
+                                                               self.scan_settings['body_chunk_overlap'],
+                                                               max_scan_length=self.scan_settings['max_body_scan_length'])
+
+            payload_signatures |= signature_matcher.scan_all(self.iter_query_string_texts(),
+                                                             self.scan_settings['max_scan_length'],
+                                                             signature_matcher.signature_names - payload_signatures,
+                                                             self.scan_settings['max_query_string_scan_length'])
+
+            self._payload_signatures = payload_signatures
+
+        return self._payload_signatures
+
+    def iter_query_string_texts(self):
+        """ Yields the names and values of the query string parameters. Parameters given more than once have a list
+            of values. A plain string is yielded as is. """
+
+        query_string_parameters = self.bot.http_query_string_parameters
+
+        if not query_string_parameters:
+            return
+
+        if isinstance(query_string_parameters, str):
+            yield query_string_parameters
+            return
+
+        for name, values in query_string_parameters.items():
+            yield name
+
+            if isinstance(values, (list, tuple)):
+                for value in values:
+                    if value:
+                        yield value
+            elif values:
+                yield values
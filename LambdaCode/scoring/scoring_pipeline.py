@@ -0,0 +1,83 @@
+""" This file contains the ScoringPipeline class """
+
+import threading
+import time
+
+
+class ScoringPipeline:
+    """ This class evaluates an ordered list of scoring rules, cheapest first. When a threshold is given, evaluation
+        stops as soon as the score reaches it or can no longer reach it with the weights of the remaining rules. """
+
+    stop_reason_threshold_reached = 'threshold_reached'
+    stop_reason_threshold_unreachable = 'threshold_unreachable'
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda rule: rule.cost)
+
+        # Counters of all evaluations in this container
+        self.evaluation_count = 0
+        self.hit_counts = {rule.name: 0 for rule in self.rules}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def evaluate(self, scoring_context, threshold=None) -> dict:
+        """ Returns the bot confidence score together with the result and duration of every evaluated rule """
+
+        scoring_result = {}
+
+        for _ in self.iter_evaluation(scoring_context, threshold, scoring_result):
+            pass
+
+        return scoring_result
+
+    def iter_evaluation(self, scoring_context, threshold, scoring_result):
+        """ Evaluates the rules like evaluate, yielding every rule before it is evaluated. This lets a caller prepare
+            what a rule needs, for example await a lookup, without evaluating rules it does not reach. The score and
+            rule results are filled into scoring_result once the evaluation is done. """
+
+        score = 0
+        stop_reason = None
+        rule_results = {}
+
+        # The maximum score the remaining rules can still add
+        remaining_weight = sum(rule.weight for rule in self.rules)
+
+        for rule in self.rules:
+            if threshold is not None:
+                if score >= threshold:
+                    stop_reason = self.stop_reason_threshold_reached
+                    break
+
+                if score + remaining_weight < threshold:
+                    stop_reason = self.stop_reason_threshold_unreachable
+                    break
+
+            remaining_weight -= rule.weight
+
+            yield rule
+
+            start_time = time.perf_counter()
+            is_hit = rule.matches(scoring_context)
+            duration_in_ms = (time.perf_counter() - start_time) * 1000
+
+            if is_hit:
+                score += rule.weight
+
+            rule_results[rule.name] = {'hit': is_hit, 'duration_in_ms': duration_in_ms}
+
+        with self._lock:
+            self.evaluation_count += 1
+
+            for rule_name, rule_result in rule_results.items():
+                if rule_result['hit']:
+                    self.hit_counts[rule_name] += 1
+
+        scoring_result.update(score=score, stop_reason=stop_reason, rules=rule_results)
+
+    def get_statistics(self) -> dict:
+        """ Returns how many times the pipeline was evaluated and how many times every rule matched """
+
+        with self._lock:
+            return {'evaluation_count': self.evaluation_count, 'hit_counts': dict(self.hit_counts)}
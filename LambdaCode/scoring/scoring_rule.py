@@ -0,0 +1,21 @@
+""" This file contains the ScoringRule class """
+
+
+class ScoringRule:
+    """ This class is the interface of the rules of the scoring pipeline. A rule adds its weight to the bot confidence
+        score when it matches. The cost is a relative estimate of how expensive the rule is to evaluate, cheap rules are
+        evaluated first. """
+
+    name = ''
+    weight = 0
+    cost = 0
+
+    # Whether the rule reads the geolocation of the bot, which may have to be looked up first
+    needs_geolocation = False
+
+    def __str__(self):
+        return self.name or self.__class__.__name__
+
+    def matches(self, scoring_context) -> bool:
+        """ Indicates whether the rule matches the bot of the scoring context """
+        raise NotImplementedError
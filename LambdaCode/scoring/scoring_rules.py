@@ -0,0 +1,100 @@
+""" This file contains the rules of the default scoring pipeline """
+
+# pylint: disable=E0611
+# pylint: disable=E0401
+# pylint: disable=R0903
+from scoring.scoring_rule import ScoringRule
+
+
+class EmptyUserAgentRule(ScoringRule):
+    """ Matches requests without a user agent """
+
+    name = 'empty_user_agent'
+    weight = 3
+    cost = 1
+
+    def matches(self, scoring_context) -> bool:
+        return scoring_context.bot.http_user_agent == ''
+
+
+class HTTPMethodRule(ScoringRule):
+    """ Matches unusual HTTP methods, based on
+        https://www.sans.org/reading-room/whitepapers/detection/identify-malicious-http-requests-34067 """
+
+    name = 'http_method'
+    weight = 5
+    cost = 1
+
+    def matches(self, scoring_context) -> bool:
+        return scoring_context.bot.http_method in ["CONNECT", "PUT", "DELETE"]
+
+
+class CrawlerRule(ScoringRule):
+    """ Matches user agents of known crawlers """
+
+    name = 'crawler'
+    weight = 7
+    cost = 50
+
+    def matches(self, scoring_context) -> bool:
+        return scoring_context.is_crawler()
+
+
+class PayloadSignatureRule(ScoringRule):
+    """ Matches a payload signature in the body or query string parameters. The payload is scanned once for all
+        signatures by the first payload rule that is evaluated. """
+
+    # Name of the signature in the SignatureMatcher
+    signature = ''
+
+    def matches(self, scoring_context) -> bool:
+        return self.signature in scoring_context.get_payload_signatures()
+
+
+class SQLInjectionRule(PayloadSignatureRule):
+    """ Matches SQL injections in the body or query string parameters """
+
+    name = 'sql_injection'
+    weight = 8
+    cost = 20
+    signature = 'sql_injection'
+
+
+class XSSRule(PayloadSignatureRule):
+    """ Matches cross site scripting in the body or query string parameters """
+
+    name = 'xss'
+    weight = 8
+    cost = 20
+    signature = 'xss'
+
+
+class XSSImageRule(PayloadSignatureRule):
+    """ Matches cross site scripting through image tags in the body or query string parameters """
+
+    name = 'xss_image'
+    weight = 8
+    cost = 20
+    signature = 'xss_image'
+
+
+class GeolocationRule(ScoringRule):
+    """ Matches requests from countries we do not ship / sell to. The geolocation is resolved by this rule, so the
+        lookup is skipped when the score is already decided. """
+
+    name = 'geolocation'
+    weight = 5
+    cost = 1000
+    needs_geolocation = True
+
+    def __init__(self, shipping_countries):
+        self.shipping_countries = shipping_countries
+
+    def matches(self, scoring_context) -> bool:
+        geolocation = scoring_context.get_geolocation()
+
+        # The geolocation of the IP address is unknown
+        if geolocation is None:
+            return False
+
+        return geolocation not in self.shipping_countries
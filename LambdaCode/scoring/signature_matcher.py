@@ -0,0 +1,152 @@
+""" This file contains the SignatureMatcher class """
+
+import re
+
+
+class SignatureMatcher:
+    """ This class matches all payload signatures in a single scan of the input. Every signature has a few literal
+        anchors, at least one of which occurs in any match. The anchors are located with fast substring searches first,
+        signatures without an anchor in the input are skipped and the rest is confirmed by one alternation of named
+        groups, starting at the first anchor. The name of the matching group tells which signature matched. """
+
+    # Signature name -> (regular expression, anchors). Flags are scoped inline so every signature keeps its own case
+    # sensitivity. Anchors of None means the signature is always confirmed with the regular expression. Repetitions are
+    # bounded and cannot cross a tag delimiter, so the cost of a scan stays linear in the length of the input.
+    default_signatures = {
+        'sql_injection': (
+            r'\b(?:ALTER|CREATE|DELETE|DROP|EXEC(?:UTE){0,1}|INSERT(?: +INTO){0,1}|MERGE|SELECT|UPDATE'
+            r'|UNION(?: +ALL){0,1})\b',
+            ('ALTER', 'CREATE', 'DELETE', 'DROP', 'EXEC', 'INSERT', 'MERGE', 'SELECT', 'UPDATE', 'UNION')),
+        'xss': (
+            r'(?:(?:\%3C)|<)(?:(?:\%2F)|\/){0,8}[a-z0-9\%]{1,256}(?:(?:\%3E)|>)',
+            ('<', '%3C')),
+        'xss_image': (
+            r'(?i:(?:(?:\%3C)|<)(?:(?:\%69)|i|(?:\%49))(?:(?:\%6D)|m|(?:\%4D))(?:(?:\%67)|g|(?:\%47))[^\n<>]{1,256}'
+            r'(?:(?:\%3E)|>))',
+            ('<', '%3C', '%3c'))
+    }
+
+    def __init__(self, signatures=None):
+        self.signatures = dict(signatures or self.default_signatures)
+        self.signature_names = frozenset(self.signatures)
+
+        # Combined expressions per set of candidate signatures, compiled on first use
+        self._combined_regexes = {}
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def get_combined_regex(self, signature_names):
+        """ Returns one expression matching any of the given signatures """
+
+        combined_regex = self._combined_regexes.get(signature_names)
+
+        if combined_regex is None:
+            combined_regex = re.compile('|'.join('(?P<{0}>{1})'.format(name, self.signatures[name][0])
+                                                 for name in self.signatures if name in signature_names))
+            self._combined_regexes[signature_names] = combined_regex
+
+        return combined_regex
+
+    def find_candidates(self, text, signature_names, end) -> tuple:
+        """ Returns the signatures with an anchor in the text and the position of the first anchor """
+
+        candidate_signature_names = set()
+        first_position = end
+
+        for name in signature_names:
+            anchors = self.signatures[name][1]
+
+            if anchors is None:
+                candidate_signature_names.add(name)
+                first_position = 0
+                continue
+
+            for anchor in anchors:
+                position = text.find(anchor, 0, end)
+
+                if position != -1:
+                    candidate_signature_names.add(name)
+                    first_position = min(first_position, position)
+
+        return frozenset(candidate_signature_names), first_position
+
+    def scan(self, text, max_scan_length=None, signature_names=None) -> set:
+        """ Returns the names of the signatures found in the text. Only the first max_scan_length characters are
+            scanned. """
+
+        matched_signature_names = set()
+
+        if not text:
+            return matched_signature_names
+
+        end = len(text) if max_scan_length is None else min(len(text), max_scan_length)
+
+        remaining_signature_names, position = self.find_candidates(
+            text, signature_names if signature_names is not None else self.signature_names, end)
+
+        while remaining_signature_names:
+            match = self.get_combined_regex(remaining_signature_names).search(text, position, end)
+
+            if match is None:
+                break
+
+            matched_signature_names.add(match.lastgroup)
+            remaining_signature_names = remaining_signature_names - {match.lastgroup}
+
+            # A search finds the leftmost match of any signature, so the other signatures cannot match before this
+            # match. Continue from its start, another signature may overlap it.
+            position = match.start()
+
+        return matched_signature_names
+
+    def scan_all(self, texts, max_scan_length=None, signature_names=None, max_total_length=None) -> set:
+        """ Returns the names of the signatures found in any of the texts, every text is scanned once. Only the first
+            max_scan_length characters of a text and max_total_length characters of all texts are scanned. """
+
+        signature_names = frozenset(signature_names if signature_names is not None else self.signature_names)
+        matched_signature_names = set()
+        remaining_length = max_total_length
+
+        for text in texts:
+            if matched_signature_names >= signature_names or remaining_length == 0:
+                break
+
+            scan_length = max_scan_length if remaining_length is None else \
+                min(remaining_length, len(text) if max_scan_length is None else max_scan_length)
+
+            matched_signature_names |= self.scan(text, scan_length, signature_names - matched_signature_names)
+
+            if remaining_length is not None:
+                remaining_length -= min(len(text), scan_length)
+
+        return matched_signature_names
+
+    def scan_chunks(self, chunks, overlap=1024, signature_names=None, max_scan_length=None) -> set:
+        """ Returns the names of the signatures found in a text delivered in chunks. The last overlap characters of a
+            chunk are scanned again together with the next chunk, so a match crossing a chunk boundary is found as long
+            as it is not longer than the overlap. At most max_scan_length characters are scanned in total, including
+            the overlaps, the remaining chunks are not read. """
+
+        remaining_signature_names = frozenset(signature_names if signature_names is not None else self.signature_names)
+        matched_signature_names = set()
+        remaining_length = max_scan_length
+        tail = ''
+
+        for chunk in chunks:
+            if not remaining_signature_names or remaining_length == 0:
+                break
+
+            window = tail + chunk
+
+            if remaining_length is not None:
+                window = window[:remaining_length]
+                remaining_length -= len(window)
+
+            matched_chunk_signature_names = self.scan(window, signature_names=remaining_signature_names)
+            matched_signature_names |= matched_chunk_signature_names
+            remaining_signature_names = remaining_signature_names - matched_chunk_signature_names
+
+            tail = window[-overlap:] if overlap > 0 else ''
+
+        return matched_signature_names
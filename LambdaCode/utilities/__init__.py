@@ -1,2 +1,7 @@
 # pylint: disable=C0111
 from .diagnostics import Diagnostics
+from .config_helper import ConfigHelper
+from .ip_set_merger import IPSetMerger
+from .body_reader import BodyReader
+from .phase_timer import PhaseTimer
+from .metrics_record import MetricsRecord
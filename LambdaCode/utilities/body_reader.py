@@ -0,0 +1,97 @@
+""" This module holds the BodyReader class """
+
+import binascii
+import codecs
+
+
+class BodyReader:
+    """ This class reads a request body in chunks. A base64 encoded body is decoded one chunk at a time, so the decoded
+        body never has to be held in memory at once. Reading stops when the byte budget has been used up. """
+
+    def __init__(self, body, is_base64_encoded=False, max_body_bytes=1048576, chunk_size=65536):
+        self.body = body or ''
+        self.is_base64_encoded = is_base64_encoded
+        self.max_body_bytes = max_body_bytes
+        self.chunk_size = max(int(chunk_size), 4)
+
+        # Statistics of the last read
+        self.bytes_read = 0
+        self.is_truncated = False
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def iter_chunks(self):
+        """ Yields the body as text chunks of at most chunk_size characters, within the byte budget """
+
+        self.bytes_read = 0
+        self.is_truncated = False
+
+        if self.is_base64_encoded:
+            chunks = self.iter_base64_chunks()
+        else:
+            chunks = self.iter_text_chunks()
+
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+
+    def iter_text_chunks(self):
+        """ Yields slices of a plain text body. The budget of a text body is counted in characters. """
+
+        body_length = len(self.body)
+        end = body_length if self.max_body_bytes is None else min(body_length, self.max_body_bytes)
+
+        self.is_truncated = end < body_length
+
+        for position in range(0, end, self.chunk_size):
+            chunk = self.body[position:min(position + self.chunk_size, end)]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def iter_base64_chunks(self):
+        """ Yields a base64 encoded body decoded as UTF-8, one chunk at a time. Invalid UTF-8 is replaced so binary
+            bodies can still be scanned. """
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # Four base64 characters decode to three bytes, so chunks of a multiple of four characters decode
+        # independently. Line breaks and other whitespace do not count, the characters that do not fill a quantum yet
+        # are carried over to the next chunk.
+        encoded_chunk_size = (self.chunk_size // 3) * 4 or 4
+        carried_characters = ''
+
+        for position in range(0, len(self.body) + encoded_chunk_size, encoded_chunk_size):
+            is_last_chunk = position >= len(self.body)
+            encoded_chunk = carried_characters + ''.join(self.body[position:position + encoded_chunk_size].split())
+
+            if not is_last_chunk:
+                quantum_end = len(encoded_chunk) - len(encoded_chunk) % 4
+                encoded_chunk, carried_characters = encoded_chunk[:quantum_end], encoded_chunk[quantum_end:]
+
+            if not encoded_chunk:
+                continue
+
+            try:
+                decoded_chunk = binascii.a2b_base64(encoded_chunk)
+            except binascii.Error:
+                self.is_truncated = True
+                break
+
+            if self.max_body_bytes is not None and self.bytes_read + len(decoded_chunk) > self.max_body_bytes:
+                decoded_chunk = decoded_chunk[:self.max_body_bytes - self.bytes_read]
+                self.is_truncated = True
+
+            self.bytes_read += len(decoded_chunk)
+
+            yield decoder.decode(decoded_chunk)
+
+            if self.is_truncated:
+                break
+
+        yield decoder.decode(b'', final=True)
+
+    def get_statistics(self) -> dict:
+        """ Returns how much of the body was read and whether the budget cut it off """
+
+        return {'bytes_read': self.bytes_read, 'is_truncated': self.is_truncated}
@@ -0,0 +1,73 @@
+""" This module holds the ConfigHelper class """
+
+
+class ConfigHelper:
+    """ This class is responsible for reading optional values from the config. The config is either a ConfigParser or a
+        plain dictionary of sections (as used by the tests), so a missing section or key falls back to a default. """
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @staticmethod
+    def get_value(config, section, key, default=None):
+        """ Returns the raw value of a config key or the default if the section or key does not exist """
+
+        if config is None or section not in config:
+            return default
+
+        config_section = config[section]
+
+        if key not in config_section:
+            return default
+
+        return config_section[key]
+
+    @staticmethod
+    def get_bool(config, section, key, default=False) -> bool:
+        """ Returns a config value as a boolean """
+
+        value = ConfigHelper.get_value(config, section, key)
+
+        if value is None or value == '':
+            return default
+
+        if isinstance(value, bool):
+            return value
+
+        return str(value).strip().lower() in ['1', 'true', 'yes', 'on']
+
+    @staticmethod
+    def get_int(config, section, key, default=0) -> int:
+        """ Returns a config value as an integer """
+
+        value = ConfigHelper.get_value(config, section, key)
+
+        if value is None or value == '':
+            return default
+
+        return int(value)
+
+    @staticmethod
+    def get_float(config, section, key, default=0.0) -> float:
+        """ Returns a config value as a float """
+
+        value = ConfigHelper.get_value(config, section, key)
+
+        if value is None or value == '':
+            return default
+
+        return float(value)
+
+    @staticmethod
+    def get_list(config, section, key, default=None) -> list:
+        """ Returns a comma separated config value as a list of stripped, non-empty strings """
+
+        value = ConfigHelper.get_value(config, section, key)
+
+        if value is None:
+            return list(default or [])
+
+        if isinstance(value, (list, tuple)):
+            return [str(item).strip() for item in value if str(item).strip()]
+
+        return [item.strip() for item in str(value).split(',') if item.strip()]
@@ -1,6 +1,9 @@
 """ This module holds the Diagnostics class """
 
 import logging
+from utilities.config_helper import ConfigHelper
+from utilities.metrics_record import MetricsRecord
+from utilities.phase_timer import PhaseTimer
 
 # Setup logger
 LOGGER = logging.getLogger()
@@ -15,24 +18,85 @@ class Diagnostics:
 
     @staticmethod
     def print_results(bad_bots_output) -> None:
-        """ Prints bad bots results to screen """
+        """ Logs one structured record per invocation (see MetricsRecord), with the phase timings of the invocation.
+            The readable results are logged at debug level. Nothing is formatted unless the level is enabled. """
 
         bad_bots_results = bad_bots_output['bad_bots_results']
+        namespace = ConfigHelper.get_value(bad_bots_output.get('config'), 'METRICS', 'NAMESPACE', 'BadBots')
+
+        LOGGER.info('%s', MetricsRecord(bad_bots_results, namespace, PhaseTimer.get_elapsed_in_ms()))
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            Diagnostics.print_readable_results(bad_bots_results)
+
+    @staticmethod
+    def print_readable_results(bad_bots_results) -> None:
+        """ Prints bad bots results to screen """
 
         source_ip = bad_bots_results['source_ip']
         source_ip_type = bad_bots_results['source_ip_type']
         is_bot = bad_bots_results['is_bot']
         bot_confidence_score = bad_bots_results["bot_confidence_score"]
 
-        LOGGER.info('================================ Bad bots results ================================')
+        LOGGER.debug('================================ Bad bots results ================================')
 
         # pylint: disable=W1202
-        LOGGER.info("Client address: {0}.".format(source_ip))
-        LOGGER.info("Client address type: {0}.".format(source_ip_type))
+        LOGGER.debug("Client address: {0}.".format(source_ip))
+        LOGGER.debug("Client address type: {0}.".format(source_ip_type))
 
         if is_bot:
-            LOGGER.info("Client {0} is bot: TRUE.".format(source_ip))
+            LOGGER.debug("Client {0} is bot: TRUE.".format(source_ip))
         else:
-            LOGGER.info("Client {0} is bot: FALSE.".format(source_ip))
+            LOGGER.debug("Client {0} is bot: FALSE.".format(source_ip))
+
+        LOGGER.debug("Bot confidence score: {0}.".format(bot_confidence_score))
+
+        scoring = bad_bots_results.get('scoring')
+
+        if scoring is not None:
+            LOGGER.debug("Scoring evaluated rules: {0}, stopped: {1}.".format(
+                ", ".join(scoring['rules']), scoring['stop_reason'] or 'no'))
+
+        detector_registry = bad_bots_results.get('detector_registry')
+
+        if detector_registry is not None:
+            LOGGER.debug("Detector build duration: {0:.2f} ms, reused: {1} times.".format(
+                detector_registry['build_duration_in_ms'], detector_registry['reuse_count']))
+
+        geolocation_cache = bad_bots_results.get('geolocation_cache')
+
+        if geolocation_cache is not None:
+            LOGGER.debug("Geolocation cache hits: {0}, misses: {1}, evictions: {2}.".format(
+                geolocation_cache['hits'], geolocation_cache['misses'], geolocation_cache['evictions']))
+
+        verdict_cache = bad_bots_results.get('verdict_cache')
+
+        if verdict_cache is not None:
+            LOGGER.debug("Verdict cache hits: {0}, misses: {1}, evictions: {2}.".format(
+                verdict_cache['hits'], verdict_cache['misses'], verdict_cache['evictions']))
+
+        user_agent_cache = bad_bots_results.get('user_agent_cache')
+
+        if user_agent_cache is not None:
+            LOGGER.debug("User agent cache hits: {0}, misses: {1}, bypasses: {2}.".format(
+                user_agent_cache['hits'], user_agent_cache['misses'], user_agent_cache['bypasses']))
+
+        block_snapshot = bad_bots_results.get('block_snapshot')
+
+        if block_snapshot is not None:
+            LOGGER.debug("Block snapshot hits: {0}, misses: {1}, entries: {2}, memory: {3} bytes.".format(
+                block_snapshot['hits'], block_snapshot['misses'], block_snapshot['entries'],
+                block_snapshot['memory_in_bytes']))
+
+        http_statistics = bad_bots_results.get('http')
+
+        if http_statistics is not None and http_statistics['last_request'] is not None:
+            last_request = http_statistics['last_request']
+            LOGGER.debug("Last HTTP request: TTFB {0:.2f} ms, total {1:.2f} ms, new connection: {2}.".format(
+                last_request['ttfb_in_ms'], last_request['total_duration_in_ms'], last_request['new_connection']))
+
+        block_queue = bad_bots_results.get('block_queue')
 
-        LOGGER.info("Bot confidence score: {0}.".format(bot_confidence_score))
+        if block_queue is not None:
+            LOGGER.debug("Block queue flushed: {0}, failed: {1}, pending: {2}.".format(
+                block_queue['flushed'], block_queue['failed'], block_queue['pending']))
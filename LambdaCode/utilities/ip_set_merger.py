@@ -0,0 +1,102 @@
+""" This module holds the IPSetMerger class """
+
+from ipaddress import collapse_addresses
+from ipaddress import ip_network
+
+
+class IPSetMerger:
+    """ This class is responsible for merging new addresses into a WAF IP set block list. Entries are kept as a set of
+        networks, so an address is never listed twice and addresses already covered by a listed network are skipped. """
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @staticmethod
+    def to_networks(addresses) -> list:
+        """ Parses CIDR strings into networks, dropping duplicates while keeping the original order """
+
+        networks = {}
+
+        for address in addresses:
+            networks.setdefault(ip_network(address, strict=False), None)
+
+        return list(networks)
+
+    @staticmethod
+    def is_covered(network, networks, prefix_lengths) -> bool:
+        """ Indicates whether a network is contained in one of the networks. Only the prefix lengths present in the set
+            are checked, so the cost does not depend on the number of networks. """
+
+        for prefix_length in prefix_lengths:
+            if prefix_length <= network.prefixlen and network.supernet(new_prefix=prefix_length) in networks:
+                return True
+
+        return False
+
+    @staticmethod
+    def collapse(networks, min_prefix_length=None) -> list:
+        """ Aggregates adjacent and overlapping networks into the smallest list of networks per IP version. With
+            min_prefix_length, networks are only aggregated within the same prefix of that length, so no aggregated
+            network is shorter than it. Networks that already are shorter are kept as they are. """
+
+        networks_by_group = {}
+
+        for network in networks:
+            if min_prefix_length is None:
+                group = network.version
+            elif network.prefixlen < min_prefix_length:
+                group = network
+            else:
+                group = network.supernet(new_prefix=min_prefix_length)
+
+            networks_by_group.setdefault(group, []).append(network)
+
+        return sorted((collapsed_network for group_networks in networks_by_group.values()
+                       for collapsed_network in collapse_addresses(group_networks)),
+                      key=lambda network: (network.version, network))
+
+    @staticmethod
+    def merge(current_addresses, new_addresses, collapse=False, min_prefix_length=None):
+        """ Returns the merged block list, or None when every new address is already covered by the current block list
+            so the IP set does not need to be written. With collapse, adjacent and overlapping networks are aggregated,
+            not beyond min_prefix_length when it is given (see collapse). """
+
+        current_networks = IPSetMerger.to_networks(current_addresses)
+        current_network_set = set(current_networks)
+        prefix_lengths = sorted({network.prefixlen for network in current_networks})
+
+        added_networks = [network for network in IPSetMerger.to_networks(new_addresses)
+                          if not IPSetMerger.is_covered(network, current_network_set, prefix_lengths)]
+
+        if not added_networks and len(current_networks) == len(current_addresses):
+            return None
+
+        merged_networks = added_networks + current_networks
+
+        if collapse:
+            merged_networks = IPSetMerger.collapse(merged_networks, min_prefix_length)
+
+        return [network.with_prefixlen for network in merged_networks]
+
+    @staticmethod
+    def remove(current_addresses, removed_addresses) -> tuple:
+        """ Returns the block list without the removed addresses and the list of entries that were actually removed.
+            Entries are matched as networks, so notation differences do not matter, but an address that has been
+            aggregated into a larger network is not removed. The block list is None when nothing was removed. """
+
+        removed_network_set = set(IPSetMerger.to_networks(removed_addresses))
+
+        remaining_networks = []
+        removed_networks = []
+
+        for network in IPSetMerger.to_networks(current_addresses):
+            if network in removed_network_set:
+                removed_networks.append(network)
+            else:
+                remaining_networks.append(network)
+
+        if not removed_networks:
+            return None, []
+
+        return [network.with_prefixlen for network in remaining_networks], \
+            [network.with_prefixlen for network in removed_networks]
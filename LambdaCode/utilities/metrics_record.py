@@ -0,0 +1,94 @@
+""" This module holds the MetricsRecord class """
+
+import json
+import time
+
+
+class MetricsRecord:
+    """ This class is a single line, structured record of an invocation in CloudWatch Embedded Metric Format (EMF):
+        CloudWatch extracts the metrics from the log line, the other members stay searchable with Logs Insights. The
+        record is formatted by __str__, so it costs nothing until the logger actually emits it. """
+
+    # Phase -> metric name
+    phase_metrics = {
+        'parse': 'ParseDuration',
+        'geolocation': 'GeolocationDuration',
+        'scoring': 'ScoringDuration',
+        'waf_read': 'WAFReadDuration',
+        'waf_write': 'WAFWriteDuration'
+    }
+
+    verdict_blocked = 'blocked'
+    verdict_allowed = 'allowed'
+    verdict_not_bot = 'not_bot'
+
+    def __init__(self, bad_bots_results, namespace, duration_in_ms=None, timestamp=None):
+        self.bad_bots_results = bad_bots_results
+        self.namespace = namespace
+        self.duration_in_ms = duration_in_ms
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __str__(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    def get_verdict(self) -> str:
+        """ Returns the verdict of the invocation """
+
+        scoring = self.bad_bots_results.get('scoring') or {}
+
+        if self.bad_bots_results['is_bot']:
+            return self.verdict_blocked
+
+        if scoring.get('stop_reason') == 'allow_list':
+            return self.verdict_allowed
+
+        return self.verdict_not_bot
+
+    def to_dict(self) -> dict:
+        """ Returns the record, only metrics with a value are declared """
+
+        results = self.bad_bots_results
+        scoring = results.get('scoring') or {}
+
+        metric_values = {
+            'BotConfidenceScore': (results['bot_confidence_score'], 'None'),
+            'Blocked': (1 if results['is_bot'] else 0, 'Count')
+        }
+
+        if self.duration_in_ms is not None:
+            metric_values['Duration'] = (round(self.duration_in_ms, 3), 'Milliseconds')
+
+        for phase, duration_in_ms in (results.get('phases') or {}).items():
+            if phase in self.phase_metrics:
+                metric_values[self.phase_metrics[phase]] = (round(duration_in_ms, 3), 'Milliseconds')
+
+        for cache_name, metric_name in [('geolocation_cache', 'GeolocationCacheHitRate'),
+                                        ('verdict_cache', 'VerdictCacheHitRate'),
+                                        ('user_agent_cache', 'UserAgentCacheHitRate'),
+                                        ('block_snapshot', 'BlockSnapshotHitRate')]:
+            cache_statistics = results.get(cache_name)
+
+            if cache_statistics is not None:
+                metric_values[metric_name] = (round(cache_statistics['hit_rate'] * 100, 2), 'Percent')
+
+        record = {
+            '_aws': {
+                'Timestamp': int(self.timestamp * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Verdict']],
+                    'Metrics': [{'Name': metric_name, 'Unit': unit}
+                                for metric_name, (_, unit) in metric_values.items()]
+                }]
+            },
+            'Verdict': self.get_verdict(),
+            'source_ip': results['source_ip'],
+            'source_ip_type': results['source_ip_type'],
+            'stop_reason': scoring.get('stop_reason'),
+            'rules_hit': [rule_name for rule_name, rule_result in (scoring.get('rules') or {}).items()
+                          if rule_result['hit']]
+        }
+
+        record.update({metric_name: value for metric_name, (value, _) in metric_values.items()})
+
+        return record
@@ -0,0 +1,65 @@
+""" This module holds the PhaseTimer class """
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """ This class is responsible for timing the phases of an invocation. The durations of a phase are summed, so a
+        phase that runs more than once (for example a retried IP set update) reports its total. A container handles one
+        invocation at a time, the timer is reset at the start of every invocation. """
+
+    phase_parse = 'parse'
+    phase_geolocation = 'geolocation'
+    phase_scoring = 'scoring'
+    phase_waf_read = 'waf_read'
+    phase_waf_write = 'waf_write'
+
+    _durations = {}
+    _start_time = time.perf_counter()
+    _lock = threading.Lock()
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @classmethod
+    def reset(cls) -> None:
+        """ Starts timing a new invocation """
+
+        with cls._lock:
+            cls._durations = {}
+            cls._start_time = time.perf_counter()
+
+    @classmethod
+    def record(cls, phase, duration_in_ms) -> None:
+        """ Adds a duration to a phase """
+
+        with cls._lock:
+            cls._durations[phase] = cls._durations.get(phase, 0.0) + duration_in_ms
+
+    @classmethod
+    @contextmanager
+    def measure(cls, phase):
+        """ Context manager adding the duration of its block to a phase """
+
+        start_time = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            cls.record(phase, (time.perf_counter() - start_time) * 1000)
+
+    @classmethod
+    def get_durations(cls) -> dict:
+        """ Returns the duration of every phase of the invocation so far, in milliseconds """
+
+        with cls._lock:
+            return dict(cls._durations)
+
+    @classmethod
+    def get_elapsed_in_ms(cls) -> float:
+        """ Returns the time since the start of the invocation, in milliseconds """
+
+        return (time.perf_counter() - cls._start_time) * 1000
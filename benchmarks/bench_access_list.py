@@ -0,0 +1,81 @@
+""" Benchmark of the allow list / deny list lookup latency for growing numbers of prefixes. The latency should stay flat
+    as the list grows, a lookup visits at most one trie node per address byte.
+
+    Usage: python benchmarks/bench_access_list.py [--prefixes 1000,10000,100000] [--lookups 200000]
+"""
+
+import os
+import sys
+import inspect
+import random
+import argparse
+import time
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(CURRENT_DIR)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from access import AccessList
+
+
+def build_access_list(prefix_count) -> tuple:
+    """ Builds an access list of random IPv4 (/16 - /32) and IPv6 (/32 - /128) prefixes, half of them denied. The
+        prefixes are added as strings, as read from a list file at cold start. """
+
+    prefixes = []
+
+    for _ in range(prefix_count // 2):
+        prefixes.append('{0}/{1}'.format(IPv4Address(random.getrandbits(32)), random.randint(16, 32)))
+        prefixes.append('{0}/{1}'.format(IPv6Address(random.getrandbits(128)), random.randint(32, 128)))
+
+    access_list = AccessList()
+    start_time = time.perf_counter()
+
+    verdicts = [AccessList.verdict_deny, AccessList.verdict_allow]
+    access_list.add_all((prefix, verdicts[index // 2 % 2]) for index, prefix in enumerate(prefixes))
+
+    return access_list, time.perf_counter() - start_time
+
+
+def run_lookups(access_list, addresses) -> float:
+    """ Returns the mean lookup latency in microseconds """
+
+    start_time = time.perf_counter()
+
+    for address in addresses:
+        access_list.get_verdict(address)
+
+    return (time.perf_counter() - start_time) * 1000000 / len(addresses)
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--prefixes', default='1000,10000,100000', help='Comma separated list sizes')
+    parser.add_argument('--lookups', type=int, default=200000, help='Number of lookups per IP version')
+    arguments = parser.parse_args()
+
+    random.seed(42)
+
+    ipv4_addresses = [IPv4Address(random.getrandbits(32)) for _ in range(arguments.lookups)]
+    ipv6_addresses = [IPv6Address(random.getrandbits(128)) for _ in range(arguments.lookups)]
+
+    for prefix_count in [int(value) for value in arguments.prefixes.split(',')]:
+        access_list, build_duration = build_access_list(prefix_count)
+
+        print('{0:>7} prefixes: built in {1:.2f} s, IPv4 {2:.2f} us, IPv6 {3:.2f} us per lookup.'.format(
+            prefix_count, build_duration, run_lookups(access_list, ipv4_addresses),
+            run_lookups(access_list, ipv6_addresses)))
+
+
+if __name__ == '__main__':
+    main()
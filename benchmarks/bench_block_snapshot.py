@@ -0,0 +1,114 @@
+""" Benchmark of the block set snapshot: memory of a full IP set (10,000 entries, the WAF limit) and the latency of an
+    "already blocked" lookup, compared with checking the parsed IP set like the merge does.
+
+    Usage: python benchmarks/bench_block_snapshot.py [--entries 10000] [--lookups 200000]
+"""
+
+import os
+import sys
+import inspect
+import random
+import argparse
+import time
+import tracemalloc
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+from ipaddress import ip_address
+from ipaddress import ip_network
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(CURRENT_DIR)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from cache import BlockSetSnapshot
+from utilities import IPSetMerger
+
+
+def create_addresses(randomizer, version, entry_count) -> list:
+    """ Returns the entries of a full IP set, mostly single addresses with some networks """
+
+    addresses = []
+
+    for index in range(entry_count):
+        if version == 4:
+            network = ip_network((IPv4Address(randomizer.getrandbits(32)), 24 if index % 10 == 0 else 32), strict=False)
+        else:
+            network = ip_network((IPv6Address(randomizer.getrandbits(128)), 64 if index % 10 == 0 else 128),
+                                 strict=False)
+
+        addresses.append(network.with_prefixlen)
+
+    return addresses
+
+
+def measure_build(addresses) -> tuple:
+    """ Returns the snapshot, its build time in milliseconds and the peak memory of the build in bytes """
+
+    start_time = time.perf_counter()
+    snapshot = BlockSetSnapshot(addresses)
+    build_time = (time.perf_counter() - start_time) * 1000
+
+    # Tracing allocations slows down the build, so the memory is measured in a second build
+    tracemalloc.start()
+    BlockSetSnapshot(addresses)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return snapshot, build_time, peak_memory
+
+
+def measure_lookups(contains, addresses) -> float:
+    """ Returns the mean lookup latency in microseconds """
+
+    start_time = time.perf_counter()
+
+    for address in addresses:
+        contains(address)
+
+    return (time.perf_counter() - start_time) * 1000000 / len(addresses)
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=10000, help='Number of entries of the IP set')
+    parser.add_argument('--lookups', type=int, default=200000, help='Number of lookups')
+    parser.add_argument('--seed', type=int, default=42)
+    arguments = parser.parse_args()
+
+    randomizer = random.Random(arguments.seed)
+
+    for version in [4, 6]:
+        addresses = create_addresses(randomizer, version, arguments.entries)
+        snapshot, build_time, peak_memory = measure_build(addresses)
+
+        # Half of the lookups are blocked addresses, half are random
+        lookup_addresses = [ip_address(randomizer.choice(addresses).split('/')[0]) if index % 2 else
+                            ip_address(randomizer.getrandbits(32 if version == 4 else 128))
+                            for index in range(arguments.lookups)]
+
+        networks = IPSetMerger.to_networks(addresses)
+        network_set = set(networks)
+        prefix_lengths = sorted({network.prefixlen for network in networks})
+
+        snapshot_latency = measure_lookups(snapshot.contains, lookup_addresses)
+        merger_latency = measure_lookups(
+            lambda address: IPSetMerger.is_covered(ip_network(address), network_set, prefix_lengths),
+            lookup_addresses[:arguments.lookups // 10])
+
+        print('IPv{0}: {1} entries packed into {2} ranges in {3:.2f} ms, {4:.1f} KB held ({5:.1f} KB peak while '
+              'building).'.format(version, arguments.entries, len(snapshot), build_time,
+                                  snapshot.get_memory_usage() / 1024, peak_memory / 1024))
+        print('       snapshot lookup {0:.2f} us, parsed IP set lookup {1:.2f} us.'.format(snapshot_latency,
+                                                                                             merger_latency))
+
+
+if __name__ == '__main__':
+    main()
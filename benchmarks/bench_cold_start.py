@@ -0,0 +1,160 @@
+""" Benchmark of the cold start of the Lambda entry point. Every sample starts a fresh interpreter that imports app.py
+    (the init phase) and handles a bot request, with and without warming up the heavy objects during init. The WAF
+    client is created like in production but the IP set calls go to the local stub, geolocation lookups are disabled.
+
+    Usage: python benchmarks/bench_cold_start.py [--samples 5] [--import-profile]
+"""
+
+import os
+import sys
+import inspect
+import argparse
+import configparser
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % PROJECT_ROOT
+
+# Runs in the fresh interpreter, prints the timings as JSON
+CHILD_SCRIPT = '''
+import json
+import sys
+import time
+
+sys.path.insert(0, {project_root_src!r})
+sys.path.insert(0, {tests_dir!r})
+
+from connection import AWSConnection
+from stubs import StubWAFv2Client
+
+stub_wafv2_client = StubWAFv2Client()
+stub_wafv2_client.create_ip_set(Name='ip_set_bad_bots_ipv4', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+get_connection = AWSConnection.get_connection
+
+
+def get_stub_connection(aws_component, region_name=None):
+    # Pays for importing botocore and creating the client like production, the calls go to the stub
+    get_connection(aws_component, region_name)
+    return stub_wafv2_client
+
+
+AWSConnection.get_connection = staticmethod(get_stub_connection)
+
+start_time = time.perf_counter()
+import app
+init_duration = time.perf_counter() - start_time
+
+event = {{
+    'httpMethod': 'CONNECT',
+    'queryStringParameters': {{'q': '1 UNION SELECT password'}},
+    'requestContext': {{'identity': {{'sourceIp': '1.1.1.1'}}}},
+    'headers': {{}}
+}}
+
+start_time = time.perf_counter()
+app.lambda_handler(event, None)
+first_response_time = time.time()
+first_invocation_duration = time.perf_counter() - start_time
+
+event['requestContext']['identity']['sourceIp'] = '2.2.2.2'
+start_time = time.perf_counter()
+app.lambda_handler(event, None)
+second_invocation_duration = time.perf_counter() - start_time
+
+print(json.dumps({{
+    'init_in_ms': init_duration * 1000,
+    'first_invocation_in_ms': first_invocation_duration * 1000,
+    'second_invocation_in_ms': second_invocation_duration * 1000,
+    'first_response_time': first_response_time
+}}))
+'''
+
+
+def write_config(config_path, warm_up) -> None:
+    """ Writes the config of a benchmark mode, based on the shipped config """
+
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config.read(os.path.join(PROJECT_ROOT_SRC, 'config', 'config.ini'))
+
+    for key in ['PRELOAD_DETECTORS', 'WARM_UP_ACCESS_LIST', 'WARM_UP_GEOLOCATION', 'WARM_UP_HTTP_POOL',
+                'WARM_UP_AWS_CLIENT']:
+        config['BAD_BOTS'][key] = 'true' if warm_up else 'false'
+
+    config['BAD_BOTS']['WARM_UP_IP_SET_REFERENCES'] = 'false'
+    config['GEOLOCATION']['PROVIDERS'] = ''
+    config['VERDICT_CACHE']['ENABLED'] = 'false'
+
+    with open(config_path, 'w') as config_file:
+        config.write(config_file)
+
+
+def run_sample(config_path, python_options=None) -> tuple:
+    """ Starts a fresh interpreter and returns its timings with the time to first response, and its stderr """
+
+    environment = dict(os.environ, BAD_BOTS_CONFIG_PATH=config_path, AWS_DEFAULT_REGION='eu-west-1',
+                       AWS_ACCESS_KEY_ID='benchmark', AWS_SECRET_ACCESS_KEY='benchmark')
+    script = CHILD_SCRIPT.format(project_root_src=PROJECT_ROOT_SRC, tests_dir=os.path.join(PROJECT_ROOT, 'tests'))
+
+    start_time = time.time()
+    process = subprocess.run([sys.executable] + (python_options or []) + ['-c', script], env=environment,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    timings['time_to_first_response_in_ms'] = (timings.pop('first_response_time') - start_time) * 1000
+
+    return timings, process.stderr
+
+
+def print_import_profile(config_path, module_count) -> None:
+    """ Prints the modules with the longest cumulative import time, as reported by -X importtime """
+
+    _, stderr = run_sample(config_path, ['-X', 'importtime'])
+    imports = []
+
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, module_name = line[len('import time:'):].split('|')
+
+            if cumulative.strip().isdigit():
+                imports.append((int(cumulative), module_name.rstrip()))
+
+    print('Slowest imports (cumulative):')
+
+    for cumulative, module_name in sorted(imports, reverse=True)[:module_count]:
+        print('  {0:>8.2f} ms {1}'.format(cumulative / 1000, module_name))
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=5, help='Number of cold starts per mode')
+    parser.add_argument('--import-profile', action='store_true', help='Print the slowest imports')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for mode_name, warm_up in [('no warm up', False), ('warm up', True)]:
+            config_path = os.path.join(temporary_directory, 'config.ini')
+            write_config(config_path, warm_up)
+
+            samples = [run_sample(config_path)[0] for _ in range(arguments.samples)]
+
+            print('{0:<10}: init {1:.2f} ms, first invocation {2:.2f} ms, second invocation {3:.2f} ms, '
+                  'time to first response {4:.2f} ms (median of {5}).'.format(
+                      mode_name, *[statistics.median(sample[key] for sample in samples)
+                                   for key in ['init_in_ms', 'first_invocation_in_ms', 'second_invocation_in_ms',
+                                               'time_to_first_response_in_ms']], arguments.samples))
+
+        if arguments.import_profile:
+            print_import_profile(config_path, 15)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+""" Benchmark of the per lookup latency of the memory mapped range table geolocation provider.
+
+    Usage: python benchmarks/bench_geolocation_lookup.py [--ranges 100000] [--lookups 200000]
+"""
+
+import os
+import sys
+import inspect
+import random
+import argparse
+import tempfile
+import time
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(CURRENT_DIR)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from geolocation import RangeTableBuilder
+from geolocation import RangeTableGeolocationProvider
+
+COUNTRY_CODES = ['NL', 'BE', 'DE', 'US', 'CN', 'RU', 'BR', 'IN', 'FR', 'GB']
+
+
+def build_range_table(range_table_path, range_count) -> None:
+    """ Builds a synthetic range table of evenly spread, non overlapping IPv4 and IPv6 ranges """
+
+    builder = RangeTableBuilder()
+
+    ipv4_step = (2 ** 32) // range_count
+    ipv6_step = (2 ** 128) // range_count
+
+    for index in range(range_count):
+        builder.add_range(str(IPv4Address(index * ipv4_step)), str(IPv4Address(index * ipv4_step + ipv4_step // 2)),
+                          COUNTRY_CODES[index % len(COUNTRY_CODES)])
+        builder.add_range(str(IPv6Address(index * ipv6_step)), str(IPv6Address(index * ipv6_step + ipv6_step // 2)),
+                          COUNTRY_CODES[index % len(COUNTRY_CODES)])
+
+    builder.write(range_table_path)
+
+
+def run_lookups(provider, addresses) -> float:
+    """ Returns the mean lookup latency in microseconds """
+
+    start_time = time.perf_counter()
+
+    for address in addresses:
+        provider.get_country(address)
+
+    return (time.perf_counter() - start_time) * 1000000 / len(addresses)
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ranges', type=int, default=100000, help='Number of ranges per IP version')
+    parser.add_argument('--lookups', type=int, default=200000, help='Number of lookups per IP version')
+    arguments = parser.parse_args()
+
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        range_table_path = os.path.join(temporary_directory, 'ip_ranges.bin')
+
+        start_time = time.perf_counter()
+        build_range_table(range_table_path, arguments.ranges)
+        build_duration = time.perf_counter() - start_time
+
+        provider = RangeTableGeolocationProvider(range_table_path)
+
+        ipv4_addresses = [str(IPv4Address(random.getrandbits(32))) for _ in range(arguments.lookups)]
+        ipv6_addresses = [str(IPv6Address(random.getrandbits(128))) for _ in range(arguments.lookups)]
+
+        print('Range table: {0} ranges per IP version, {1:.1f} MB, built in {2:.2f} s.'.format(
+            arguments.ranges, os.path.getsize(range_table_path) / 1024 / 1024, build_duration))
+        print('IPv4 lookup: {0:.2f} us per lookup.'.format(run_lookups(provider, ipv4_addresses)))
+        print('IPv6 lookup: {0:.2f} us per lookup.'.format(run_lookups(provider, ipv6_addresses)))
+
+        provider.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+""" Benchmark of app.lambda_handler without AWS or the internet. The IP set calls go to the in-process stub WAFv2 client
+    (with LockToken semantics) and the geolocation lookups to a local HTTP stand-in of the geolocation API with a
+    configurable latency. Measures the cold start (fresh interpreters) and the warm latency percentiles, throughput and
+    peak memory of benign, crawler, suspicious (the geolocation decides) and payload attack event mixes. The results are
+    written as JSON, a previous result file can be passed to --compare to spot regressions between commits.
+
+    Usage: python benchmarks/bench_lambda_handler.py [--events 2000] [--geolocation-latency-ms 20]
+                                                     [--output results.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import inspect
+import argparse
+import configparser
+import json
+import logging
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from ipaddress import IPv4Address
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % PROJECT_ROOT
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'tests'))
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from connection import AWSConnection
+from connection import AWSWAFv2Connection
+from stubs import StubWAFv2Client
+
+COUNTRIES = ['Netherlands', 'Belgium', 'Germany', 'United States', 'China', 'Russia']
+
+USER_AGENT_BENIGN = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
+                    'Chrome/86.0.4240.75 Safari/537.36'
+USER_AGENT_CRAWLER = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+
+ATTACK_PAYLOADS = [
+    {'q': "1' OR '1'='1' UNION SELECT username, password FROM users --"},
+    {'q': '<script>alert(document.cookie)</script>'},
+    {'q': '<img src=x onerror=alert(1)>'}
+]
+
+# Runs in the fresh interpreter, prints the timings as JSON
+CHILD_SCRIPT = '''
+import json
+import sys
+import time
+
+sys.path.insert(0, {project_root_src!r})
+sys.path.insert(0, {tests_dir!r})
+
+from connection import AWSConnection
+from stubs import StubWAFv2Client
+
+stub_wafv2_client = StubWAFv2Client(address_limit=1000000)
+stub_wafv2_client.create_ip_set(Name='ip_set_bad_bots_ipv4', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+AWSConnection.set_connection('wafv2', stub_wafv2_client)
+
+start_time = time.perf_counter()
+import app
+init_duration = time.perf_counter() - start_time
+
+start_time = time.perf_counter()
+app.lambda_handler({event!r}, None)
+first_invocation_duration = time.perf_counter() - start_time
+
+print(json.dumps({{'init_in_ms': init_duration * 1000, 'first_invocation_in_ms': first_invocation_duration * 1000}}))
+'''
+
+
+class GeolocationRequestHandler(BaseHTTPRequestHandler):
+    """ Answers like the geolocation API after the configured latency, the country follows from the last octet """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, with Nagle's algorithm every keep-alive lookup would wait for an ACK
+    disable_nagle_algorithm = True
+    latency_in_seconds = 0.0
+    lookups = 0
+
+    def do_GET(self):
+        """ Handles a lookup """
+        # pylint: disable=C0103
+
+        GeolocationRequestHandler.lookups += 1
+        time.sleep(self.latency_in_seconds)
+
+        last_octet = self.path.rstrip('/').rsplit('.', 1)[-1]
+        country = COUNTRIES[int(last_octet) % len(COUNTRIES)] if last_octet.isdigit() else ''
+        body = json.dumps({'status': 'success', 'country': country}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_arguments):
+        """ Keeps the benchmark output clean """
+
+
+def start_geolocation_server(latency_in_ms) -> ThreadingHTTPServer:
+    """ Starts the geolocation stand-in on a free local port """
+
+    GeolocationRequestHandler.latency_in_seconds = latency_in_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GeolocationRequestHandler)
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def write_config(config_path, api_url, geolocation_cache, verdict_cache) -> None:
+    """ Writes the benchmark config, based on the shipped config """
+
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config.read(os.path.join(PROJECT_ROOT_SRC, 'config', 'config.ini'))
+
+    config['BAD_BOTS']['WARM_UP_IP_SET_REFERENCES'] = 'false'
+    config['GEOLOCATION']['API_URL'] = api_url
+    config['GEOLOCATION']['PROVIDERS'] = 'http'
+    config['GEOLOCATION']['CACHE_ENABLED'] = 'true' if geolocation_cache else 'false'
+    config['VERDICT_CACHE']['ENABLED'] = 'true' if verdict_cache else 'false'
+    config['VERDICT_CACHE']['SHARED_STORE_PATH'] = ''
+    config['BLOCKING']['MODE'] = 'sync'
+    config['BLOCKING']['BLOCK_TTL_SECONDS'] = '0'
+
+    with open(config_path, 'w') as config_file:
+        config.write(config_file)
+
+
+def create_event(source_ip, user_agent, query_string_parameters=None, http_method='GET') -> dict:
+    """ Returns an API Gateway proxy event """
+
+    return {
+        'httpMethod': http_method,
+        'path': '/',
+        'queryStringParameters': query_string_parameters,
+        'body': None,
+        'requestContext': {'identity': {'sourceIp': source_ip}},
+        'headers': {'User-Agent': user_agent}
+    }
+
+
+def create_events(mix, count, randomizer, address_pool) -> list:
+    """ Returns the events of a mix. Source addresses are drawn from a pool, so repeat visitors hit the caches. """
+
+    events = []
+
+    for _ in range(count):
+        source_ip = str(IPv4Address(randomizer.choice(address_pool)))
+
+        if mix == 'benign':
+            events.append(create_event(source_ip, USER_AGENT_BENIGN))
+        elif mix == 'crawler':
+            events.append(create_event(source_ip, USER_AGENT_CRAWLER))
+        elif mix == 'suspicious':
+            # The HTTP method alone stays below the threshold, the geolocation decides
+            events.append(create_event(source_ip, USER_AGENT_BENIGN, http_method='CONNECT'))
+        else:
+            events.append(create_event(source_ip, USER_AGENT_BENIGN, randomizer.choice(ATTACK_PAYLOADS)))
+
+    return events
+
+
+def get_percentiles(durations) -> dict:
+    """ Returns the p50, p95 and p99 of durations in milliseconds """
+
+    ordered = sorted(durations)
+
+    def get_percentile(percentile):
+        return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+    return {
+        'p50_in_ms': get_percentile(50),
+        'p95_in_ms': get_percentile(95),
+        'p99_in_ms': get_percentile(99),
+        'mean_in_ms': statistics.mean(ordered)
+    }
+
+
+def run_cold_samples(config_path, event, samples) -> dict:
+    """ Starts fresh interpreters that import app.py and handle one event, returns the median timings """
+
+    environment = dict(os.environ, BAD_BOTS_CONFIG_PATH=config_path, AWS_DEFAULT_REGION='eu-west-1',
+                       AWS_ACCESS_KEY_ID='benchmark', AWS_SECRET_ACCESS_KEY='benchmark')
+    script = CHILD_SCRIPT.format(project_root_src=PROJECT_ROOT_SRC, tests_dir=os.path.join(PROJECT_ROOT, 'tests'),
+                                 event=event)
+    timings = []
+
+    for _ in range(samples):
+        process = subprocess.run([sys.executable, '-c', script], env=environment, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        timings.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    init_durations = [timing['init_in_ms'] for timing in timings]
+    first_invocation_durations = [timing['first_invocation_in_ms'] for timing in timings]
+
+    return {
+        'samples': samples,
+        'init_p50_in_ms': statistics.median(init_durations),
+        'first_invocation_p50_in_ms': statistics.median(first_invocation_durations),
+        'total_p50_in_ms': statistics.median(init + first for init, first in zip(init_durations,
+                                                                                 first_invocation_durations)),
+        'total_max_in_ms': max(init + first for init, first in zip(init_durations, first_invocation_durations))
+    }
+
+
+def reset_containers() -> StubWAFv2Client:
+    """ Drops the per container caches, so every mix starts from the same state, and returns a new stub client """
+
+    # pylint: disable=C0415
+    from cache import BlockSetSnapshot
+    from cache import GeolocationCache
+    from cache import SQLiteVerdictStore
+    from cache import UserAgentCache
+    from cache import VerdictCache
+
+    GeolocationCache.set_cache(None)
+    VerdictCache.set_verdict_cache(None)
+    SQLiteVerdictStore.close_all()
+    UserAgentCache.set_user_agent_cache(None)
+    BlockSetSnapshot.reset()
+
+    stub_wafv2_client = StubWAFv2Client(address_limit=1000000)
+    stub_wafv2_client.create_ip_set(Name='ip_set_bad_bots_ipv4', Scope='REGIONAL', IPAddressVersion='IPV4',
+                                    Addresses=[])
+    AWSConnection.set_connection('wafv2', stub_wafv2_client)
+    AWSWAFv2Connection.invalidate_ip_set_references()
+
+    return stub_wafv2_client
+
+
+def run_warm_mix(app, events, warm_up_events) -> dict:
+    """ Handles the events of a mix in this (warm) interpreter and returns latency, throughput and memory. The
+        warm up events run first, so the caches hold the repeat visitors like in a container that has been serving. """
+
+    stub_wafv2_client = reset_containers()
+    GeolocationRequestHandler.lookups = 0
+
+    for event in warm_up_events:
+        app.lambda_handler(event, None)
+
+    durations = []
+    start_time = time.perf_counter()
+
+    for event in events:
+        invocation_start_time = time.perf_counter()
+        app.lambda_handler(event, None)
+        durations.append((time.perf_counter() - invocation_start_time) * 1000)
+
+    total_duration = time.perf_counter() - start_time
+    geolocation_lookups = GeolocationRequestHandler.lookups
+
+    # Memory is measured in a separate pass, tracing allocations slows down the handler
+    reset_containers()
+    tracemalloc.start()
+
+    for event in events[:min(len(events), 500)]:
+        app.lambda_handler(event, None)
+
+    _, peak_traced_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = get_percentiles(durations)
+    result.update({
+        'events': len(events),
+        'throughput_per_second': len(events) / total_duration if total_duration > 0 else 0.0,
+        'peak_traced_memory_in_kb': peak_traced_bytes / 1024,
+        'waf_calls': dict(stub_wafv2_client.call_counts),
+        'geolocation_lookups': geolocation_lookups
+    })
+
+    return result
+
+
+def compare_results(results, baseline) -> None:
+    """ Prints the change of every warm metric against a previous result file """
+
+    print('Compared with {0}:'.format(baseline.get('commit') or 'baseline'))
+
+    for mix, mix_result in results['warm'].items():
+        baseline_mix_result = baseline.get('warm', {}).get(mix)
+
+        if baseline_mix_result is None:
+            continue
+
+        for metric in ['p50_in_ms', 'p95_in_ms', 'p99_in_ms', 'throughput_per_second', 'peak_traced_memory_in_kb']:
+            if baseline_mix_result.get(metric):
+                change = (mix_result[metric] - baseline_mix_result[metric]) / baseline_mix_result[metric] * 100
+                print('  {0:<8} {1:<26} {2:>10.2f} -> {3:>10.2f} ({4:+.1f}%)'.format(
+                    mix, metric, baseline_mix_result[metric], mix_result[metric], change))
+
+
+def get_commit() -> str:
+    """ Returns the commit of the working tree, or None outside a git checkout """
+
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=2000, help='Number of warm events per mix')
+    parser.add_argument('--cold-samples', type=int, default=5, help='Number of cold starts')
+    parser.add_argument('--addresses', type=int, default=500, help='Number of distinct source addresses')
+    parser.add_argument('--geolocation-latency-ms', type=float, default=20.0, help='Latency of the geolocation API')
+    parser.add_argument('--disable-geolocation-cache', action='store_true')
+    parser.add_argument('--disable-verdict-cache', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_lambda_handler.json', help='JSON result file')
+    parser.add_argument('--compare', help='Previous JSON result file to compare with')
+    arguments = parser.parse_args()
+
+    randomizer = random.Random(arguments.seed)
+    # Public IPv4 addresses, the geolocation stand-in answers for any of them
+    address_pool = [randomizer.randrange(int(IPv4Address('11.0.0.0')), int(IPv4Address('99.0.0.0')))
+                    for _ in range(arguments.addresses)]
+    mixes = {mix: create_events(mix, arguments.events, randomizer, address_pool)
+             for mix in ['benign', 'crawler', 'suspicious', 'attack']}
+
+    server = start_geolocation_server(arguments.geolocation_latency_ms)
+    api_url = 'http://127.0.0.1:{0}/json/'.format(server.server_address[1])
+
+    results = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'arguments': vars(arguments),
+        'cold': {},
+        'warm': {}
+    }
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        config_path = os.path.join(temporary_directory, 'config.ini')
+        write_config(config_path, api_url, not arguments.disable_geolocation_cache,
+                     not arguments.disable_verdict_cache)
+        os.environ.update(BAD_BOTS_CONFIG_PATH=config_path, AWS_DEFAULT_REGION='eu-west-1',
+                          AWS_ACCESS_KEY_ID='benchmark', AWS_SECRET_ACCESS_KEY='benchmark')
+
+        for mix, events in mixes.items():
+            results['cold'][mix] = run_cold_samples(config_path, events[0], arguments.cold_samples)
+
+        # The handler logs one metrics record per invocation, which is not part of what is measured here
+        logging.disable(logging.INFO)
+
+        # The stub is in place before the init phase, like in the cold samples
+        reset_containers()
+
+        # pylint: disable=C0415
+        import app
+
+        for mix, events in mixes.items():
+            results['warm'][mix] = run_warm_mix(app, events, mixes[mix][:min(len(events), 50)])
+
+    server.shutdown()
+    results['peak_rss_in_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    for mix in mixes:
+        cold = results['cold'][mix]
+        warm = results['warm'][mix]
+
+        print('{0:<10}: cold {1:.2f} ms (init {2:.2f} ms), warm p50 {3:.3f} ms, p95 {4:.3f} ms, p99 {5:.3f} ms, '
+              '{6:.0f} events/s, peak traced memory {7:.0f} KB.'.format(
+                  mix, cold['total_p50_in_ms'], cold['init_p50_in_ms'], warm['p50_in_ms'], warm['p95_in_ms'],
+                  warm['p99_in_ms'], warm['throughput_per_second'], warm['peak_traced_memory_in_kb']))
+
+    print('Peak RSS {0} KB.'.format(results['peak_rss_in_kb']))
+
+    with open(arguments.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+
+    print('Wrote {0}.'.format(arguments.output))
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            compare_results(results, json.load(baseline_file))
+
+
+if __name__ == '__main__':
+    main()
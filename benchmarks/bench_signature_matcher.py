@@ -0,0 +1,96 @@
+""" Benchmark of the single pass signature matcher against the previous approach of running every payload regex
+    separately over the body and the query string parameters.
+
+    Usage: python benchmarks/bench_signature_matcher.py [--iterations 200]
+"""
+
+import os
+import sys
+import inspect
+import argparse
+import re
+import time
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(CURRENT_DIR)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from scoring import SignatureMatcher
+
+# The regexes as they were compiled by check_bot_confidence before the signature matcher
+SQLI_REGEX = re.compile(
+    r'\b(ALTER|CREATE|DELETE|DROP|EXEC(UTE){0,1}|INSERT( +INTO){0,1}|MERGE|SELECT|UPDATE|UNION( +ALL){0,1})\b')
+XSS_REGEX_1 = re.compile(r'((\%3C)|<)((\%2F)|\/)*[a-z0-9\%]+((\%3E)|>)')
+XSS_REGEX_2 = re.compile(r'((\%3C)|<)((\%69)|i|(\%49))((\%6D)|m|(\%4D))((\%67)|g|(\%47))[^\n]+((\%3E)|>)', re.I)
+
+
+def scan_per_regex(body, query_string_parameters) -> set:
+    """ Runs every regex over both inputs, as the confidence check used to do """
+
+    matches = set()
+
+    if SQLI_REGEX.search(body) or SQLI_REGEX.search(query_string_parameters):
+        matches.add('sql_injection')
+
+    if XSS_REGEX_1.search(body) or XSS_REGEX_1.search(query_string_parameters):
+        matches.add('xss')
+
+    if XSS_REGEX_2.search(body) or XSS_REGEX_2.search(query_string_parameters):
+        matches.add('xss_image')
+
+    return matches
+
+
+def get_payloads() -> dict:
+    """ Returns benign and malicious payloads of increasing size """
+
+    benign_text = 'username=john&comment=Great product, would buy again. ' * 20
+
+    return {
+        'benign 1 KB': (benign_text[:1024], "{'page': '2'}"),
+        'benign 64 KB': ((benign_text * 64)[:65536], "{'page': '2'}"),
+        'benign 1 MB': ((benign_text * 1024)[:1048576], "{'page': '2'}"),
+        'attack at end 64 KB': ((benign_text * 64)[:65536] + ' UNION SELECT password', "{'q': '<script>'}"),
+        'attack at start 1 MB': ('DROP TABLE users; ' + (benign_text * 1024)[:1048576], "{'page': '2'}")
+    }
+
+
+def measure(function, iterations) -> float:
+    """ Returns the mean duration of the function in microseconds """
+
+    start_time = time.perf_counter()
+
+    for _ in range(iterations):
+        function()
+
+    return (time.perf_counter() - start_time) * 1000000 / iterations
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200, help='Number of scans per payload')
+    parser.add_argument('--max-scan-length', type=int, default=None, help='Maximum number of characters scanned')
+    arguments = parser.parse_args()
+
+    signature_matcher = SignatureMatcher()
+
+    print('{0:<24}{1:>18}{2:>18}{3:>10}'.format('Payload', 'Per regex (us)', 'Single pass (us)', 'Speedup'))
+
+    for name, (body, query_string_parameters) in get_payloads().items():
+        per_regex = measure(lambda: scan_per_regex(body, query_string_parameters), arguments.iterations)
+        single_pass = measure(lambda: signature_matcher.scan_all([body, query_string_parameters],
+                                                                 arguments.max_scan_length), arguments.iterations)
+
+        print('{0:<24}{1:>18.1f}{2:>18.1f}{3:>9.1f}x'.format(name, per_regex, single_pass, per_regex / single_pass))
+
+
+if __name__ == '__main__':
+    main()
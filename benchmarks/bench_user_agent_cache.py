@@ -0,0 +1,143 @@
+""" Benchmark of the user agent classification with and without the user agent cache, on a skewed (Zipf) distribution
+    of browser and crawler user agents with a tail of unique user agents, like real traffic.
+
+    Usage: python benchmarks/bench_user_agent_cache.py [--requests 200000] [--unique-share 0.02] [--cache-size 2048]
+"""
+
+import os
+import sys
+import inspect
+import random
+import argparse
+import time
+
+# Fix module import form parent directory error.
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(CURRENT_DIR)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from crawlerdetect import CrawlerDetect
+from cache import TTLLRUCache
+from cache import UserAgentCache
+
+BROWSERS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{0}.0.{1}.75 '
+    'Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{0}.0 '
+    'Safari/605.1.{1}',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:{0}.0) Gecko/20100101 Firefox/{0}.{1}',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 14_{1} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+    'Version/{0}.0 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android 10; SM-G9{1}F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{0}.0.4240.99 '
+    'Mobile Safari/537.36'
+]
+
+CRAWLERS = [
+    'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+    'Mozilla/5.0 (compatible; bingbot/2.0; +http://www.bing.com/bingbot.htm)',
+    'Mozilla/5.0 (compatible; AhrefsBot/7.0; +http://ahrefs.com/robot/)',
+    'Mozilla/5.0 (compatible; SemrushBot/7~bl; +http://www.semrush.com/bot.html)',
+    'Mozilla/5.0 (compatible; YandexBot/3.0; +http://yandex.com/bots)',
+    'python-requests/2.{0}.{1}',
+    'curl/7.{0}.{1}',
+    'Go-http-client/1.1'
+]
+
+
+def create_user_agents(randomizer) -> list:
+    """ Returns the distinct user agents of the popular population, browsers in a few versions and crawlers """
+
+    user_agents = []
+
+    for template in BROWSERS:
+        for _ in range(12):
+            user_agents.append(template.format(randomizer.randrange(78, 88), randomizer.randrange(1, 9)))
+
+    for template in CRAWLERS:
+        user_agents.append(template.format(randomizer.randrange(20, 30), randomizer.randrange(0, 9)))
+
+    randomizer.shuffle(user_agents)
+
+    return user_agents
+
+
+def create_requests(randomizer, user_agents, request_count, unique_share) -> list:
+    """ Returns the user agents of the requests, Zipf distributed over the population with a share of unique ones """
+
+    weights = [1 / rank for rank in range(1, len(user_agents) + 1)]
+    requests = randomizer.choices(user_agents, weights, k=request_count)
+
+    for index in range(request_count):
+        if randomizer.random() < unique_share:
+            requests[index] = '{0} Unique/{1}'.format(requests[index], index)
+
+    return requests
+
+
+def get_crawler_detect() -> CrawlerDetect:
+    """ Returns a CrawlerDetect that runs the patterns on every call. Recent crawlerdetect releases memoize internally,
+        which would otherwise be measured as the uncached cost. """
+
+    crawler_detect = CrawlerDetect()
+
+    if hasattr(crawler_detect, '_cached_check') and hasattr(crawler_detect, '_check_crawler'):
+        # pylint: disable=W0212
+        crawler_detect._cached_check = crawler_detect._check_crawler
+
+    return crawler_detect
+
+
+def run_classifications(classify, requests) -> float:
+    """ Returns the mean classification latency in microseconds """
+
+    start_time = time.perf_counter()
+
+    for user_agent in requests:
+        classify(user_agent)
+
+    return (time.perf_counter() - start_time) * 1000000 / len(requests)
+
+
+def main() -> None:
+    """ Runs the benchmark """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200000, help='Number of classified requests')
+    parser.add_argument('--unique-share', type=float, default=0.02, help='Share of requests with a unique user agent')
+    parser.add_argument('--cache-size', type=int, default=2048, help='Maximum number of cached user agents')
+    parser.add_argument('--max-user-agent-length', type=int, default=512)
+    parser.add_argument('--seed', type=int, default=42)
+    arguments = parser.parse_args()
+
+    randomizer = random.Random(arguments.seed)
+    user_agents = create_user_agents(randomizer)
+    requests = create_requests(randomizer, user_agents, arguments.requests, arguments.unique_share)
+
+    crawler_detect = get_crawler_detect()
+    crawler_detect.isCrawler('Mozilla/5.0')
+
+    user_agent_cache = UserAgentCache(TTLLRUCache(arguments.cache_size, float('inf')),
+                                      arguments.max_user_agent_length)
+
+    uncached_latency = run_classifications(lambda user_agent: UserAgentCache.classify(crawler_detect, user_agent),
+                                           requests)
+    cached_latency = run_classifications(lambda user_agent: user_agent_cache.lookup(crawler_detect, user_agent),
+                                         requests)
+
+    statistics = user_agent_cache.local_cache.get_statistics()
+
+    print('{0} requests over {1} user agents ({2:.0%} unique):'.format(len(requests), len(set(requests)),
+                                                                      arguments.unique_share))
+    print('  CrawlerDetect     : {0:8.2f} us per request.'.format(uncached_latency))
+    print('  user agent cache  : {0:8.2f} us per request ({1:.1f}x), hit rate {2:.1%}, {3} evictions, '
+          '{4} bypasses.'.format(cached_latency, uncached_latency / cached_latency, statistics['hit_rate'],
+                                 statistics['evictions'], user_agent_cache.bypasses))
+
+
+if __name__ == '__main__':
+    main()
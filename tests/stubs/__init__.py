@@ -0,0 +1,4 @@
+# pylint: disable=C0111
+from .stub_wafv2_client import StubWAFv2Client
+from .stub_sqs_client import StubSQSClient
+from .stub_dynamodb_client import StubDynamoDBClient
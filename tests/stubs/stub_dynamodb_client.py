@@ -0,0 +1,71 @@
+""" This file contains the StubDynamoDBClient class """
+
+import threading
+# pylint: disable=E0401
+from botocore.exceptions import ClientError
+
+
+class StubDynamoDBClient:
+    """ In-process stand-in for the boto3 dynamodb client. It implements the item operations of the block expiry index
+        on tables keyed by ip_set_type and address, including the query of the expires_at index and conditional
+        deletes. """
+
+    def __init__(self, page_size=100):
+        self.page_size = page_size
+
+        # Table name -> (ip_set_type, address) -> item
+        self.tables = {}
+
+        self._lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems):
+        """ Writes the put requests of the tables """
+        # pylint: disable=C0103
+
+        with self._lock:
+            for table_name, write_requests in RequestItems.items():
+                items = self.tables.setdefault(table_name, {})
+
+                for write_request in write_requests:
+                    item = write_request['PutRequest']['Item']
+                    items[(item['ip_set_type']['S'], item['address']['S'])] = item
+
+        return {'UnprocessedItems': {}}
+
+    def query(self, TableName, IndexName, ExpressionAttributeValues, ExclusiveStartKey=None, **_kwargs):
+        """ Returns the items of an IP set type that expire at or before :now, ordered by expiry, one page at a time """
+        # pylint: disable=C0103
+
+        assert IndexName == 'expires_at'
+
+        with self._lock:
+            items = sorted((item for item in self.tables.get(TableName, {}).values()
+                            if item['ip_set_type']['S'] == ExpressionAttributeValues[':ip_set_type']['S'] and
+                            float(item['expires_at']['N']) <= float(ExpressionAttributeValues[':now']['N'])),
+                           key=lambda item: (float(item['expires_at']['N']), item['address']['S']))
+
+        start = int(ExclusiveStartKey['offset']['N']) if ExclusiveStartKey else 0
+        query_result = {'Items': [dict(item) for item in items[start:start + self.page_size]]}
+
+        if start + self.page_size < len(items):
+            query_result['LastEvaluatedKey'] = {'offset': {'N': str(start + self.page_size)}}
+
+        return query_result
+
+    def delete_item(self, TableName, Key, ConditionExpression=None, ExpressionAttributeValues=None):
+        """ Deletes an item, with the condition expression expires_at = :expires_at """
+        # pylint: disable=C0103
+
+        with self._lock:
+            items = self.tables.get(TableName, {})
+            key = (Key['ip_set_type']['S'], Key['address']['S'])
+            item = items.get(key)
+
+            if ConditionExpression is not None and (item is None or item['expires_at'] !=
+                                                    ExpressionAttributeValues[':expires_at']):
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'Condition'}},
+                                  'DeleteItem')
+
+            items.pop(key, None)
+
+        return {}
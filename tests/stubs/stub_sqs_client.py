@@ -0,0 +1,33 @@
+""" This file contains the StubSQSClient class """
+
+import threading
+import uuid
+
+
+class StubSQSClient:
+    """ In-process stand-in for the boto3 sqs client. It keeps the sent messages and hands them out as the records of an
+        SQS event, like the Lambda trigger of a queue does. """
+
+    def __init__(self):
+        # Queue URL -> sent messages as SQS event records
+        self.messages = {}
+
+        self._lock = threading.Lock()
+
+    def send_message(self, QueueUrl, MessageBody, **_kwargs):
+        """ Sends a message to a queue """
+        # pylint: disable=C0103
+
+        message_id = str(uuid.uuid4())
+
+        with self._lock:
+            self.messages.setdefault(QueueUrl, []).append({'messageId': message_id, 'body': MessageBody,
+                                                           'eventSource': 'aws:sqs'})
+
+        return {'MessageId': message_id}
+
+    def receive_records(self, queue_url) -> list:
+        """ Returns and removes all messages of a queue as SQS event records """
+
+        with self._lock:
+            return self.messages.pop(queue_url, [])
@@ -0,0 +1,144 @@
+""" This file contains the StubWAFv2Client class """
+
+import threading
+import uuid
+# pylint: disable=E0401
+from botocore.exceptions import ClientError
+
+
+class StubWAFv2Client:
+    """ In-process stand-in for the boto3 wafv2 client. It implements the IP set operations used by the Lambda,
+        including list pagination and LockToken (optimistic locking) semantics, and counts every call. """
+
+    def __init__(self, page_size=100, address_limit=10000):
+        self.page_size = page_size
+        self.address_limit = address_limit
+
+        # (scope, name) -> IP set
+        self.ip_sets = {}
+        self.call_counts = {}
+
+        # Called with the update arguments before an update is applied, used to simulate concurrent writers
+        self.before_update_hook = None
+
+        self._lock = threading.RLock()
+
+    def _count_call(self, operation):
+        with self._lock:
+            self.call_counts[operation] = self.call_counts.get(operation, 0) + 1
+
+    @staticmethod
+    def _client_error(code, operation):
+        return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+    def _get(self, name, scope, identifier, operation):
+        ip_set = self.ip_sets.get((scope, name))
+
+        if ip_set is None or ip_set['Id'] != identifier:
+            raise self._client_error('WAFNonexistentItemException', operation)
+
+        return ip_set
+
+    def create_ip_set(self, Name, Scope, IPAddressVersion, Addresses, **_kwargs):
+        """ Creates an IP set """
+        # pylint: disable=C0103
+
+        self._count_call('create_ip_set')
+
+        with self._lock:
+            identifier = str(uuid.uuid4())
+            ip_set = {
+                'Name': Name,
+                'Id': identifier,
+                'ARN': 'arn:aws:wafv2:eu-west-1:123456789012:{0}/ipset/{1}/{2}'.format(Scope.lower(), Name, identifier),
+                'IPAddressVersion': IPAddressVersion,
+                'Addresses': list(Addresses),
+                'LockToken': str(uuid.uuid4())
+            }
+            self.ip_sets[(Scope, Name)] = ip_set
+
+        return {'Summary': {'Name': Name, 'Id': identifier, 'ARN': ip_set['ARN'], 'LockToken': ip_set['LockToken']}}
+
+    def delete_ip_set(self, Name, Scope, Id, LockToken):
+        """ Deletes an IP set """
+        # pylint: disable=C0103
+
+        self._count_call('delete_ip_set')
+
+        with self._lock:
+            ip_set = self._get(Name, Scope, Id, 'DeleteIPSet')
+
+            if ip_set['LockToken'] != LockToken:
+                raise self._client_error('WAFOptimisticLockException', 'DeleteIPSet')
+
+            del self.ip_sets[(Scope, Name)]
+
+        return {}
+
+    def list_ip_sets(self, Scope, NextMarker=None, Limit=None):
+        """ Lists the IP sets of a scope, one page at a time """
+        # pylint: disable=C0103
+
+        self._count_call('list_ip_sets')
+
+        with self._lock:
+            ip_sets = sorted((ip_set for (scope, _), ip_set in self.ip_sets.items() if scope == Scope),
+                             key=lambda ip_set: ip_set['Name'])
+
+        start = int(NextMarker) if NextMarker else 0
+        end = start + (Limit or self.page_size)
+
+        response = {
+            'IPSets': [{'Name': ip_set['Name'], 'Id': ip_set['Id'], 'ARN': ip_set['ARN'],
+                        'LockToken': ip_set['LockToken']} for ip_set in ip_sets[start:end]]
+        }
+
+        if end < len(ip_sets):
+            response['NextMarker'] = str(end)
+
+        return response
+
+    def get_ip_set(self, Name, Scope, Id):
+        """ Returns an IP set and its current LockToken """
+        # pylint: disable=C0103
+
+        self._count_call('get_ip_set')
+
+        with self._lock:
+            ip_set = self._get(Name, Scope, Id, 'GetIPSet')
+
+            return {
+                'IPSet': {'Name': ip_set['Name'], 'Id': ip_set['Id'], 'ARN': ip_set['ARN'],
+                          'IPAddressVersion': ip_set['IPAddressVersion'], 'Addresses': list(ip_set['Addresses'])},
+                'LockToken': ip_set['LockToken']
+            }
+
+    def update_ip_set(self, Name, Scope, Id, Addresses, LockToken, **_kwargs):
+        """ Replaces the addresses of an IP set when the LockToken is current """
+        # pylint: disable=C0103
+
+        self._count_call('update_ip_set')
+
+        if self.before_update_hook is not None:
+            self.before_update_hook(Name, Scope, Id, Addresses, LockToken)
+
+        with self._lock:
+            ip_set = self._get(Name, Scope, Id, 'UpdateIPSet')
+
+            if ip_set['LockToken'] != LockToken:
+                raise self._client_error('WAFOptimisticLockException', 'UpdateIPSet')
+
+            if len(Addresses) > self.address_limit:
+                raise self._client_error('WAFLimitsExceededException', 'UpdateIPSet')
+
+            ip_set['Addresses'] = list(Addresses)
+            ip_set['LockToken'] = str(uuid.uuid4())
+
+            return {'NextLockToken': ip_set['LockToken']}
+
+    def get_addresses(self, Name, Scope='REGIONAL'):
+        """ Test helper returning the addresses of an IP set by name """
+        # pylint: disable=C0103
+
+        with self._lock:
+            return list(self.ip_sets[(Scope, Name)]['Addresses'])
@@ -0,0 +1,73 @@
+""" Shared fixtures of the unit tests """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from connection import AWSConnection
+from connection import AWSWAFv2Connection
+from stubs import StubSQSClient
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def get_mock_config():
+    """ Return the mocked config with the IP set names of the stub WAFv2 client. Test modules that need more config
+        sections override this fixture, requesting it by its own name to extend it. """
+
+    return {
+        'AWS_WAF': {
+            'IP_SET_BAD_BOTS_SCOPE': 'REGIONAL',
+            'IP_SET_BAD_BOTS_IPV4_NAME': 'ip_set_bad_bots_ipv4_test',
+            'IP_SET_BAD_BOTS_IPV6_NAME': 'ip_set_bad_bots_ipv6_test'
+        }
+    }
+
+
+@pytest.fixture()
+def register_stub_client():
+    """ Fixture returning a function that registers a stub client as the connection of an AWS component and region.
+        The connections and the cached IP set references are reset afterwards. """
+
+    def register(aws_component, client, region_name=None):
+        AWSConnection.set_connection(aws_component, client, region_name)
+        AWSWAFv2Connection.invalidate_ip_set_references()
+
+        return client
+
+    yield register
+    AWSConnection.reset()
+    AWSWAFv2Connection.invalidate_ip_set_references()
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with both bad bots IP sets """
+
+    client = StubWAFv2Client()
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+    client.create_ip_set(Name='ip_set_bad_bots_ipv6_test', Scope='REGIONAL', IPAddressVersion='IPV6', Addresses=[])
+
+    return register_stub_client('wafv2', client)
+
+
+@pytest.fixture()
+def stub_sqs_client(register_stub_client):
+    """ Fixture for a stub SQS client holding the sent messages """
+
+    return register_stub_client('sqs', StubSQSClient())
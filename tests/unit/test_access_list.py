@@ -0,0 +1,138 @@
+""" Unit test containing tests for the allow list and deny list """
+
+import sys
+import os
+import inspect
+import random
+from ipaddress import ip_network
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from access import AccessList
+from access import PrefixTrie
+from bad_bots import BadBots
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config, tmp_path):
+    """ Return the mocked config with an allow list and a deny list """
+
+    deny_path = tmp_path / 'deny.txt'
+    deny_path.write_text('# Known bad ranges\n203.0.113.0/24\n\n2001:db8:bad::/48  # scanner\n')
+
+    get_mock_config['ACCESS_LIST'] = {
+        'ALLOW': '203.0.113.128/25, 198.51.100.7',
+        'DENY_PATH': str(deny_path)
+    }
+
+    yield get_mock_config
+
+    AccessList.reset()
+
+
+def test_prefix_trie_longest_prefix_match():
+    """ Unit test that the trie returns the same value as a linear longest prefix match """
+
+    # !ARRANGE!
+    random.seed(7)
+
+    for version, address_class, bits in [(4, IPv4Address, 32), (6, IPv6Address, 128)]:
+        prefix_trie = PrefixTrie(version)
+        networks = []
+
+        for index in range(300):
+            prefix_length = random.randint(1, bits)
+            network = ip_network((address_class(random.getrandbits(bits)), prefix_length), strict=False)
+            networks.append((network, index))
+            prefix_trie.insert(network, index)
+
+        # Addresses inside and around the prefixes
+        addresses = [network.network_address + random.randint(0, network.num_addresses - 1)
+                     for network, _ in networks]
+        addresses += [address_class(random.getrandbits(bits)) for _ in range(300)]
+
+        # !ACT!
+        values = [prefix_trie.lookup(address) for address in addresses]
+
+        # !ASSERT!
+        for address, value in zip(addresses, values):
+            matches = [(network.prefixlen, index) for network, index in networks if address in network]
+            assert value == (max(matches)[1] if matches else None)
+
+
+def test_prefix_trie_default_route():
+    """ Unit test the zero length prefix and the version check of the trie """
+
+    # !ARRANGE!
+    prefix_trie = PrefixTrie(4)
+    prefix_trie.insert('0.0.0.0/0', 'any')
+    prefix_trie.insert('10.1.0.0/16', 'ten')
+
+    # !ACT / ASSERT!
+    assert prefix_trie.lookup('10.1.2.3') == 'ten'
+    assert prefix_trie.lookup('11.1.2.3') == 'any'
+    assert prefix_trie.lookup('2001:db8::1', 'other version') == 'other version'
+
+    with pytest.raises(ValueError):
+        prefix_trie.insert('2001:db8::/32', 'ipv6')
+
+
+# pylint: disable=W0621
+def test_access_list_verdicts(get_mock_config):
+    """ Unit test the verdicts of the access list built from the config """
+
+    # !ACT!
+    access_list = AccessList.get_access_list(get_mock_config)
+
+    # !ASSERT!
+    assert len(access_list) == 4
+    assert access_list.get_verdict('203.0.113.1') == AccessList.verdict_deny
+    assert access_list.get_verdict('203.0.113.200') == AccessList.verdict_allow
+    assert access_list.get_verdict('198.51.100.7') == AccessList.verdict_allow
+    assert access_list.get_verdict('198.51.100.8') is None
+    assert access_list.get_verdict('2001:db8:bad:1::1') == AccessList.verdict_deny
+    assert AccessList.get_access_list(get_mock_config) is access_list
+    assert AccessList.get_access_list({}) is None
+
+
+def test_parse_bad_bots_access_list(get_mock_config, stub_wafv2_client):
+    """ Unit test that allowed ranges return at once and denied ranges are blocked without scoring """
+
+    # !ARRANGE!
+    def fail_geolocation(source_ip):
+        raise AssertionError('Geolocation of {0} looked up'.format(source_ip))
+
+    def create_event(source_ip):
+        return {
+            "httpMethod": "CONNECT",
+            "requestContext": {"identity": {"sourceIp": source_ip}},
+            "headers": {}
+        }
+
+    # !ACT!
+    allowed_output = BadBots(get_mock_config, create_event('203.0.113.200'), fail_geolocation).parse_bad_bots()
+    denied_output = BadBots(get_mock_config, create_event('2001:db8:bad::1'), fail_geolocation).parse_bad_bots()
+
+    # !ASSERT!
+    assert allowed_output['is_bot'] is False
+    assert allowed_output['scoring']['stop_reason'] == 'allow_list'
+    assert denied_output['is_bot'] is True
+    assert denied_output['scoring']['stop_reason'] == 'deny_list'
+    assert denied_output['scoring']['rules'] == {}
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == []
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv6_test') == ['2001:db8:bad::1/128']
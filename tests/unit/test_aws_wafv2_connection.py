@@ -0,0 +1,163 @@
+""" Unit test containing tests for the AWS WAFv2 connection class """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+from botocore.exceptions import ClientError
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from connection import AWSConnection
+from connection import AWSWAFv2Connection
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with more IP sets than fit on one list page """
+
+    client = StubWAFv2Client(page_size=2)
+
+    for name in ['a_other', 'b_other', 'c_other', 'ip_set_bad_bots_ipv4_test', 'ip_set_bad_bots_ipv6_test']:
+        client.create_ip_set(Name=name, Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+
+    return register_stub_client('wafv2', client)
+
+
+# pylint: disable=W0621
+def test_ip_set_identifier_is_resolved_once(get_mock_config, stub_wafv2_client):
+    """ Unit test that the IP set identifier is found across list pages and cached afterwards """
+
+    # !ACT!
+    connection_ipv4 = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+    connection_ipv6 = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV6)
+    connection_ipv4_again = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+
+    # !ASSERT!
+    expected_ip_set = stub_wafv2_client.ip_sets[('REGIONAL', 'ip_set_bad_bots_ipv6_test')]
+
+    assert connection_ipv6.ip_set_blocked_identifier == expected_ip_set['Id']
+    assert connection_ipv6.retrieve_ip_set_arn() == expected_ip_set['ARN']
+    assert connection_ipv4.ip_set_blocked_identifier == connection_ipv4_again.ip_set_blocked_identifier
+
+    # All three pages are read once, later connections are served from the cache
+    assert stub_wafv2_client.call_counts['list_ip_sets'] == 3
+
+
+def test_ip_set_identifier_is_invalidated(get_mock_config, stub_wafv2_client):
+    """ Unit test that a recreated IP set is found again after WAF reports the cached identifier as nonexistent """
+
+    # !ARRANGE!
+    AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+
+    old_ip_set = stub_wafv2_client.ip_sets[('REGIONAL', 'ip_set_bad_bots_ipv4_test')]
+    stub_wafv2_client.delete_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', Id=old_ip_set['Id'],
+                                    LockToken=old_ip_set['LockToken'])
+    stub_wafv2_client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4',
+                                    Addresses=['1.1.1.1/32'])
+
+    # !ACT!
+    connection = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+    response = connection.retrieve_ip_set()
+
+    # !ASSERT!
+    assert response['IPSet']['Addresses'] == ['1.1.1.1/32']
+    assert connection.ip_set_blocked_identifier != old_ip_set['Id']
+
+
+def test_merge_ip_set_reads_once(get_mock_config, stub_wafv2_client):
+    """ Unit test that a merge uses the LockToken of a single read """
+
+    # !ARRANGE!
+    connection = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+
+    # !ACT!
+    result = connection.merge_ip_set(lambda addresses: ['1.1.1.1/32'] + addresses)
+
+    # !ASSERT!
+    assert result['updated'] is True
+    assert result['attempts'] == 1
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32']
+    assert stub_wafv2_client.call_counts['get_ip_set'] == 1
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 1
+
+
+def test_merge_ip_set_retries_on_lock_conflict(get_mock_config, stub_wafv2_client):
+    """ Unit test that a concurrent write is merged instead of overwritten or failing the update """
+
+    # !ARRANGE!
+    get_mock_config['AWS_WAF']['UPDATE_BACKOFF_BASE_MS'] = '0'
+    connection = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+    concurrent_writes = []
+
+    def concurrent_writer(name, scope, identifier, *_args):
+        # Another Lambda blocks an address between our read and our write, once
+        if not concurrent_writes:
+            concurrent_writes.append(name)
+            ip_set = stub_wafv2_client.get_ip_set(Name=name, Scope=scope, Id=identifier)
+            stub_wafv2_client.update_ip_set(Name=name, Scope=scope, Id=identifier, Addresses=['9.9.9.9/32'],
+                                            LockToken=ip_set['LockToken'])
+
+    stub_wafv2_client.before_update_hook = concurrent_writer
+
+    # !ACT!
+    result = connection.merge_ip_set(lambda addresses: ['1.1.1.1/32'] + addresses)
+
+    # !ASSERT!
+    assert result['attempts'] == 2
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32', '9.9.9.9/32']
+
+
+def test_merge_ip_set_gives_up_after_max_retries(get_mock_config, stub_wafv2_client):
+    """ Unit test that the lock conflict is raised once the retries are used up """
+
+    # !ARRANGE!
+    get_mock_config['AWS_WAF']['UPDATE_BACKOFF_BASE_MS'] = '0'
+    get_mock_config['AWS_WAF']['UPDATE_MAX_RETRIES'] = '2'
+    connection = AWSWAFv2Connection(get_mock_config, BadBots.SourceIPType.IPV4)
+
+    def always_conflicting_writer(name, scope, identifier, *_args):
+        ip_set = stub_wafv2_client.get_ip_set(Name=name, Scope=scope, Id=identifier)
+        stub_wafv2_client.before_update_hook = None
+        stub_wafv2_client.update_ip_set(Name=name, Scope=scope, Id=identifier, Addresses=[],
+                                        LockToken=ip_set['LockToken'])
+        stub_wafv2_client.before_update_hook = always_conflicting_writer
+
+    stub_wafv2_client.before_update_hook = always_conflicting_writer
+
+    # !ACT! / !ASSERT!
+    with pytest.raises(ClientError) as error:
+        connection.merge_ip_set(lambda addresses: ['1.1.1.1/32'] + addresses)
+
+    assert error.value.response['Error']['Code'] == 'WAFOptimisticLockException'
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 6
+
+
+def test_get_error_code():
+    """ Unit test that the code of an AWS error is found and other exceptions, also with an empty response, have none """
+
+    # !ARRANGE!
+    error_without_response = ValueError('no response')
+    error_without_response.response = None
+
+    # !ACT!
+    error_codes = [AWSConnection.get_error_code(error) for error in [
+        ClientError({'Error': {'Code': 'WAFOptimisticLockException'}}, 'UpdateIPSet'), ValueError('other'),
+        error_without_response]]
+
+    # !ASSERT!
+    assert error_codes == ['WAFOptimisticLockException', None, None]
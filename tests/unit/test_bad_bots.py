@@ -145,6 +145,72 @@ def test_check_bot_confidence(setup_config, get_mock_event):
     # !ASSERT!
 
     # Assert IP addresses are of type IPv4
-    assert(confidence_score_bot_1 == 25)
+    # Bot 1 matches SQL injection in the body and XSS in the query string parameters
+    assert(confidence_score_bot_1 == 33)
     assert(confidence_score_bot_2 == 0)
     assert(confidence_score_bot_3 == 5)
+
+
+def test_create_bot(setup_config):
+    """ Unit test create_bot method of the Bad Bots class """
+
+    # !ARRANGE!
+    event = {
+        "httpMethod": "POST",
+        "body": None,
+        "queryStringParameters": {"q": "1 UNION SELECT password", "page": "2"},
+        "requestContext": {
+            "identity": {
+                "sourceIp": "2a02:a445:6d36:1:1e3:a188:313c:1d31"
+            }
+        },
+        "headers": {
+            "user-agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"
+        }
+    }
+    bad_bots = BadBots(setup_config, event)
+
+    # !ACT!
+    bot = bad_bots.create_bot()
+    confidence_score = bad_bots.check_bot_confidence(bot)
+
+    # !ASSERT!
+
+    # Assert the event was parsed into typed fields
+    assert bot.source_ip_address.version == 6
+    assert bot.source_ip_type == BadBots.SourceIPType.IPV6
+    assert bot.http_user_agent == "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"
+    assert bot.http_body == ''
+    assert bot.http_query_string_parameters == {"q": "1 UNION SELECT password", "page": "2"}
+
+    # Assert the query string parameter values were scanned: SQL injection
+    assert confidence_score == 8
+
+    # Assert the model does not accept unknown attributes
+    with pytest.raises(AttributeError):
+        bot.unknown_attribute = True
+
+
+def test_create_bot_headers_and_method(setup_config):
+    """ Unit test that create_bot looks up headers in any case and rejects events without an HTTP method """
+
+    # !ARRANGE!
+    event = {
+        "httpMethod": "GET",
+        "headers": {
+            "X-FORWARDED-FOR": "10.0.0.1, 192.0.2.10",
+            "USER-AGENT": "curl/7.68.0"
+        }
+    }
+    event_without_method = dict(event, httpMethod=None)
+
+    # !ACT!
+    bot = BadBots(setup_config, event).create_bot()
+
+    # !ASSERT!
+    assert bot.source_ip == "192.0.2.10"
+    assert bot.http_user_agent == "curl/7.68.0"
+    assert bot.http_method == "GET"
+
+    with pytest.raises(ValueError):
+        BadBots(setup_config, event_without_method).create_bot()
@@ -0,0 +1,248 @@
+""" Unit test containing tests for the async execution mode of the Bad Bots class """
+
+import sys
+import os
+import inspect
+import asyncio
+import json
+import threading
+import time
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from batch import RecordBatchHandler
+from scoring import SQLInjectionRule
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config """
+
+    get_mock_config['BAD_BOTS'] = {
+        'ASYNC_MAX_CONCURRENCY': '8'
+    }
+
+    return get_mock_config
+
+
+class SlowGeolocationResolver:
+    """ Geolocation resolver with the latency of a remote lookup, records the lookups running at the same time """
+
+    def __init__(self, latency_in_seconds):
+        self.latency_in_seconds = latency_in_seconds
+        self.running = 0
+        self.max_running = 0
+        self.started = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, source_ip):
+        self.started.set()
+
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self.latency_in_seconds)
+
+        with self._lock:
+            self.running -= 1
+
+        return 'United States'
+
+
+class WaitingListStubWAFv2Client(StubWAFv2Client):
+    """ Stub WAFv2 client that lists the IP sets once an event is set, records whether it was set in time """
+
+    def __init__(self, event, timeout_in_seconds=1.0):
+        super().__init__()
+        self.event = event
+        self.timeout_in_seconds = timeout_in_seconds
+        self.is_event_set = None
+
+    def list_ip_sets(self, Scope, NextMarker=None, Limit=None):
+        """ Lists the IP sets of a scope after the event is set """
+        # pylint: disable=C0103
+
+        self.is_event_set = self.event.wait(self.timeout_in_seconds)
+
+        return super().list_ip_sets(Scope, NextMarker, Limit)
+
+
+class SlowPrefetch:
+    """ Replaces the prefetch of the IP set references, records the prefetched types and the prefetches running """
+
+    def __init__(self, latency_in_seconds):
+        self.latency_in_seconds = latency_in_seconds
+        self.source_ip_types = []
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, source_ip_type):
+        with self._lock:
+            self.source_ip_types.append(source_ip_type.value)
+            self.running += 1
+
+        time.sleep(self.latency_in_seconds)
+
+        with self._lock:
+            self.running -= 1
+
+
+def create_event(source_ip, user_agent="Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"):
+    """ Returns an API Gateway event that is only a bot outside the shipping countries """
+
+    return {
+        "httpMethod": "CONNECT",
+        "requestContext": {"identity": {"sourceIp": source_ip}},
+        "headers": {"User-Agent": user_agent}
+    }
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_async(get_mock_config, stub_wafv2_client):
+    """ Unit test that the async entry point gives the same verdict as the synchronous one """
+
+    # !ARRANGE!
+    resolver = SlowGeolocationResolver(0.01)
+
+    # !ACT!
+    sync_output = BadBots(get_mock_config, create_event('1.1.1.1'), resolver).parse_bad_bots()
+    async_output = asyncio.run(BadBots(get_mock_config, create_event('2.2.2.2'), resolver).parse_bad_bots_async())
+
+    # !ASSERT!
+    assert async_output['is_bot'] is True
+    assert async_output['bot_confidence_score'] == sync_output['bot_confidence_score'] == 10
+    assert async_output['scoring']['rules'].keys() == sync_output['scoring']['rules'].keys()
+    assert sorted(stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test')) == ['1.1.1.1/32', '2.2.2.2/32']
+
+
+def test_parse_bad_bots_batch_async(get_mock_config, stub_wafv2_client):
+    """ Unit test that the lookups of a batch overlap, bounded by the concurrency, with one update per IP set """
+
+    # !ARRANGE!
+    resolver = SlowGeolocationResolver(0.1)
+    source_ips = ['10.0.0.{0}'.format(index) for index in range(12)] + ['2001:db8::1', '2001:db8::2']
+    event = {'Records': [{'messageId': source_ip, 'body': json.dumps(create_event(source_ip))}
+                         for source_ip in source_ips]}
+
+    # !ACT!
+    batch_output = asyncio.run(RecordBatchHandler(get_mock_config, event, resolver).parse_bad_bots_batch_async())
+
+    # !ASSERT!
+
+    # Assert the 14 lookups ran in parallel, at most 8 at a time
+    assert 1 < resolver.max_running <= 8
+
+    assert batch_output['bots'] == 14
+    assert batch_output['batchItemFailures'] == []
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 2
+    assert len(stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test')) == 12
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv6_test') == ['2001:db8::1/128', '2001:db8::2/128']
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_batch_async_awaits_prefetch(get_mock_config, stub_wafv2_client, monkeypatch):
+    """ Unit test that a batch prefetches the IP set references of its address types and waits for the prefetch """
+
+    # !ARRANGE!
+    prefetch = SlowPrefetch(0.2)
+    monkeypatch.setattr(BadBots, 'prefetch_ip_set_references', lambda bad_bots, source_ip_type: prefetch(source_ip_type))
+    event = {'Records': [{'messageId': '1', 'body': json.dumps(create_event('2001:db8::3'))},
+                         {'messageId': '2', 'body': json.dumps(create_event('2001:db8::4'))}]}
+
+    # !ACT!
+    batch_output = asyncio.run(RecordBatchHandler(get_mock_config, event, SlowGeolocationResolver(0.01))
+                               .parse_bad_bots_batch_async())
+
+    # !ASSERT!
+
+    # Assert only the IPv6 reference was prefetched, and the prefetch was done when the handler returned
+    assert prefetch.source_ip_types == ['IPV6']
+    assert prefetch.running == 0
+    assert batch_output['bots'] == 2
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv6_test') == ['2001:db8::3/128', '2001:db8::4/128']
+
+
+# pylint: disable=W0621
+def test_geolocation_lookup_overlaps_ip_set_prefetch(get_mock_config, register_stub_client):
+    """ Unit test that the geolocation lookup and the prefetch of the IP set reference run at the same time """
+
+    # !ARRANGE!
+    resolver = SlowGeolocationResolver(0.01)
+
+    # The IP sets are only listed once the lookup started, which times out when both run one after the other
+    client = WaitingListStubWAFv2Client(resolver.started)
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+    register_stub_client('wafv2', client)
+
+    # !ACT!
+    output = asyncio.run(BadBots(get_mock_config, create_event('3.3.3.3'), resolver).parse_bad_bots_async())
+
+    # !ASSERT!
+    assert output['is_bot'] is True
+    assert client.call_counts['list_ip_sets'] == 1
+    assert client.is_event_set is True
+    assert client.get_addresses('ip_set_bad_bots_ipv4_test') == ['3.3.3.3/32']
+
+
+# pylint: disable=W0621
+def test_geolocation_lookup_starts_before_payload_rules(get_mock_config, stub_wafv2_client, monkeypatch):
+    """ Unit test that the lookup starts once the cheap rules left the score undecided, and is not awaited when the
+        payload rules decide the score """
+
+    # !ARRANGE!
+    resolver = SlowGeolocationResolver(0.01)
+    lookup_started = []
+    matches = SQLInjectionRule.matches
+
+    def recording_matches(rule, scoring_context):
+        lookup_started.append(resolver.started.wait(1.0))
+        return matches(rule, scoring_context)
+
+    monkeypatch.setattr(SQLInjectionRule, 'matches', recording_matches)
+    event = dict(create_event('5.5.5.5'), httpMethod='GET', queryStringParameters={'q': '1 UNION SELECT password'})
+
+    # !ACT!
+    output = asyncio.run(BadBots(get_mock_config, event, resolver).parse_bad_bots_async())
+
+    # !ASSERT!
+
+    # Assert the lookup ran while the SQL injection rule was evaluated, which decided the score on its own
+    assert lookup_started == [True]
+    assert output['is_bot'] is True
+    assert output['scoring']['stop_reason'] == 'threshold_reached'
+    assert 'geolocation' not in output['scoring']['rules']
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['5.5.5.5/32']
+
+
+# pylint: disable=W0621
+def test_decided_score_makes_no_geolocation_lookup(get_mock_config, stub_wafv2_client):
+    """ Unit test that no geolocation lookup is made when the score is decided before the geolocation rule """
+
+    # !ARRANGE!
+    resolver = SlowGeolocationResolver(0.01)
+
+    # !ACT!
+    output = asyncio.run(BadBots(get_mock_config, create_event('4.4.4.4', ''), resolver).parse_bad_bots_async())
+
+    # !ASSERT!
+    assert output['is_bot'] is True
+    assert output['scoring']['stop_reason'] == 'threshold_reached'
+    assert 'geolocation' not in output['scoring']['rules']
+    assert resolver.max_running == 0
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['4.4.4.4/32']
@@ -0,0 +1,131 @@
+""" Unit test containing tests for scoring batches of SQS and Kinesis records """
+
+import sys
+import os
+import inspect
+import base64
+import json
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from batch import RecordBatchHandler
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config without geolocation lookups """
+
+    get_mock_config['GEOLOCATION'] = {
+        'PROVIDERS': ''
+    }
+
+    return get_mock_config
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with the IPv4 bad bots IP set only """
+
+    client = StubWAFv2Client()
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4',
+                         Addresses=['9.9.9.9/32'])
+
+    return register_stub_client('wafv2', client)
+
+
+def create_event(source_ip, is_bot=True):
+    """ Returns a logged API Gateway event, the request of a bot carries an SQL injection """
+
+    return {
+        "httpMethod": "GET",
+        "queryStringParameters": {"q": "1 UNION SELECT password" if is_bot else "shoes"},
+        "requestContext": {"identity": {"sourceIp": source_ip}},
+        "headers": {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"}
+    }
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_batch_sqs(get_mock_config, stub_wafv2_client):
+    """ Unit test that the bots of an SQS batch are written with one update per IP set """
+
+    # !ARRANGE!
+    stub_wafv2_client.create_ip_set(Name='ip_set_bad_bots_ipv6_test', Scope='REGIONAL', IPAddressVersion='IPV6',
+                                    Addresses=[])
+
+    bodies = [
+        json.dumps(create_event('1.1.1.1')),
+        json.dumps(create_event('2.2.2.2')),
+        json.dumps(create_event('1.1.1.1')),
+        json.dumps(create_event('2001:db8::1')),
+        json.dumps(create_event('3.3.3.3', False)),
+        'not json'
+    ]
+    event = {'Records': [{'messageId': 'message-{0}'.format(index), 'body': body}
+                         for index, body in enumerate(bodies)]}
+
+    # !ACT!
+    batch_output = RecordBatchHandler(get_mock_config, event).parse_bad_bots_batch()
+
+    # !ASSERT!
+    assert batch_output['records'] == 6
+    assert batch_output['bots'] == 4
+    assert batch_output['dropped'] == 1
+    assert batch_output['batchItemFailures'] == []
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 2
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32', '2.2.2.2/32', '9.9.9.9/32']
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv6_test') == ['2001:db8::1/128']
+
+
+def test_parse_bad_bots_batch_kinesis_failures(get_mock_config, stub_wafv2_client):
+    """ Unit test that only the records of the IP set whose update failed are reported as batch item failures """
+
+    # !ARRANGE!
+    events = [create_event('1.1.1.1'), create_event('2001:db8::1'),
+              create_event('2001:db8::2')]
+    event = {'Records': [{'kinesis': {'sequenceNumber': str(index),
+                                      'data': base64.b64encode(json.dumps(record_event).encode()).decode()}}
+                         for index, record_event in enumerate(events)]}
+
+    # !ACT!
+
+    # The IPv6 IP set does not exist, its update fails
+    batch_output = RecordBatchHandler(get_mock_config, event).parse_bad_bots_batch()
+
+    # !ASSERT!
+    assert batch_output['bots'] == 3
+    assert batch_output['updates']['IPV6'] is None
+    assert batch_output['batchItemFailures'] == [{'itemIdentifier': '1'}, {'itemIdentifier': '2'}]
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32', '9.9.9.9/32']
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_batch_drops_records_without_method(get_mock_config, stub_wafv2_client):
+    """ Unit test that a record without an HTTP method is dropped instead of scored """
+
+    # !ARRANGE!
+    record_event = create_event('1.1.1.1')
+    record_event['httpMethod'] = None
+    event = {'Records': [{'messageId': 'message-0', 'body': json.dumps(record_event)}]}
+
+    # !ACT!
+    batch_output = RecordBatchHandler(get_mock_config, event).parse_bad_bots_batch()
+
+    # !ASSERT!
+    assert batch_output['dropped'] == 1
+    assert batch_output['bots'] == 0
+    assert batch_output['batchItemFailures'] == []
+    assert stub_wafv2_client.call_counts.get('update_ip_set', 0) == 0
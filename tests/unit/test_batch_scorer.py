@@ -0,0 +1,80 @@
+""" Unit test containing tests for the batch scorer class """
+
+import sys
+import os
+import inspect
+import json
+import configparser
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up configuration path
+CONFIG_PATH = os.path.join(PROJECT_ROOT_SRC, 'config', 'config.ini')
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from batch import BatchScorer
+
+
+@pytest.fixture()
+def setup_config():
+    """ Fixture for setting up configuration parser """
+
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+
+    return config
+
+
+# pylint: disable=W0621
+def test_score_batch(setup_config):
+    """ Unit test score_batch method of the batch scorer class """
+
+    # !ARRANGE!
+    sql_injection_event = {
+        "httpMethod": "GET",
+        "queryStringParameters": {"q": "1 UNION SELECT password"},
+        "requestContext": {"identity": {"sourceIp": "1.1.1.1"}},
+        "headers": {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"}
+    }
+
+    # An Application Load Balancer event, the source IP address is the last X-Forwarded-For entry, appended by the load
+    # balancer. The first entry is set by the client and must not be trusted.
+    load_balancer_event = {
+        "httpMethod": "CONNECT",
+        "requestContext": {"elb": {"targetGroupArn": "arn:aws:elasticloadbalancing:eu-west-1:123:targetgroup/t/1"}},
+        "headers": {"x-forwarded-for": "10.0.0.1, 2a02:a445:6d36:1:1e3:a188:313c:1d31", "user-agent": ""}
+    }
+
+    events = [json.dumps(sql_injection_event), load_balancer_event, 'not json'] * 3
+
+    # !ACT!
+    results = list(BatchScorer.score_batch(setup_config, events, processes=2, chunk_size=2))
+
+    # !ASSERT!
+
+    # Assert one result per event, in the order of the events
+    assert len(results) == 9
+
+    for index in range(0, 9, 3):
+        assert results[index]['source_ip'] == '1.1.1.1'
+        assert results[index]['is_bot'] is True
+        assert results[index]['bot_confidence_score'] == 8
+        assert results[index]['rules'] == ['sql_injection']
+
+        assert results[index + 1]['source_ip'] == '2a02:a445:6d36:1:1e3:a188:313c:1d31'
+        assert results[index + 1]['source_ip_type'] == 'IPV6'
+        assert results[index + 1]['bot_confidence_score'] == 8
+        assert sorted(results[index + 1]['rules']) == ['empty_user_agent', 'http_method']
+
+        assert results[index + 2]['error'].startswith('JSONDecodeError')
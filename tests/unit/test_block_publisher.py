@@ -0,0 +1,236 @@
+""" Unit test containing tests for fanning out blocks to the IP sets of other regions and scopes """
+
+import sys
+import os
+import inspect
+import threading
+import time
+# pylint: disable=E0401
+import pytest
+from botocore.exceptions import ClientError
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from blocking import BlockExpiryIndex
+from blocking import BlockPublisher
+from blocking import IPSetBlocker
+from models import SourceIPType
+from connection import AWSWAFv2Connection
+from stubs import StubWAFv2Client
+
+REGION_NAMES = ['eu-west-1', 'us-east-1']
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config with a REGIONAL target in eu-west-1 and a CLOUDFRONT target """
+
+    get_mock_config['FAN_OUT'] = {
+        'TARGETS_IPV4': 'eu-west-1/REGIONAL/ip_set_bad_bots_ipv4_eu,/CLOUDFRONT/ip_set_bad_bots_ipv4_edge',
+        'TIMEOUT_SECONDS': '0.5'
+    }
+
+    return get_mock_config
+
+
+@pytest.fixture()
+def stub_wafv2_clients(register_stub_client):
+    """ Fixture for a stub WAFv2 client in the default region and one per target region """
+
+    clients = {None: StubWAFv2Client()}
+    clients[None].create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4',
+                                Addresses=[])
+
+    for region_name in REGION_NAMES:
+        clients[region_name] = StubWAFv2Client()
+
+    clients['eu-west-1'].create_ip_set(Name='ip_set_bad_bots_ipv4_eu', Scope='REGIONAL', IPAddressVersion='IPV4',
+                                       Addresses=[])
+    clients['us-east-1'].create_ip_set(Name='ip_set_bad_bots_ipv4_edge', Scope='CLOUDFRONT', IPAddressVersion='IPV4',
+                                       Addresses=[])
+
+    for region_name, client in clients.items():
+        register_stub_client('wafv2', client, region_name)
+
+    return clients
+
+
+def test_parse_targets():
+    """ Unit test that CLOUDFRONT targets are managed in us-east-1 and malformed targets are rejected """
+
+    # !ACT!
+    targets = BlockPublisher.parse_targets(['eu-west-1/regional/ip_set_a', 'eu-west-1/CLOUDFRONT/ip_set_b',
+                                            '/REGIONAL/ip_set_c'])
+
+    # !ASSERT!
+    assert [BlockPublisher.get_target_name(target) for target in targets] == [
+        'eu-west-1/REGIONAL/ip_set_a', 'us-east-1/CLOUDFRONT/ip_set_b', 'default/REGIONAL/ip_set_c']
+
+    with pytest.raises(ValueError):
+        BlockPublisher.parse_targets(['eu-west-1/ip_set_a'])
+
+
+# pylint: disable=W0621
+def test_update_fans_out_to_all_targets(get_mock_config, stub_wafv2_clients):
+    """ Unit test that a block is written to the own IP set and to every target, with a result per target """
+
+    # !ACT!
+    update_output = IPSetBlocker(get_mock_config).update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    # !ASSERT!
+    assert update_output['updated']
+    assert stub_wafv2_clients[None].get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32']
+    assert stub_wafv2_clients['eu-west-1'].get_addresses('ip_set_bad_bots_ipv4_eu') == ['1.1.1.1/32']
+    assert stub_wafv2_clients['us-east-1'].get_addresses('ip_set_bad_bots_ipv4_edge', 'CLOUDFRONT') == ['1.1.1.1/32']
+
+    assert [result['target'] for result in update_output['fan_out']] == [
+        'eu-west-1/REGIONAL/ip_set_bad_bots_ipv4_eu', 'us-east-1/CLOUDFRONT/ip_set_bad_bots_ipv4_edge']
+    assert all(result['success'] and result['updated'] and result['latency_in_ms'] >= 0
+               for result in update_output['fan_out'])
+
+
+# pylint: disable=W0621
+def test_slow_or_failing_target_does_not_fail_the_block(get_mock_config, stub_wafv2_clients):
+    """ Unit test that a slow target times out and a missing IP set fails without holding up or failing the block """
+
+    # !ARRANGE!
+    release = threading.Event()
+    stub_wafv2_clients['eu-west-1'].before_update_hook = lambda *_: release.wait(5)
+    stub_wafv2_clients['us-east-1'].ip_sets.clear()
+
+    # !ACT!
+    start_time = time.perf_counter()
+    update_output = IPSetBlocker(get_mock_config).update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+    duration = time.perf_counter() - start_time
+    release.set()
+
+    # !ASSERT!
+    assert duration < 2
+    assert update_output['updated']
+    assert stub_wafv2_clients[None].get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32']
+
+    slow_result, failed_result = update_output['fan_out']
+    assert not slow_result['success'] and slow_result['error'] == 'timed out'
+    assert not failed_result['success'] and failed_result['error']
+
+
+# pylint: disable=W0621
+def test_sweep_removes_from_all_targets(get_mock_config, stub_wafv2_clients):
+    """ Unit test that removing blocks removes them from the targets as well """
+
+    # !ARRANGE!
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32', '2.2.2.2/32'])
+
+    # !ACT!
+    remove_result = ip_set_blocker.remove_from_bad_bots_ip_sets(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    # !ASSERT!
+    assert remove_result['removed'] == ['1.1.1.1/32'] and remove_result['retained'] == []
+    assert stub_wafv2_clients[None].get_addresses('ip_set_bad_bots_ipv4_test') == ['2.2.2.2/32']
+    assert stub_wafv2_clients['eu-west-1'].get_addresses('ip_set_bad_bots_ipv4_eu') == ['2.2.2.2/32']
+    assert stub_wafv2_clients['us-east-1'].get_addresses('ip_set_bad_bots_ipv4_edge', 'CLOUDFRONT') == ['2.2.2.2/32']
+
+
+# pylint: disable=W0621
+def test_failed_target_is_retried_from_the_block_queue(get_mock_config, stub_wafv2_clients, stub_sqs_client):
+    """ Unit test that the addresses of a failed target are queued with that target and written by the flush function """
+
+    # !ARRANGE!
+    queue_url = 'https://sqs.eu-west-1.amazonaws.com/123456789012/bad-bots-block-queue'
+    get_mock_config['BLOCKING'] = {'QUEUE_URL': queue_url}
+    stub_wafv2_clients['us-east-1'].ip_sets.clear()
+
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    update_output = ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+    records = stub_sqs_client.receive_records(queue_url)
+
+    stub_wafv2_clients['us-east-1'].create_ip_set(Name='ip_set_bad_bots_ipv4_edge', Scope='CLOUDFRONT',
+                                                  IPAddressVersion='IPV4', Addresses=[])
+    AWSWAFv2Connection.invalidate_ip_set_references()
+    update_count_before_retry = stub_wafv2_clients['eu-west-1'].call_counts['update_ip_set']
+
+    # !ACT!
+    flush_output = ip_set_blocker.flush_block_records(records)
+
+    # !ASSERT!
+    assert [result.get('retry') for result in update_output['fan_out']] == [None, 'queued']
+    assert len(records) == 1
+    assert flush_output['fan_out_retries'] == {'retried': 1, 'failed': 0}
+    assert flush_output['batchItemFailures'] == []
+    assert stub_wafv2_clients['us-east-1'].get_addresses('ip_set_bad_bots_ipv4_edge', 'CLOUDFRONT') == ['1.1.1.1/32']
+    assert stub_wafv2_clients['eu-west-1'].call_counts['update_ip_set'] == update_count_before_retry
+
+
+# pylint: disable=W0621
+def test_failed_shard_write_still_collects_the_fan_out(get_mock_config, stub_wafv2_clients, stub_sqs_client):
+    """ Unit test that the fan out is waited for and failed targets are queued when the own IP set write fails """
+
+    # !ARRANGE!
+    queue_url = 'https://sqs.eu-west-1.amazonaws.com/123456789012/bad-bots-block-queue'
+    get_mock_config['BLOCKING'] = {'QUEUE_URL': queue_url}
+    stub_wafv2_clients['us-east-1'].ip_sets.clear()
+
+    def fail_update(*_):
+        raise ClientError({'Error': {'Code': 'WAFInternalErrorException'}}, 'UpdateIPSet')
+
+    stub_wafv2_clients[None].before_update_hook = fail_update
+
+    # The target finishes after the own IP set write failed
+    stub_wafv2_clients['eu-west-1'].before_update_hook = lambda *_: time.sleep(0.2)
+
+    # !ACT!
+    with pytest.raises(ClientError):
+        IPSetBlocker(get_mock_config).update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    records = stub_sqs_client.receive_records(queue_url)
+
+    # !ASSERT!
+    assert stub_wafv2_clients['eu-west-1'].get_addresses('ip_set_bad_bots_ipv4_eu') == ['1.1.1.1/32']
+    assert len(records) == 1
+
+
+# pylint: disable=W0621
+def test_sweep_keeps_blocks_a_target_failed_to_remove(get_mock_config, stub_wafv2_clients, tmp_path):
+    """ Unit test that a sweep a target fails to apply keeps the expiry, so the next sweep removes the block again """
+
+    # !ARRANGE!
+    get_mock_config['BLOCKING'] = {'BLOCK_TTL_SECONDS': '60',
+                                   'EXPIRY_INDEX_PATH': str(tmp_path / 'block_expiry.sqlite3')}
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    edge_ip_sets = dict(stub_wafv2_clients['us-east-1'].ip_sets)
+    stub_wafv2_clients['us-east-1'].ip_sets.clear()
+    sweep_time = time.time() + 120
+
+    try:
+        # !ACT!
+        failed_sweep_output = ip_set_blocker.sweep_expired_blocks(sweep_time)
+
+        stub_wafv2_clients['us-east-1'].ip_sets.update(edge_ip_sets)
+        AWSWAFv2Connection.invalidate_ip_set_references()
+        sweep_output = ip_set_blocker.sweep_expired_blocks(sweep_time)
+
+    finally:
+        BlockExpiryIndex.close_all()
+
+    # !ASSERT!
+    assert failed_sweep_output['fan_out_failed'] == {'IPV4': ['us-east-1/CLOUDFRONT/ip_set_bad_bots_ipv4_edge']}
+    assert failed_sweep_output['retained'] == {'IPV4': 1}
+    assert stub_wafv2_clients[None].get_addresses('ip_set_bad_bots_ipv4_test') == []
+
+    assert sweep_output['fan_out_failed'] == {}
+    assert sweep_output['retained'] == {}
+    assert stub_wafv2_clients['us-east-1'].get_addresses('ip_set_bad_bots_ipv4_edge', 'CLOUDFRONT') == []
@@ -0,0 +1,201 @@
+""" Unit test containing tests for the buffered blocking mode """
+
+import sys
+import os
+import inspect
+import json
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from cache import VerdictCache
+from blocking import BlockQueue
+from blocking import BlockQueueFlusher
+from blocking import IPSetBlocker
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config, tmp_path):
+    """ Return the mocked config of the buffered blocking mode """
+
+    get_mock_config['GEOLOCATION'] = {
+        'PROVIDERS': ''
+    }
+    get_mock_config['BLOCKING'] = {
+        'MODE': 'buffered',
+        'QUEUE_PATH': str(tmp_path / 'block_queue.sqlite3'),
+        'FLUSH_MAX_BATCH_SIZE': '3',
+        'FLUSH_MAX_AGE_SECONDS': '3600'
+    }
+
+    yield get_mock_config
+
+    BlockQueue.close_all()
+    VerdictCache.set_verdict_cache(None)
+
+
+def get_mock_event(source_ip):
+    """ Returns a crawler event of the given source IP """
+
+    return {
+        "httpMethod": "GET",
+        "body": None,
+        "queryStringParameters": None,
+        "requestContext": {
+            "identity": {
+                "sourceIp": source_ip
+            }
+        },
+        "headers": {
+            "User-Agent": "Mozilla/5.0 (compatible; Sosospider/2.0; +http://help.soso.com/webspider.htm)"
+        }
+    }
+
+
+def test_flusher_merges_one_update_per_ip_set(tmp_path):
+    """ Unit test that the flusher waits for the batch size and then writes one update per IP set """
+
+    # !ARRANGE!
+    updates = []
+    block_queue = BlockQueue(str(tmp_path / 'block_queue.sqlite3'))
+    flusher = BlockQueueFlusher({'BLOCKING': {'FLUSH_MAX_BATCH_SIZE': '4'}}, block_queue,
+                                lambda ip_set_type, addresses: updates.append((ip_set_type, addresses)))
+
+    # !ACT!
+    block_queue.enqueue('IPV4', '1.1.1.1/32')
+    block_queue.enqueue('IPV4', '2.2.2.2/32')
+    block_queue.enqueue('IPV6', '2001:db8::1/128')
+    result_below_threshold = flusher.flush_if_due()
+
+    block_queue.enqueue('IPV4', '1.1.1.1/32')
+    result_at_threshold = flusher.flush_if_due()
+
+    # !ASSERT!
+    assert result_below_threshold['flushed'] == 0
+    assert result_at_threshold['flushed'] == 4
+    assert result_at_threshold['pending'] == 0
+    assert updates == [('IPV4', ['1.1.1.1/32', '2.2.2.2/32']), ('IPV6', ['2001:db8::1/128'])]
+
+    block_queue.close()
+
+
+def test_flusher_keeps_failed_blocks(tmp_path):
+    """ Unit test that blocks stay queued when their IP set update fails """
+
+    # !ARRANGE!
+    block_queue = BlockQueue(str(tmp_path / 'block_queue.sqlite3'))
+
+    def failing_update(ip_set_type, _addresses):
+        if ip_set_type == 'IPV6':
+            raise RuntimeError('WAF unavailable')
+
+    flusher = BlockQueueFlusher({}, block_queue, failing_update)
+
+    block_queue.enqueue('IPV4', '1.1.1.1/32')
+    block_queue.enqueue('IPV6', '2001:db8::1/128')
+
+    # !ACT!
+    result = flusher.flush()
+
+    # !ASSERT!
+    assert result['flushed'] == 1
+    assert result['failed'] == 1
+    assert block_queue.peek(10) == [(2, 'IPV6', '2001:db8::1/128')]
+
+    block_queue.close()
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_buffered(get_mock_config, stub_wafv2_client):
+    """ Unit test that buffered blocks of several invocations end up in a single IP set update """
+
+    # !ACT!
+    outputs = [BadBots(get_mock_config, get_mock_event(source_ip)).parse_bad_bots()
+               for source_ip in ['1.1.1.1', '2.2.2.2', '3.3.3.3']]
+
+    # !ASSERT!
+    assert [output['is_bot'] for output in outputs] == [True, True, True]
+    assert outputs[1]['block_queue']['flushed'] == 0
+    assert outputs[2]['block_queue']['flushed'] == 3
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 1
+    assert sorted(stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test')) == ['1.1.1.1/32', '2.2.2.2/32',
+                                                                                     '3.3.3.3/32']
+
+
+# pylint: disable=W0621
+def test_queued_block_is_not_remembered_before_flush(get_mock_config, stub_wafv2_client):
+    """ Unit test that a queued address is only remembered in the verdict cache once its block has been written """
+
+    # !ARRANGE!
+    get_mock_config['VERDICT_CACHE'] = {'ENABLED': 'true'}
+
+    # !ACT!
+    outputs = [BadBots(get_mock_config, get_mock_event(source_ip)).parse_bad_bots()
+               for source_ip in ['1.1.1.1', '1.1.1.1', '2.2.2.2', '2.2.2.2']]
+
+    # !ASSERT!
+    assert [output['scoring']['stop_reason'] == 'verdict_cache' for output in outputs] == [False, False, False, True]
+    assert outputs[2]['block_queue']['flushed'] == 3
+
+
+# pylint: disable=W0621
+def test_parse_bad_bots_buffered_in_sqs(get_mock_config, stub_wafv2_client, stub_sqs_client):
+    """ Unit test that blocks are queued in SQS and written by the flush with one update, failed blocks are returned as
+        batch item failures """
+
+    # !ARRANGE!
+    get_mock_config['BLOCKING']['QUEUE_URL'] = 'https://sqs.eu-west-1.amazonaws.com/123456789012/bad-bots-block-queue'
+    get_mock_config['VERDICT_CACHE'] = {'ENABLED': 'true'}
+
+    # !ACT!
+    outputs = [BadBots(get_mock_config, get_mock_event(source_ip)).parse_bad_bots()
+               for source_ip in ['1.1.1.1', '2.2.2.2', '3.3.3.3', '1.1.1.1', '2001:db8::1']]
+
+    records = stub_sqs_client.receive_records(get_mock_config['BLOCKING']['QUEUE_URL'])
+    stub_wafv2_client.ip_sets.pop(('REGIONAL', 'ip_set_bad_bots_ipv6_test'))
+    flush_output = IPSetBlocker(get_mock_config).flush_block_records(records)
+
+    # !ASSERT!
+    assert all(output['block_queue']['pending'] is None for output in outputs)
+    assert all(output['scoring']['stop_reason'] != 'verdict_cache' for output in outputs)
+    assert len(records) == 5
+
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 1
+    assert sorted(stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test')) == ['1.1.1.1/32', '2.2.2.2/32',
+                                                                                     '3.3.3.3/32']
+    assert flush_output['flushed'] == 4
+    assert flush_output['batchItemFailures'] == [{'itemIdentifier': records[4]['messageId']}]
+
+
+# pylint: disable=W0621
+def test_malformed_block_message_is_dropped(get_mock_config, stub_wafv2_client):
+    """ Unit test that a malformed message is dropped without holding up the other blocks of the batch """
+
+    # !ARRANGE!
+    records = [{'messageId': 'not-json', 'body': '{"ip_set_type": '},
+               {'messageId': 'no-address', 'body': json.dumps({'ip_set_type': 'IPV4'})},
+               {'messageId': 'bad-address', 'body': json.dumps({'ip_set_type': 'IPV4', 'address': 'localhost'})},
+               {'messageId': 'valid', 'body': json.dumps({'ip_set_type': 'IPV4', 'address': '1.1.1.1/32',
+                                                          'enqueued_at': 0})}]
+
+    # !ACT!
+    flush_output = IPSetBlocker(get_mock_config).flush_block_records(records)
+
+    # !ASSERT!
+    assert flush_output['flushed'] == 1
+    assert flush_output['dropped'] == 3
+    assert flush_output['batchItemFailures'] == []
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32']
@@ -0,0 +1,157 @@
+""" Unit test containing tests for the block set snapshot """
+
+import sys
+import os
+import inspect
+from ipaddress import ip_address
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from blocking import IPSetBlocker
+from models import SourceIPType
+from cache import BlockSetSnapshot
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config with block set snapshots enabled """
+
+    get_mock_config['BLOCK_SNAPSHOT'] = {
+        'ENABLED': 'true',
+        'TTL_SECONDS': '60'
+    }
+
+    yield get_mock_config
+
+    BlockSetSnapshot.reset()
+
+
+def get_bot_event(source_ip):
+    """ Return an event of a bot from the given address """
+
+    return {
+        'httpMethod': 'CONNECT',
+        'queryStringParameters': {'q': '1 UNION SELECT password FROM users'},
+        'requestContext': {'identity': {'sourceIp': source_ip}},
+        'headers': {}
+    }
+
+
+def test_snapshot_contains_addresses_of_listed_networks():
+    """ Unit test that addresses are matched against the listed networks of both IP versions """
+
+    # !ARRANGE!
+    snapshot = BlockSetSnapshot(['10.0.0.0/8', '10.1.0.0/16', '192.168.1.1/32', '192.168.1.2/32', '2001:db8::/32'])
+
+    # !ACT!
+    contained = [snapshot.contains(address) for address in ['10.200.0.1', '192.168.1.2', '2001:db8::1']]
+    not_contained = [snapshot.contains(address) for address in ['11.0.0.1', '192.168.1.3', '2001:db9::1']]
+
+    # !ASSERT!
+    assert all(contained)
+    assert not any(not_contained)
+    assert snapshot.contains(ip_address('10.0.0.1'))
+    # The /16 is inside the /8 and the two /32s are adjacent
+    assert len(snapshot) == 3
+    assert snapshot.entry_count == 5
+
+
+# pylint: disable=W0621
+def test_blocked_address_skips_waf(get_mock_config, stub_wafv2_client):
+    """ Unit test that a repeat request of a blocked address is answered from the snapshot without calling WAF """
+
+    # !ARRANGE!
+    BadBots(get_mock_config, get_bot_event('1.1.1.1')).parse_bad_bots()
+    call_counts = dict(stub_wafv2_client.call_counts)
+
+    # !ACT!
+    bad_bots_output = BadBots(get_mock_config, get_bot_event('1.1.1.1')).parse_bad_bots()
+
+    # !ASSERT!
+    assert bad_bots_output['is_bot']
+    assert bad_bots_output['scoring']['stop_reason'] == 'block_snapshot'
+    assert stub_wafv2_client.call_counts == call_counts
+    assert bad_bots_output['block_snapshot']['hits'] == 1
+
+
+# pylint: disable=W0621
+def test_snapshot_follows_new_versions_of_ip_set(get_mock_config, stub_wafv2_client):
+    """ Unit test that the snapshot is rebuilt from the addresses of the latest version of the IP set """
+
+    # !ARRANGE!
+    BadBots(get_mock_config, get_bot_event('1.1.1.1')).parse_bad_bots()
+
+    # !ACT!
+    BadBots(get_mock_config, get_bot_event('2.2.2.2')).parse_bad_bots()
+    snapshot = BlockSetSnapshot.get_snapshot(get_mock_config, ('REGIONAL', 'ip_set_bad_bots_ipv4_test'))
+
+    # !ASSERT!
+    assert snapshot.contains('1.1.1.1')
+    assert snapshot.contains('2.2.2.2')
+    assert snapshot.lock_token == stub_wafv2_client.get_ip_set(
+        Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL',
+        Id=stub_wafv2_client.ip_sets[('REGIONAL', 'ip_set_bad_bots_ipv4_test')]['Id'])['LockToken']
+
+
+# pylint: disable=W0621
+def test_expired_snapshot_is_not_used(get_mock_config, stub_wafv2_client):
+    """ Unit test that a snapshot past its time to live is ignored """
+
+    # !ARRANGE!
+    get_mock_config['BLOCK_SNAPSHOT']['TTL_SECONDS'] = '0'
+    BadBots(get_mock_config, get_bot_event('1.1.1.1')).parse_bad_bots()
+
+    # !ACT!
+    bad_bots_output = BadBots(get_mock_config, get_bot_event('1.1.1.1')).parse_bad_bots()
+
+    # !ASSERT!
+    assert bad_bots_output['scoring']['stop_reason'] != 'block_snapshot'
+    assert stub_wafv2_client.call_counts['get_ip_set'] == 2
+
+
+# pylint: disable=W0621
+def test_removed_address_is_not_reported_by_snapshot(get_mock_config, stub_wafv2_client):
+    """ Unit test that removing a block replaces the snapshot, so the address is no longer reported as blocked """
+
+    # !ARRANGE!
+    bad_bots = BadBots(get_mock_config, get_bot_event('1.1.1.1'))
+    ip_set_blocker = bad_bots.ip_set_blocker
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32', '2.2.2.2/32'])
+
+    # !ACT!
+    ip_set_blocker.remove_from_bad_bots_ip_sets(SourceIPType.IPV4, ['1.1.1.1/32'])
+    snapshot = BlockSetSnapshot.get_snapshot(get_mock_config, ('REGIONAL', 'ip_set_bad_bots_ipv4_test'))
+
+    # !ASSERT!
+    assert not snapshot.contains('1.1.1.1')
+    assert snapshot.contains('2.2.2.2')
+    assert bad_bots.check_block_snapshot(bad_bots.create_bot()) is None
+
+
+# pylint: disable=W0621
+def test_rebalance_drops_snapshots(get_mock_config, stub_wafv2_client):
+    """ Unit test that rebalancing the IP sets drops their snapshots """
+
+    # !ARRANGE!
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    # !ACT!
+    ip_set_blocker.rebalance_ip_sets()
+
+    # !ASSERT!
+    assert BlockSetSnapshot.get_snapshot(get_mock_config, ('REGIONAL', 'ip_set_bad_bots_ipv4_test')) is None
@@ -0,0 +1,147 @@
+""" Unit test containing tests for expiring blocks """
+
+import sys
+import os
+import inspect
+import time
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from blocking import BlockExpiryIndex
+from blocking import DynamoDBBlockExpiryIndex
+from blocking import IPSetBlocker
+from models import SourceIPType
+from stubs import StubDynamoDBClient
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config, tmp_path):
+    """ Return the mocked config with expiring blocks """
+
+    get_mock_config['BLOCKING'] = {
+        'BLOCK_TTL_SECONDS': '60',
+        'EXPIRY_INDEX_PATH': str(tmp_path / 'block_expiry.sqlite3')
+    }
+
+    yield get_mock_config
+
+    BlockExpiryIndex.close_all()
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with both bad bots IP sets """
+
+    client = StubWAFv2Client()
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4',
+                         Addresses=['9.9.9.9/32'])
+    client.create_ip_set(Name='ip_set_bad_bots_ipv6_test', Scope='REGIONAL', IPAddressVersion='IPV6', Addresses=[])
+
+    return register_stub_client('wafv2', client)
+
+
+# pylint: disable=W0621
+def test_sweep_removes_expired_blocks(get_mock_config, stub_wafv2_client):
+    """ Unit test that expired blocks are removed with one update per IP set and unexpired ones are kept """
+
+    # !ARRANGE!
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32', '2.2.2.2/32'])
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV6, ['2001:db8::1/128'])
+
+    get_mock_config['BLOCKING']['BLOCK_TTL_SECONDS'] = '3600'
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['3.3.3.3/32'])
+
+    update_count_before_sweep = stub_wafv2_client.call_counts['update_ip_set']
+
+    # !ACT!
+    sweep_output = ip_set_blocker.sweep_expired_blocks(now=time.time() + 120)
+    second_sweep_output = ip_set_blocker.sweep_expired_blocks(now=time.time() + 120)
+
+    # !ASSERT!
+    assert sweep_output['removed'] == {'IPV4': 2, 'IPV6': 1}
+    assert sweep_output['removed_total'] == 3
+    assert second_sweep_output['removed_total'] == 0
+    assert stub_wafv2_client.call_counts['update_ip_set'] - update_count_before_sweep == 2
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['3.3.3.3/32', '9.9.9.9/32']
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv6_test') == []
+
+
+# pylint: disable=W0621
+def test_sweep_keeps_blocks_that_are_still_listed(get_mock_config, stub_wafv2_client):
+    """ Unit test that addresses aggregated into a larger entry stay in the index and are retried by the next sweep """
+
+    # !ARRANGE!
+    get_mock_config['AWS_WAF']['COLLAPSE_ADJACENT_PREFIXES'] = 'true'
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['10.0.0.0/32', '10.0.0.1/32', '1.1.1.1/32'])
+
+    # !ACT!
+    sweep_output = ip_set_blocker.sweep_expired_blocks(now=time.time() + 120)
+
+    # !ASSERT!
+    assert sweep_output['removed'] == {'IPV4': 1}
+    assert sweep_output['retained'] == {'IPV4': 2}
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['9.9.9.9/32', '10.0.0.0/31']
+    assert sorted(address for address, _ in ip_set_blocker.get_block_expiry_index().get_expired('IPV4', time.time() + 120)) \
+        == ['10.0.0.0/32', '10.0.0.1/32']
+
+
+def test_remove_keeps_blocks_recorded_again(tmp_path):
+    """ Unit test that an address blocked again after the expired blocks were read keeps its new expiry """
+
+    # !ARRANGE!
+    expiry_index = BlockExpiryIndex(str(tmp_path / 'block_expiry.sqlite3'))
+    expiry_index.record('IPV4', ['1.1.1.1/32', '2.2.2.2/32'], 60)
+    expired_entries = expiry_index.get_expired('IPV4', time.time() + 120)
+    expiry_index.record('IPV4', ['1.1.1.1/32'], 3600)
+
+    # !ACT!
+    expiry_index.remove('IPV4', expired_entries)
+
+    # !ASSERT!
+    assert len(expiry_index) == 1
+    assert expiry_index.get_expired('IPV4', time.time() + 7200)[0][0] == '1.1.1.1/32'
+
+    expiry_index.close()
+
+
+# pylint: disable=W0621
+def test_sweep_with_shared_index(get_mock_config, stub_wafv2_client, register_stub_client):
+    """ Unit test that blocks recorded in the DynamoDB index are swept, including an address blocked again meanwhile """
+
+    # !ARRANGE!
+    dynamodb_client = register_stub_client('dynamodb', StubDynamoDBClient(page_size=1))
+    get_mock_config['BLOCKING']['EXPIRY_INDEX_TABLE'] = 'bad-bots-block-expiry'
+
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32', '2.2.2.2/32'])
+    expiry_index = ip_set_blocker.get_block_expiry_index()
+    expired_entries = expiry_index.get_expired('IPV4', time.time() + 120)
+    expiry_index.record('IPV4', ['2.2.2.2/32'], 3600)
+
+    # !ACT!
+    expiry_index.remove('IPV4', expired_entries)
+    sweep_output = ip_set_blocker.sweep_expired_blocks(now=time.time() + 7200)
+
+    # !ASSERT!
+    assert len(expired_entries) == 2
+    assert sweep_output['removed'] == {'IPV4': 1}
+    assert stub_wafv2_client.get_addresses('ip_set_bad_bots_ipv4_test') == ['1.1.1.1/32', '9.9.9.9/32']
+    assert list(dynamodb_client.tables['bad-bots-block-expiry']) == []
+
+    DynamoDBBlockExpiryIndex.close_all()
@@ -0,0 +1,133 @@
+""" Unit test containing tests for the body reader class """
+
+import sys
+import os
+import inspect
+import base64
+import time
+import tracemalloc
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from scoring import ScoringContext
+from scoring import SignatureMatcher
+from utilities import BodyReader
+
+
+def test_base64_body_is_decoded_in_chunks():
+    """ Unit test that a base64 body is decoded chunk by chunk, including multi byte characters on chunk boundaries """
+
+    # !ARRANGE!
+    body = 'naïve café ' * 1000
+    body_reader = BodyReader(base64.b64encode(body.encode('utf-8')).decode('ascii'), True, chunk_size=100)
+
+    # !ACT!
+    chunks = list(body_reader.iter_chunks())
+
+    # !ASSERT!
+    assert ''.join(chunks) == body
+    assert max(len(chunk) for chunk in chunks) <= 100
+    assert body_reader.get_statistics() == {'bytes_read': len(body.encode('utf-8')), 'is_truncated': False}
+
+
+def test_wrapped_base64_body_is_decoded_in_chunks():
+    """ Unit test that a padded base64 body wrapped in lines is decoded although line breaks shift the chunk boundaries """
+
+    # !ARRANGE!
+    body = 'naïve café <script>alert(1)</script> ' * 200 + 'the end'
+    encoded_body = base64.encodebytes(body.encode('utf-8')).decode('ascii').replace('\n', '\r\n')
+    body_reader = BodyReader(encoded_body, True, chunk_size=100)
+
+    # !ACT!
+    chunks = list(body_reader.iter_chunks())
+
+    # !ASSERT!
+    assert ''.join(chunks) == body
+    assert body_reader.get_statistics() == {'bytes_read': len(body.encode('utf-8')), 'is_truncated': False}
+
+
+def test_body_reader_respects_byte_budget():
+    """ Unit test that reading stops at the byte budget """
+
+    # !ARRANGE!
+    encoded_body = base64.b64encode(b'a' * 10000).decode('ascii')
+
+    # !ACT!
+    base64_chunks = list(BodyReader(encoded_body, True, max_body_bytes=1000, chunk_size=300).iter_chunks())
+    text_reader = BodyReader('b' * 10000, False, max_body_bytes=2500, chunk_size=1000)
+    text_chunks = list(text_reader.iter_chunks())
+
+    # !ASSERT!
+    assert len(''.join(base64_chunks)) == 1000
+    assert len(''.join(text_chunks)) == 2500
+    assert text_reader.get_statistics()['is_truncated'] is True
+
+
+def test_scan_chunks_finds_match_across_boundary():
+    """ Unit test that a signature split over two chunks is found """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+    body = 'x' * 98 + ' UNION ALL ' + 'y' * 100
+
+    # !ACT!
+    matches = signature_matcher.scan_chunks(BodyReader(body, chunk_size=100).iter_chunks(), overlap=32)
+
+    # !ASSERT!
+    assert matches == {'sql_injection'}
+
+
+def test_scan_of_large_body_has_bounded_memory():
+    """ Unit test that scanning a large base64 body does not decode it into memory at once """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+    encoded_body = base64.b64encode(b'comment=hello ' * 600000 + b'<script>').decode('ascii')
+
+    # !ACT!
+    tracemalloc.start()
+    matches = signature_matcher.scan_chunks(BodyReader(encoded_body, True, max_body_bytes=None).iter_chunks())
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # !ASSERT!
+    assert matches == {'xss'}
+    assert peak_memory < 1024 * 1024
+
+
+def test_scan_of_large_body_has_bounded_cost():
+    """ Unit test that the characters of a body sent to the signature matcher are capped, overlaps included """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+    scan_settings = ScoringContext.default_scan_settings
+    adversarial_body = '%3Cimg' * (1048576 // 6)
+    late_signature_body = 'x' * 100000 + ' UNION ALL ' + 'y' * 100000
+
+    # !ACT!
+    start_time = time.perf_counter()
+    adversarial_matches = signature_matcher.scan_chunks(
+        BodyReader(adversarial_body, False, None, scan_settings['body_chunk_size']).iter_chunks(),
+        scan_settings['body_chunk_overlap'], max_scan_length=scan_settings['max_body_scan_length'])
+    duration = time.perf_counter() - start_time
+
+    late_signature_matches = signature_matcher.scan_chunks(BodyReader(late_signature_body, chunk_size=1000).iter_chunks(),
+                                                           overlap=100, max_scan_length=50000)
+
+    # !ASSERT!
+    assert adversarial_matches == set()
+    assert duration < 1
+    assert late_signature_matches == set()
+    assert signature_matcher.scan_chunks(BodyReader(late_signature_body, chunk_size=1000).iter_chunks(),
+                                         overlap=100, max_scan_length=120000) == {'sql_injection'}
@@ -0,0 +1,74 @@
+""" Unit test containing tests for the detector registry class """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from scoring import DetectorRegistry
+
+
+@pytest.fixture(autouse=True)
+def reset_detector_registry():
+    """ Makes sure every test starts with a cold registry """
+
+    DetectorRegistry.reset()
+    yield
+    DetectorRegistry.reset()
+
+
+def test_detectors_are_built_once():
+    """ Unit test that the detectors are built once and reused afterwards """
+
+    # !ARRANGE!
+    statistics_cold = DetectorRegistry.get_statistics()
+
+    # !ACT!
+    detectors_1 = DetectorRegistry.get_detectors()
+    detectors_2 = DetectorRegistry.get_detectors()
+    detectors_3 = DetectorRegistry.get_detectors()
+
+    statistics_warm = DetectorRegistry.get_statistics()
+
+    # !ASSERT!
+
+    # Assert the registry was cold before first use
+    assert statistics_cold['is_built'] is False
+    assert statistics_cold['reuse_count'] == 0
+
+    # Assert the same objects are handed out on every call
+    assert detectors_1 is detectors_2
+    assert detectors_2 is detectors_3
+    assert detectors_1.crawler_detect.isCrawler("Mozilla/5.0 (compatible; Googlebot/2.1)")
+
+    # Assert build time and reuse count are recorded
+    assert statistics_warm['is_built'] is True
+    assert statistics_warm['build_duration_in_ms'] > 0
+    assert statistics_warm['reuse_count'] == 2
+
+
+def test_build_is_idempotent():
+    """ Unit test that eagerly building the detectors twice does not rebuild them """
+
+    # !ARRANGE!
+    detectors_1 = DetectorRegistry.build()
+
+    # !ACT!
+    detectors_2 = DetectorRegistry.build()
+
+    # !ASSERT!
+    assert detectors_1 is detectors_2
+    assert DetectorRegistry.get_statistics()['reuse_count'] == 0
@@ -0,0 +1,129 @@
+""" Unit test containing tests for the structured metrics record of diagnostics """
+
+import sys
+import os
+import inspect
+import json
+import logging
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from utilities import Diagnostics
+from utilities import MetricsRecord
+from utilities import PhaseTimer
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config """
+
+    get_mock_config['GEOLOCATION'] = {
+        'CACHE_ENABLED': 'false'
+    }
+    get_mock_config['METRICS'] = {
+        'NAMESPACE': 'BadBotsTest'
+    }
+
+    return get_mock_config
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with the IPv4 bad bots IP set """
+
+    client = StubWAFv2Client()
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+
+    return register_stub_client('wafv2', client)
+
+
+@pytest.fixture()
+def get_bot_event():
+    """ Return an event of a bot, the user agent and payload are enough to reach the threshold """
+
+    return {
+        'httpMethod': 'CONNECT',
+        'queryStringParameters': {'q': '1 UNION SELECT password FROM users'},
+        'requestContext': {'identity': {'sourceIp': '1.1.1.1'}},
+        'headers': {}
+    }
+
+
+class CountingRecord(MetricsRecord):
+    """ Metrics record counting how often it is formatted """
+
+    format_count = 0
+
+    def __str__(self):
+        CountingRecord.format_count += 1
+        return super().__str__()
+
+
+# pylint: disable=W0621
+def test_metrics_record_of_blocked_bot(get_mock_config, stub_wafv2_client, get_bot_event):
+    """ Unit test that a blocked bot results in one EMF record with the phase timings of the invocation """
+
+    # !ARRANGE!
+    PhaseTimer.reset()
+    bad_bots = BadBots(get_mock_config, get_bot_event, geolocation_resolver=lambda source_ip: 'United States')
+
+    # !ACT!
+    bad_bots_output = bad_bots.parse_bad_bots()
+    record = json.loads(str(MetricsRecord(bad_bots_output, 'BadBotsTest', 12.5)))
+
+    # !ASSERT!
+    metric_names = [metric['Name'] for metric in record['_aws']['CloudWatchMetrics'][0]['Metrics']]
+
+    assert record['_aws']['CloudWatchMetrics'][0]['Namespace'] == 'BadBotsTest'
+    assert record['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [['Verdict']]
+    assert record['Verdict'] == MetricsRecord.verdict_blocked
+    assert record['source_ip'] == '1.1.1.1'
+    assert record['Blocked'] == 1
+    assert record['Duration'] == 12.5
+    assert 'http_method' in record['rules_hit']
+
+    for metric_name in ['Duration', 'ParseDuration', 'ScoringDuration', 'WAFReadDuration', 'WAFWriteDuration',
+                        'BotConfidenceScore', 'Blocked']:
+        assert metric_name in metric_names
+        assert metric_name in record
+
+
+# pylint: disable=W0621
+def test_metrics_record_is_formatted_lazily(get_mock_config, stub_wafv2_client, get_bot_event, monkeypatch):
+    """ Unit test that the record is only formatted when the logger emits it """
+
+    # !ARRANGE!
+    PhaseTimer.reset()
+    bad_bots_output = BadBots(get_mock_config, get_bot_event,
+                              geolocation_resolver=lambda source_ip: None).parse_bad_bots()
+
+    monkeypatch.setattr('utilities.diagnostics.MetricsRecord', CountingRecord)
+    logger = logging.getLogger()
+    level = logger.level
+    CountingRecord.format_count = 0
+
+    # !ACT!
+    try:
+        logger.setLevel(logging.WARNING)
+        Diagnostics.print_results({'bad_bots_results': bad_bots_output, 'config': get_mock_config})
+
+    finally:
+        logger.setLevel(level)
+
+    # !ASSERT!
+    assert CountingRecord.format_count == 0
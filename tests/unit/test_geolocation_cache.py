@@ -0,0 +1,128 @@
+""" Unit test containing tests for the geolocation cache """
+
+import sys
+import os
+import inspect
+import configparser
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up configuration path
+CONFIG_PATH = os.path.join(os.path.dirname(PROJECT_ROOT_SRC + "/LambdaCode"), 'config', 'config.ini')
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from connection import HTTPGet
+from cache import TTLLRUCache
+from cache import GeolocationCache
+from geolocation import GeolocationProviderFactory
+
+
+class FakeClock:
+    """ Clock that only moves when told to """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def setup_config():
+    """ Fixture for setting up configuration parser """
+
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+
+    return config
+
+
+@pytest.fixture(autouse=True)
+def reset_geolocation_cache():
+    """ Makes sure every test starts with an empty geolocation cache """
+
+    GeolocationCache.set_cache(None)
+    GeolocationProviderFactory.reset()
+    yield
+    GeolocationCache.set_cache(None)
+    GeolocationProviderFactory.reset()
+
+
+def test_ttl_lru_cache_eviction_and_expiry():
+    """ Unit test LRU eviction and TTL expiry of the TTLLRUCache class """
+
+    # !ARRANGE!
+    clock = FakeClock()
+    cache = TTLLRUCache(max_size=2, ttl_in_seconds=10, clock=clock)
+
+    # !ACT!
+    cache.put('1.1.1.1', 'Netherlands')
+    cache.put('2.2.2.2', None)
+    cache.lookup('1.1.1.1')  # Make 2.2.2.2 the least recently used entry
+    cache.put('3.3.3.3', 'Germany')
+
+    evicted_lookup = cache.lookup('2.2.2.2')
+    cached_lookup = cache.lookup('1.1.1.1')
+
+    clock.now = 11
+    expired_lookup = cache.lookup('3.3.3.3')
+
+    statistics = cache.get_statistics()
+
+    # !ASSERT!
+    assert evicted_lookup == (False, None)
+    assert cached_lookup == (True, 'Netherlands')
+    assert expired_lookup == (False, None)
+    assert statistics['evictions'] == 1
+    assert statistics['expirations'] == 1
+    assert statistics['hits'] == 2
+    assert statistics['misses'] == 2
+
+
+def test_ttl_lru_cache_negative_entry():
+    """ Unit test that None is cached as a negative result """
+
+    # !ARRANGE!
+    cache = TTLLRUCache(max_size=10, ttl_in_seconds=10)
+
+    # !ACT!
+    cache.put('2.2.2.2', None)
+
+    # !ASSERT!
+    assert cache.lookup('2.2.2.2') == (True, None)
+
+
+# pylint: disable=W0621
+def test_get_geolocation_is_cached(setup_config, monkeypatch):
+    """ Unit test that get_geolocation only calls the API once per address, including failed lookups """
+
+    # !ARRANGE!
+    requested_urls = []
+
+    def mock_http_get_contents(url):
+        requested_urls.append(url)
+        return '{"country": "Netherlands"}' if url.endswith('1.1.1.1') else ''
+
+    monkeypatch.setattr(HTTPGet, 'http_get_contents', staticmethod(mock_http_get_contents))
+    bad_bots_instance = BadBots(setup_config, {})
+
+    # !ACT!
+    countries = [bad_bots_instance.get_geolocation(source_ip) for source_ip in ['1.1.1.1', '1.1.1.1', '2.2.2.2',
+                                                                               '2.2.2.2']]
+
+    # !ASSERT!
+    assert countries == ['Netherlands', 'Netherlands', None, None]
+    assert len(requested_urls) == 2
+    assert GeolocationCache.get_statistics()['hits'] == 2
@@ -0,0 +1,115 @@
+""" Unit test containing tests for the geolocation providers """
+
+import sys
+import os
+import io
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from geolocation import ChainedGeolocationProvider
+from geolocation import GeolocationProvider
+from geolocation import RangeTableBuilder
+from geolocation import RangeTableGeolocationProvider
+
+MOCK_RANGES_CSV = """start_ip,end_ip,country_code
+# Comments are skipped
+1.0.0.0,1.0.0.255,AU
+77.160.0.0,77.175.255.255,NL
+5.0.0.0,5.0.0.0,DE
+2001:200::,2001:200:ffff:ffff:ffff:ffff:ffff:ffff,JP
+2a02:a440::,2a02:a45f:ffff:ffff:ffff:ffff:ffff:ffff,NL
+"""
+
+
+class MockGeolocationProvider(GeolocationProvider):
+    """ Provider returning a fixed answer """
+
+    supported_ip_versions = (4,)
+
+    def __init__(self, country):
+        self.country = country
+        self.lookup_count = 0
+
+    def get_country(self, source_ip):
+        self.lookup_count += 1
+        return self.country
+
+
+@pytest.fixture()
+def range_table_provider(tmp_path):
+    """ Fixture building a range table out of the mock ranges """
+
+    builder = RangeTableBuilder()
+    builder.add_csv(io.StringIO(MOCK_RANGES_CSV))
+
+    range_table_path = str(tmp_path / 'ip_ranges.bin')
+    builder.write(range_table_path)
+
+    provider = RangeTableGeolocationProvider(range_table_path)
+    yield provider
+    provider.close()
+
+
+# pylint: disable=W0621
+def test_range_table_lookup(range_table_provider):
+    """ Unit test lookups in the memory mapped range table """
+
+    # !ACT!
+    countries = {
+        source_ip: range_table_provider.get_country(source_ip) for source_ip in [
+            '1.0.0.0', '1.0.0.128', '1.0.0.255', '1.0.1.0', '0.255.255.255', '77.168.51.231', '5.0.0.0', '5.0.0.1',
+            '255.255.255.255', '2001:200::1', '2a02:a445:6d36:1:1e3:a188:313c:1d31', '2a03::', '::1'
+        ]
+    }
+
+    # !ASSERT!
+    assert countries == {
+        '1.0.0.0': 'AU', '1.0.0.128': 'AU', '1.0.0.255': 'AU', '1.0.1.0': None, '0.255.255.255': None,
+        '77.168.51.231': 'NL', '5.0.0.0': 'DE', '5.0.0.1': None, '255.255.255.255': None, '2001:200::1': 'JP',
+        '2a02:a445:6d36:1:1e3:a188:313c:1d31': 'NL', '2a03::': None, '::1': None
+    }
+
+
+def test_range_table_builder_rejects_overlap():
+    """ Unit test that overlapping ranges are refused """
+
+    # !ARRANGE!
+    builder = RangeTableBuilder()
+    builder.add_range('10.0.0.0', '10.0.0.255', 'NL')
+    builder.add_range('10.0.0.128', '10.0.1.255', 'BE')
+
+    # !ACT! / !ASSERT!
+    with pytest.raises(ValueError):
+        builder.build()
+
+
+def test_chained_provider_falls_back(range_table_provider):
+    """ Unit test that the chain falls back to the next provider when the range table has no answer """
+
+    # !ARRANGE!
+    fallback_provider = MockGeolocationProvider('United States')
+    chained_provider = ChainedGeolocationProvider([range_table_provider, fallback_provider])
+
+    # !ACT!
+    country_from_table = chained_provider.get_country('77.168.51.231')
+    country_from_fallback = chained_provider.get_country('8.8.8.8')
+    country_ipv6 = chained_provider.get_country('2a03::')
+
+    # !ASSERT!
+    assert country_from_table == 'NL'
+    assert country_from_fallback == 'United States'
+    assert country_ipv6 is None
+    assert fallback_provider.lookup_count == 1
@@ -0,0 +1,193 @@
+""" Unit test containing tests for the HTTPGet class """
+
+import sys
+import os
+import inspect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from connection import HTTPGet
+
+
+class MockGeolocationHandler(BaseHTTPRequestHandler):
+    """ Keep-alive HTTP handler returning a fixed geolocation """
+
+    protocol_version = 'HTTP/1.1'
+
+    # pylint: disable=C0103
+    def do_GET(self):
+        body = b'{"country": "Netherlands"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowGeolocationHandler(MockGeolocationHandler):
+    """ HTTP handler that answers after a second, counts the requests it received """
+
+    request_count = 0
+
+    # pylint: disable=C0103
+    def do_GET(self):
+        SlowGeolocationHandler.request_count += 1
+        time.sleep(1)
+        super().do_GET()
+
+
+class TricklingGeolocationHandler(BaseHTTPRequestHandler):
+    """ HTTP handler that sends its body one byte every 10 ms, so no single socket read times out """
+
+    protocol_version = 'HTTP/1.1'
+
+    # pylint: disable=C0103
+    def do_GET(self):
+        body = b'{"country": "Netherlands"}' * 20
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        try:
+            for index in range(len(body)):
+                self.wfile.write(body[index:index + 1])
+                self.wfile.flush()
+                time.sleep(0.01)
+
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def mock_server_url():
+    """ Fixture running a local HTTP server """
+
+    server = HTTPServer(('127.0.0.1', 0), MockGeolocationHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    HTTPGet.reset()
+    yield 'http://127.0.0.1:{0}/json/'.format(server.server_address[1])
+    HTTPGet.reset()
+
+    server.shutdown()
+    server.server_close()
+
+
+# pylint: disable=W0621
+def test_http_get_contents_reuses_connection(mock_server_url):
+    """ Unit test that consecutive requests share one pooled connection and are timed """
+
+    # !ACT!
+    contents = [HTTPGet.http_get_contents(mock_server_url + source_ip) for source_ip in ['1.1.1.1', '2.2.2.2',
+                                                                                       '3.3.3.3']]
+    statistics = HTTPGet.get_statistics()
+
+    # !ASSERT!
+    assert contents == ['{"country": "Netherlands"}'] * 3
+    assert statistics['requests'] == 3
+    assert statistics['new_connections'] == 1
+    assert statistics['reused_connections'] == 2
+    assert statistics['last_request']['status'] == 200
+    assert statistics['last_request']['ttfb_in_ms'] <= statistics['last_request']['total_duration_in_ms']
+
+
+def test_configure_recreates_pool_on_change(mock_server_url):
+    """ Unit test that the pool is only recreated when the HTTP settings change """
+
+    # !ARRANGE!
+    HTTPGet.http_get_contents(mock_server_url)
+    pool_manager = HTTPGet.get_pool_manager()
+
+    # !ACT!
+    HTTPGet.configure({})
+    pool_manager_same_settings = HTTPGet.get_pool_manager()
+
+    HTTPGet.configure({'HTTP': {'POOL_MAXSIZE': '8'}})
+    pool_manager_new_settings = HTTPGet.get_pool_manager()
+
+    # !ASSERT!
+    assert pool_manager_same_settings is pool_manager
+    assert pool_manager_new_settings is not pool_manager
+    # The connections of the replaced pool are closed
+    assert len(pool_manager.pools) == 0
+
+
+def test_slow_response_is_not_retried_past_the_deadline():
+    """ Unit test that a request that reached the server ends at the total timeout and is not sent again """
+
+    # !ARRANGE!
+    server = HTTPServer(('127.0.0.1', 0), SlowGeolocationHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    HTTPGet.reset()
+    HTTPGet.configure({'HTTP': {'TOTAL_TIMEOUT': '0.3'}})
+    SlowGeolocationHandler.request_count = 0
+
+    try:
+        # !ACT!
+        start_time = time.perf_counter()
+        content = HTTPGet.http_get_contents('http://127.0.0.1:{0}/json/'.format(server.server_address[1]))
+        duration = time.perf_counter() - start_time
+
+    finally:
+        HTTPGet.reset()
+        server.shutdown()
+        server.server_close()
+
+    # !ASSERT!
+    assert content == ''
+    assert duration < 0.8
+    assert SlowGeolocationHandler.request_count == 1
+
+
+def test_trickling_body_is_cut_off_at_the_deadline():
+    """ Unit test that a body that keeps trickling in is not read past the deadline of the request """
+
+    # !ARRANGE!
+    server = HTTPServer(('127.0.0.1', 0), TricklingGeolocationHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    HTTPGet.reset()
+    HTTPGet.configure({'HTTP': {'TOTAL_TIMEOUT': '0.3', 'CONNECT_RETRIES': '0'}})
+
+    try:
+        # !ACT!
+        start_time = time.perf_counter()
+        content = HTTPGet.http_get_contents('http://127.0.0.1:{0}/json/'.format(server.server_address[1]))
+        duration = time.perf_counter() - start_time
+
+    finally:
+        HTTPGet.reset()
+        server.shutdown()
+        server.server_close()
+
+    # !ASSERT!
+
+    # Assert the read stopped long before the 5 seconds the whole body takes
+    assert content == ''
+    assert duration < 2.5
@@ -0,0 +1,65 @@
+""" Unit test containing tests for the IP set merger class """
+
+import sys
+import os
+import inspect
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from utilities import IPSetMerger
+
+
+def test_merge_removes_duplicates():
+    """ Unit test that merging never lists an address twice """
+
+    # !ACT!
+    merged = IPSetMerger.merge(['2.2.2.2/32', '2.2.2.2/32', '3.3.3.3/32'], ['1.1.1.1/32', '1.1.1.1/32'])
+
+    # !ASSERT!
+    assert merged == ['1.1.1.1/32', '2.2.2.2/32', '3.3.3.3/32']
+
+
+def test_merge_skips_covered_addresses():
+    """ Unit test that no update is needed when the address is already covered """
+
+    # !ACT!
+    merged_ipv4 = IPSetMerger.merge(['10.0.0.0/8', '1.1.1.1/32'], ['10.1.2.3/32', '1.1.1.1/32'])
+    merged_ipv6 = IPSetMerger.merge(['2a02:a445:6d36:0001:01e3:a188:313c:1d33/128'],
+                                    ['2a02:a445:6d36:1:1e3:a188:313c:1d33/128'])
+
+    # !ASSERT!
+    assert merged_ipv4 is None
+    assert merged_ipv6 is None
+
+
+def test_merge_collapses_adjacent_prefixes():
+    """ Unit test that adjacent prefixes are aggregated for both IP versions """
+
+    # !ACT!
+    merged = IPSetMerger.merge(['192.168.0.0/25', '2001:db8::/33'], ['192.168.0.128/25', '2001:db8:8000::/33',
+                                                                      '8.8.8.8/32'], collapse=True)
+
+    # !ASSERT!
+    assert merged == ['8.8.8.8/32', '192.168.0.0/24', '2001:db8::/32']
+
+
+def test_merge_collapses_within_min_prefix_length():
+    """ Unit test that collapsing with a minimum prefix length does not aggregate across prefixes of that length """
+
+    # !ACT!
+    merged = IPSetMerger.merge(['192.168.0.0/25', '192.168.1.0/24', '10.0.0.0/16'], ['192.168.0.128/25', '10.1.0.0/16'],
+                               collapse=True, min_prefix_length=24)
+
+    # !ASSERT!
+    assert merged == ['10.0.0.0/16', '10.1.0.0/16', '192.168.0.0/24', '192.168.1.0/24']
@@ -0,0 +1,169 @@
+""" Unit test containing tests for sharding the bad bots IP sets """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from blocking import IPSetBlocker
+from models import SourceIPType
+from stubs import StubWAFv2Client
+
+SHARD_NAMES = ['ip_set_bad_bots_ipv4_shard_0', 'ip_set_bad_bots_ipv4_shard_1', 'ip_set_bad_bots_ipv4_shard_2']
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config with three IPv4 shards """
+
+    get_mock_config['AWS_WAF']['IP_SET_BAD_BOTS_IPV4_NAME'] = 'ip_set_bad_bots_ipv4_shard_0'
+    get_mock_config['AWS_WAF']['IP_SET_BAD_BOTS_IPV4_SHARDS'] = ','.join(SHARD_NAMES)
+
+    return get_mock_config
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with the shards, each holding at most 20 addresses """
+
+    client = StubWAFv2Client(address_limit=20)
+
+    for shard_name in SHARD_NAMES:
+        client.create_ip_set(Name=shard_name, Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+
+    client.create_ip_set(Name='ip_set_bad_bots_ipv6_test', Scope='REGIONAL', IPAddressVersion='IPV6', Addresses=[])
+
+    return register_stub_client('wafv2', client)
+
+
+def get_all_addresses(client, shard_names) -> list:
+    """ Returns the addresses of all shards """
+
+    return sorted(address for shard_name in shard_names for address in client.get_addresses(shard_name))
+
+
+# pylint: disable=W0621
+def test_placement_is_consistent_by_prefix(get_mock_config):
+    """ Unit test that addresses of the same prefix share a shard and placement does not depend on the shard order """
+
+    # !ARRANGE!
+    shard_manager = IPSetBlocker(get_mock_config).get_ip_set_shard_manager(SourceIPType.IPV4)
+    get_mock_config['AWS_WAF']['IP_SET_BAD_BOTS_IPV4_SHARDS'] = ','.join(reversed(SHARD_NAMES))
+    reversed_shard_manager = IPSetBlocker(get_mock_config).get_ip_set_shard_manager(SourceIPType.IPV4)
+
+    # !ACT!
+    shards = {shard_manager.get_shard('10.0.{0}.1/32'.format(index)) for index in range(64)}
+
+    # !ASSERT!
+    assert shards == set(SHARD_NAMES)
+    assert shard_manager.get_shard('10.0.1.1/32') == shard_manager.get_shard('10.0.1.200')
+    assert all(shard_manager.get_shard('10.0.{0}.1/32'.format(index)) ==
+               reversed_shard_manager.get_shard('10.0.{0}.1/32'.format(index)) for index in range(64))
+
+
+# pylint: disable=W0621
+def test_writes_only_touch_affected_shards(get_mock_config, stub_wafv2_client):
+    """ Unit test that a block only reads and writes the shard of the address """
+
+    # !ARRANGE!
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    shard_name = ip_set_blocker.get_ip_set_shard_manager(SourceIPType.IPV4).get_shard('1.1.1.1/32')
+
+    # !ACT!
+    update_output = ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, ['1.1.1.1/32'])
+
+    # !ASSERT!
+    assert update_output['updated']
+    assert list(update_output['shards']) == [shard_name]
+    assert stub_wafv2_client.call_counts['get_ip_set'] == 1
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 1
+    assert stub_wafv2_client.get_addresses(shard_name) == ['1.1.1.1/32']
+
+
+# pylint: disable=W0621
+def test_shards_hold_more_than_one_ip_set(get_mock_config, stub_wafv2_client):
+    """ Unit test that the shards together hold more addresses than a single IP set, with one update per shard """
+
+    # !ARRANGE!
+    addresses = ['10.0.{0}.1/32'.format(index) for index in range(36)]
+
+    # !ACT!
+    update_output = IPSetBlocker(get_mock_config).update_bad_bots_ip_set(SourceIPType.IPV4, addresses)
+
+    # !ASSERT!
+    assert len(update_output['shards']) == 3
+    assert stub_wafv2_client.call_counts['update_ip_set'] == 3
+    assert get_all_addresses(stub_wafv2_client, SHARD_NAMES) == sorted(addresses)
+
+
+# pylint: disable=W0621
+def test_rebalance_moves_entries_to_new_shard(get_mock_config, stub_wafv2_client):
+    """ Unit test that after adding a shard, rebalancing moves the entries the new shard wins and keeps every address
+        blocked """
+
+    # !ARRANGE!
+    addresses = ['10.0.{0}.1/32'.format(index) for index in range(30)]
+    get_mock_config['AWS_WAF']['IP_SET_BAD_BOTS_IPV4_SHARDS'] = ','.join(SHARD_NAMES[:2])
+    IPSetBlocker(get_mock_config).update_bad_bots_ip_set(SourceIPType.IPV4, addresses)
+
+    get_mock_config['AWS_WAF']['IP_SET_BAD_BOTS_IPV4_SHARDS'] = ','.join(SHARD_NAMES)
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    shard_manager = ip_set_blocker.get_ip_set_shard_manager(SourceIPType.IPV4)
+
+    # !ACT!
+    dry_run_output = ip_set_blocker.rebalance_ip_sets(dry_run=True)
+    moved_before_rebalance = stub_wafv2_client.get_addresses(SHARD_NAMES[2])
+    rebalance_output = ip_set_blocker.rebalance_ip_sets()
+
+    # !ASSERT!
+    assert moved_before_rebalance == []
+    assert dry_run_output['IPV4']['moved'] == rebalance_output['IPV4']['moved'] > 0
+    assert rebalance_output['IPV4']['shards'][SHARD_NAMES[2]]['added'] == rebalance_output['IPV4']['moved']
+    assert get_all_addresses(stub_wafv2_client, SHARD_NAMES) == sorted(addresses)
+
+    for shard_name in SHARD_NAMES:
+        assert all(shard_manager.get_shard(address) == shard_name
+                   for address in stub_wafv2_client.get_addresses(shard_name))
+
+
+# pylint: disable=W0621
+def test_collapse_does_not_cross_shard_prefix(get_mock_config, stub_wafv2_client):
+    """ Unit test that collapsing only aggregates within the shard prefix, so an aggregated network stays in the shard
+        of the addresses it covers and removing one of them finds the shard holding it """
+
+    # !ARRANGE!
+    get_mock_config['AWS_WAF']['COLLAPSE_ADJACENT_PREFIXES'] = 'true'
+    ip_set_blocker = IPSetBlocker(get_mock_config)
+    shard_manager = ip_set_blocker.get_ip_set_shard_manager(SourceIPType.IPV4)
+
+    # Two neighbouring /24 prefixes placed in the same shard, which would otherwise be collapsed into their /23
+    first_index = next(index for index in range(0, 256, 2)
+                       if shard_manager.get_shard('10.0.{0}.0/24'.format(index)) ==
+                       shard_manager.get_shard('10.0.{0}.0/24'.format(index + 1)))
+    shard_name = shard_manager.get_shard('10.0.{0}.0/24'.format(first_index))
+    addresses = ['10.0.{0}.{1}/32'.format(first_index + offset, host) for offset in range(2) for host in range(256)]
+
+    # !ACT!
+    ip_set_blocker.update_bad_bots_ip_set(SourceIPType.IPV4, addresses)
+    shard_addresses = stub_wafv2_client.get_addresses(shard_name)
+    _, retained_addresses, _ = shard_manager.remove_addresses([addresses[0]])
+
+    # !ASSERT!
+    assert shard_addresses == ['10.0.{0}.0/24'.format(first_index), '10.0.{0}.0/24'.format(first_index + 1)]
+    assert all(shard_manager.get_shard(address) == shard_name for address in shard_addresses)
+    assert retained_addresses == [addresses[0]]
+    assert ip_set_blocker.rebalance_ip_sets(dry_run=True)['IPV4']['moved'] == 0
@@ -0,0 +1,120 @@
+""" Unit test containing tests for the scoring pipeline """
+
+import sys
+import os
+import inspect
+import configparser
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up configuration path
+CONFIG_PATH = os.path.join(os.path.dirname(PROJECT_ROOT_SRC + "/LambdaCode"), 'config', 'config.ini')
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from models import Bot
+from scoring import ScoringContext
+from scoring import ScoringPipeline
+from scoring import ScoringRule
+
+
+class MockRule(ScoringRule):
+    """ Rule with a fixed outcome that records whether it was evaluated """
+
+    def __init__(self, name, weight, cost, is_match):
+        self.name = name
+        self.weight = weight
+        self.cost = cost
+        self.is_match = is_match
+        self.evaluation_count = 0
+
+    def matches(self, scoring_context):
+        self.evaluation_count += 1
+        return self.is_match
+
+
+@pytest.fixture()
+def setup_config():
+    """ Fixture for setting up configuration parser """
+
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+
+    return config
+
+
+def get_bot(http_method, http_body):
+    """ Returns a bot with a regular browser user agent """
+
+    bot = Bot()
+    bot.source_ip = '1.1.1.1'
+    bot.source_ip_type = BadBots.SourceIPType.IPV4
+    bot.http_user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/77.0 Safari/537.36"
+    bot.http_method = http_method
+    bot.http_body = http_body
+    bot.http_query_string_parameters = ''
+    bot.geolocation = None
+
+    return bot
+
+
+def test_pipeline_orders_rules_by_cost_and_stops_early():
+    """ Unit test that the pipeline runs cheap rules first and stops once the threshold is decided """
+
+    # !ARRANGE!
+    expensive_rule = MockRule('expensive', 5, 100, True)
+    cheap_rule = MockRule('cheap', 8, 1, True)
+    pipeline = ScoringPipeline([expensive_rule, cheap_rule])
+
+    unreachable_rule = MockRule('unreachable', 2, 1, False)
+    unreachable_pipeline = ScoringPipeline([unreachable_rule, MockRule('other', 3, 2, True)])
+
+    # !ACT!
+    result = pipeline.evaluate(ScoringContext(None), threshold=7)
+    full_result = pipeline.evaluate(ScoringContext(None))
+    unreachable_result = unreachable_pipeline.evaluate(ScoringContext(None), threshold=7)
+
+    # !ASSERT!
+    assert result['score'] == 8
+    assert result['stop_reason'] == ScoringPipeline.stop_reason_threshold_reached
+    assert list(result['rules']) == ['cheap']
+    assert full_result['score'] == 13
+    assert expensive_rule.evaluation_count == 1
+    assert unreachable_result['score'] == 0
+    assert unreachable_result['stop_reason'] == ScoringPipeline.stop_reason_threshold_unreachable
+    assert pipeline.get_statistics()['hit_counts'] == {'cheap': 2, 'expensive': 1}
+
+
+# pylint: disable=W0621
+def test_geolocation_only_resolved_when_it_can_change_the_outcome(setup_config):
+    """ Unit test that the geolocation lookup is skipped when the other rules already decide the outcome """
+
+    # !ARRANGE!
+    bad_bots = BadBots(setup_config, {})
+    resolved_ips = []
+
+    def geolocation_resolver(source_ip):
+        resolved_ips.append(source_ip)
+        return 'United States'
+
+    # !ACT!
+    result_decided = bad_bots.evaluate_bot_confidence(get_bot('CONNECT', 'EXEC'), 7, geolocation_resolver)
+    result_undecided = bad_bots.evaluate_bot_confidence(get_bot('PUT', 'hello'), 7, geolocation_resolver)
+
+    # !ASSERT!
+    assert result_decided['score'] >= 7
+    assert 'geolocation' not in result_decided['rules']
+    assert result_undecided['score'] == 10
+    assert result_undecided['rules']['geolocation']['hit'] is True
+    assert resolved_ips == ['1.1.1.1']
@@ -0,0 +1,77 @@
+""" Unit test containing tests for the signature matcher class """
+
+import sys
+import os
+import inspect
+import time
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+# pylint: disable=E0401
+from scoring import SignatureMatcher
+
+
+def test_scan_reports_every_signature():
+    """ Unit test that all signatures are reported, including signatures overlapping an earlier match """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+
+    # !ACT!
+    matches_overlapping = signature_matcher.scan('<imgx> and some more text')
+    matches_all = signature_matcher.scan('id=1 UNION ALL SELECT password <script> %3CIMG src=x onerror=alert(1)%3E')
+    matches_none = signature_matcher.scan('select * from users <> img')
+
+    # !ASSERT!
+    assert matches_overlapping == {'xss', 'xss_image'}
+    assert matches_all == {'sql_injection', 'xss', 'xss_image'}
+    assert matches_none == set()
+
+
+def test_scan_respects_max_scan_length():
+    """ Unit test that only the first max_scan_length characters are scanned """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+    text = 'a' * 1000 + ' DROP '
+
+    # !ACT! / !ASSERT!
+    assert signature_matcher.scan(text, max_scan_length=100) == set()
+    assert signature_matcher.scan(text, max_scan_length=2000) == {'sql_injection'}
+
+
+def test_scan_all_combines_inputs():
+    """ Unit test that matches of the body and the query string parameters are combined """
+
+    # !ACT!
+    matches = SignatureMatcher().scan_all(['EXEC', "{'q': '<script></script>'}"])
+
+    # !ASSERT!
+    assert matches == {'sql_injection', 'xss'}
+
+
+def test_scan_is_linear_on_repeated_tag_openings():
+    """ Unit test that inputs of repeated, unclosed tag openings do not backtrack quadratically """
+
+    # !ARRANGE!
+    signature_matcher = SignatureMatcher()
+    texts = ['<img' * 16384, '%3Cimg' * 16384, '%3C' + 'a%2f' * 20000, '<img' + 'a' * 65536]
+
+    # !ACT!
+    start_time = time.perf_counter()
+    matches = [signature_matcher.scan(text) for text in texts]
+    duration = time.perf_counter() - start_time
+
+    # !ASSERT!
+    assert matches == [set(), set(), set(), set()]
+    assert duration < 1
@@ -0,0 +1,117 @@
+""" Unit test containing tests for the user agent cache """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from cache import UserAgentCache
+from models import Bot
+
+USER_AGENT_GOOGLEBOT = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+USER_AGENT_BROWSER = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
+                     'Chrome/86.0.4240.75 Safari/537.36'
+
+
+class CountingCrawlerDetect:
+    """ CrawlerDetect stand-in counting the classifications """
+
+    def __init__(self):
+        self.classifications = 0
+        self.matches = []
+
+    def isCrawler(self, user_agent):
+        """ Classifies user agents containing 'bot' as crawlers """
+        # pylint: disable=C0103
+
+        self.classifications += 1
+        self.matches = ['bot'] if 'bot' in user_agent else []
+
+        return bool(self.matches)
+
+    def getMatches(self):
+        """ Returns the matched crawler """
+        # pylint: disable=C0103
+
+        return self.matches[0] if self.matches else None
+
+
+@pytest.fixture(autouse=True)
+def reset_user_agent_cache():
+    """ Makes sure every test starts with an empty user agent cache """
+
+    UserAgentCache.set_user_agent_cache(None)
+    yield
+    UserAgentCache.set_user_agent_cache(None)
+
+
+def test_repeated_user_agents_are_classified_once():
+    """ Unit test that a repeated user agent is classified once and counted as a hit """
+
+    # !ARRANGE!
+    user_agent_cache = UserAgentCache.get_user_agent_cache({'USER_AGENT_CACHE': {'MAX_SIZE': '16'}})
+    crawler_detect = CountingCrawlerDetect()
+
+    # !ACT!
+    classifications = [user_agent_cache.lookup(crawler_detect, user_agent)
+                       for user_agent in ['Googlebot/2.1', 'Firefox/82.0', 'Googlebot/2.1', 'Googlebot/2.1']]
+
+    # !ASSERT!
+    assert classifications == [(True, 'bot'), (False, None), (True, 'bot'), (True, 'bot')]
+    assert crawler_detect.classifications == 2
+    assert UserAgentCache.get_statistics()['hits'] == 2
+    assert UserAgentCache.get_statistics()['misses'] == 2
+
+
+def test_long_user_agents_bypass_the_cache():
+    """ Unit test that user agents over the maximum length are classified without being cached """
+
+    # !ARRANGE!
+    user_agent_cache = UserAgentCache.get_user_agent_cache({'USER_AGENT_CACHE': {'MAX_USER_AGENT_LENGTH': '32'}})
+    crawler_detect = CountingCrawlerDetect()
+    long_user_agent = 'bot ' + 'x' * 64
+
+    # !ACT!
+    user_agent_cache.lookup(crawler_detect, long_user_agent)
+    user_agent_cache.lookup(crawler_detect, long_user_agent)
+
+    # !ASSERT!
+    statistics = UserAgentCache.get_statistics()
+
+    assert crawler_detect.classifications == 2
+    assert statistics['bypasses'] == 2
+    assert statistics['size'] == 0
+
+
+def test_crawler_name_in_scoring_output():
+    """ Unit test that scoring reports the matched crawler, with and without the cache """
+
+    for enabled in ['true', 'false']:
+        # !ARRANGE!
+        UserAgentCache.set_user_agent_cache(None)
+        bad_bots = BadBots({'USER_AGENT_CACHE': {'ENABLED': enabled}}, {})
+
+        # !ACT!
+        crawler_result = bad_bots.evaluate_bot_confidence(Bot(http_user_agent=USER_AGENT_GOOGLEBOT))
+        browser_result = bad_bots.evaluate_bot_confidence(Bot(http_user_agent=USER_AGENT_BROWSER))
+
+        # !ASSERT!
+        assert crawler_result['rules']['crawler']['hit']
+        assert crawler_result['crawler'] == 'Googlebot'
+        assert not browser_result['rules']['crawler']['hit']
+        assert browser_result['crawler'] is None
+        assert (UserAgentCache.get_statistics() is not None) == (enabled == 'true')
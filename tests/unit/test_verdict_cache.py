@@ -0,0 +1,133 @@
+""" Unit test containing tests for the verdict cache """
+
+import sys
+import os
+import inspect
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from cache import SQLiteVerdictStore
+from cache import TTLLRUCache
+from cache import VerdictCache
+from models import Bot
+
+
+@pytest.fixture()
+def get_mock_config(get_mock_config):
+    """ Return the mocked config with the verdict cache enabled """
+
+    get_mock_config['VERDICT_CACHE'] = {
+        'ENABLED': 'true',
+        'TTL_SECONDS': '300'
+    }
+
+    yield get_mock_config
+
+    VerdictCache.set_verdict_cache(None)
+    SQLiteVerdictStore.close_all()
+
+
+class CountingGeolocationResolver:
+    """ Geolocation resolver counting the lookups """
+
+    def __init__(self):
+        self.lookups = 0
+
+    def __call__(self, source_ip):
+        self.lookups += 1
+        return 'United States'
+
+
+# pylint: disable=W0621
+def test_cached_verdict_skips_outbound_calls(get_mock_config, stub_wafv2_client):
+    """ Unit test that repeat requests of a blocked bot do not look up the geolocation or touch the IP set """
+
+    # !ARRANGE!
+    resolver = CountingGeolocationResolver()
+    event = {
+        "httpMethod": "CONNECT",
+        "requestContext": {"identity": {"sourceIp": "1.1.1.1"}},
+        "headers": {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/81.0"}
+    }
+
+    first_output = BadBots(get_mock_config, event, resolver).parse_bad_bots()
+    call_counts = dict(stub_wafv2_client.call_counts)
+
+    # !ACT!
+    repeat_outputs = [BadBots(get_mock_config, event, resolver).parse_bad_bots() for _ in range(5)]
+
+    # !ASSERT!
+    assert first_output['is_bot'] is True
+    assert first_output['scoring']['stop_reason'] != 'verdict_cache'
+
+    for repeat_output in repeat_outputs:
+        assert repeat_output['is_bot'] is True
+        assert repeat_output['bot_confidence_score'] == first_output['bot_confidence_score']
+        assert repeat_output['scoring']['stop_reason'] == 'verdict_cache'
+
+    assert resolver.lookups == 1
+    assert stub_wafv2_client.call_counts == call_counts
+    assert repeat_outputs[-1]['verdict_cache']['hits'] == 5
+
+
+def test_shared_store_shares_verdicts(tmp_path):
+    """ Unit test that a verdict stored by one container is found by another through the shared store """
+
+    # !ARRANGE!
+    store_path = str(tmp_path / 'verdicts.sqlite3')
+    bot = Bot(source_ip='2001:db8::1', http_user_agent='curl/7.64.1')
+
+    # Separate connections to the same file, as separate containers would have
+    first_container = VerdictCache(TTLLRUCache(16, 300), SQLiteVerdictStore(store_path))
+    second_container = VerdictCache(TTLLRUCache(16, 300), SQLiteVerdictStore(store_path))
+
+    # !ACT!
+    missed_verdict = second_container.lookup(bot)
+    first_container.put(bot, {'score': 8})
+    shared_verdict = second_container.lookup(bot)
+    local_verdict = second_container.lookup(bot)
+
+    # !ASSERT!
+    assert missed_verdict is None
+    assert shared_verdict == {'score': 8}
+    assert local_verdict == {'score': 8}
+    assert second_container.shared_store.get_statistics() == {'hits': 1, 'misses': 1}
+    assert second_container.local_cache.get_statistics()['hits'] == 1
+
+
+def test_verdict_cache_key_and_ttl():
+    """ Unit test the user agent in the cache key and the lifetime bound by the block """
+
+    # !ARRANGE!
+    now = [1000.0]
+    verdict_cache = VerdictCache(TTLLRUCache(16, 300, clock=lambda: now[0]), key_user_agent=True)
+
+    bot = Bot(source_ip='1.1.1.1', http_user_agent='curl/7.64.1')
+    same_address_bot = Bot(source_ip='1.1.1.1', http_user_agent='python-requests/2.24.0')
+
+    # !ACT!
+    verdict_cache.put(bot, {'score': 8}, ttl_in_seconds=60)
+    other_user_agent_verdict = verdict_cache.lookup(same_address_bot)
+    verdict = verdict_cache.lookup(bot)
+
+    now[0] += 61
+    expired_verdict = verdict_cache.lookup(bot)
+
+    # !ASSERT!
+    assert other_user_agent_verdict is None
+    assert verdict == {'score': 8}
+    assert expired_verdict is None
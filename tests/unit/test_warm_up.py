@@ -0,0 +1,93 @@
+""" Unit test containing tests for warming up the container during the init phase """
+
+import sys
+import os
+import inspect
+import subprocess
+# pylint: disable=E0401
+import pytest
+
+# Fix module import form parent directory error.
+# Reference: https://stackoverflow.com/questions/55933630/
+# python-import-statement-modulenotfounderror-when-running-tests-and-referencing
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT_SRC = "%s/LambdaCode" % os.path.dirname(PROJECT_ROOT)
+
+# Set up sys path
+sys.path.insert(0, PROJECT_ROOT_SRC)
+sys.path.insert(0, PROJECT_ROOT)
+
+# Import project classes
+# pylint: disable=C0413
+from bad_bots import BadBots
+from connection import AWSConnection
+from connection import HTTPGet
+from geolocation import GeolocationProviderFactory
+from scoring import DetectorRegistry
+from stubs import StubWAFv2Client
+
+
+@pytest.fixture()
+def stub_wafv2_client(register_stub_client):
+    """ Fixture for a stub WAFv2 client with the IPv4 bad bots IP set """
+
+    client = StubWAFv2Client()
+    client.create_ip_set(Name='ip_set_bad_bots_ipv4_test', Scope='REGIONAL', IPAddressVersion='IPV4', Addresses=[])
+
+    yield register_stub_client('wafv2', client)
+
+    GeolocationProviderFactory.reset()
+    HTTPGet.reset()
+
+
+# pylint: disable=W0621
+def test_warm_up(stub_wafv2_client):
+    """ Unit test that the enabled steps are warmed up and a failing step does not fail the init phase """
+
+    # !ARRANGE!
+    config = {
+        'BAD_BOTS': {
+            'PRELOAD_DETECTORS': 'true',
+            'WARM_UP_GEOLOCATION': 'true',
+            'WARM_UP_HTTP_POOL': 'true',
+            'WARM_UP_AWS_CLIENT': 'true',
+            'WARM_UP_IP_SET_REFERENCES': 'true'
+        },
+        'AWS_WAF': {
+            'IP_SET_BAD_BOTS_SCOPE': 'REGIONAL',
+            'IP_SET_BAD_BOTS_IPV4_NAME': 'ip_set_bad_bots_ipv4_test',
+            'IP_SET_BAD_BOTS_IPV6_NAME': 'ip_set_bad_bots_ipv6_test'
+        },
+        'GEOLOCATION': {
+            'PROVIDERS': 'unknown_provider'
+        }
+    }
+
+    # !ACT!
+    durations = BadBots.warm_up(config)
+
+    # !ASSERT!
+
+    # Assert the access list and async mode steps are disabled, the failing geolocation step is still timed
+    assert list(durations) == ['detectors', 'geolocation', 'http_pool', 'aws_client', 'ip_set_references']
+    assert DetectorRegistry.get_statistics()['build_duration_in_ms'] > 0
+    assert HTTPGet.get_pool_manager() is HTTPGet.get_pool_manager()
+    assert stub_wafv2_client.call_counts['list_ip_sets'] == 1
+    assert AWSConnection.get_connection('wafv2') is stub_wafv2_client
+
+
+def test_import_defers_aws_and_http_libraries():
+    """ Unit test that importing bad_bots in a fresh interpreter loads neither botocore, boto3 nor urllib3 """
+
+    # !ACT!
+    loaded_modules = subprocess.run(
+        [sys.executable, '-c', 'import sys; import bad_bots; '
+                               'print(sorted({name.split(".")[0] for name in sys.modules}))'],
+        cwd=PROJECT_ROOT_SRC, capture_output=True, check=True, text=True).stdout
+
+    # !ASSERT!
+    assert "'bad_bots'" in loaded_modules
+    assert "'botocore'" not in loaded_modules
+    assert "'boto3'" not in loaded_modules
+    assert "'urllib3'" not in loaded_modules